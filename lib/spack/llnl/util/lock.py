@@ -21,6 +21,7 @@
 
 __all__ = [
     "Lock",
+    "LockStatistics",
     "LockDowngradeError",
     "LockUpgradeError",
     "LockTransaction",
@@ -31,12 +32,90 @@
     "LockPermissionError",
     "LockROFileError",
     "CantCreateLockError",
+    "statistics",
+    "reset_statistics",
 ]
 
 
 ReleaseFnType = Optional[Callable[[], bool]]
 
 
+class LockStatistics:
+    """Counts the operations on a lock, and the time spent waiting for them."""
+
+    __slots__ = (
+        "acquisitions",
+        "upgrades",
+        "downgrades",
+        "timeouts",
+        "attempts",
+        "wait_time",
+        "max_wait_time",
+    )
+
+    def __init__(self) -> None:
+        self.acquisitions = 0
+        self.upgrades = 0
+        self.downgrades = 0
+        self.timeouts = 0
+        self.attempts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def record(self, event: str, wait_time: float, nattempts: int) -> None:
+        """Records an operation, which is one of the counters in the slots, and how long it
+        waited for the lock."""
+        setattr(self, event, getattr(self, event) + 1)
+        self.attempts += nattempts
+        self.wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def merge(self, other: "LockStatistics") -> None:
+        """Adds the operations counted by another instance to this one."""
+        for name in self.__slots__:
+            if name == "max_wait_time":
+                self.max_wait_time = max(self.max_wait_time, other.max_wait_time)
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self) -> Dict[str, Union[int, float]]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Union[int, float]]) -> "LockStatistics":
+        result = LockStatistics()
+        for name in result.__slots__:
+            setattr(result, name, type(getattr(result, name))(data.get(name, 0)))
+        return result
+
+    def __str__(self) -> str:
+        waited = "waited {0} (max {1}) in {2}".format(
+            lang.pretty_seconds(self.wait_time),
+            lang.pretty_seconds(self.max_wait_time),
+            plural(self.attempts, "attempt"),
+        )
+        counts = [plural(self.acquisitions, "acquisition")]
+        for name in ("upgrades", "downgrades", "timeouts"):
+            if getattr(self, name):
+                counts.append(plural(getattr(self, name), name[:-1]))
+        return "{0}, {1}".format(", ".join(counts), waited)
+
+
+#: Statistics of the locks taken by this process, keyed by path and byte range
+_STATISTICS: Dict[str, LockStatistics] = {}
+
+
+def statistics() -> Dict[str, LockStatistics]:
+    """Returns the statistics of the locks taken by this process, keyed by the path of the
+    lock file, followed by the byte range if the lock doesn't cover the whole file."""
+    return dict(_STATISTICS)
+
+
+def reset_statistics() -> None:
+    """Forgets the locks taken so far by this process."""
+    _STATISTICS.clear()
+
+
 def true_fn() -> bool:
     """A function that always returns True."""
     return True
@@ -357,8 +436,22 @@ def _lock(self, op: int, timeout: Optional[float] = None) -> Tuple[float, int]:
             return total_wait_time, num_attempts
 
         total_wait_time = time.time() - start_time
+        self._record("timeouts", total_wait_time, num_attempts)
         raise LockTimeoutError(op_str.lower(), self.path, total_wait_time, num_attempts)
 
+    def _record(self, event: str, wait_time: float, nattempts: int) -> None:
+        """Adds an operation on this lock to the statistics of the process. Operations that
+        made no attempt, because locking is disabled, are not recorded."""
+        if not nattempts:
+            return
+        key = self.path
+        if self._start or self._length:
+            key = "{0}[{1}:{2}]".format(self.path, self._start, self._length)
+        stats = _STATISTICS.get(key)
+        if stats is None:
+            stats = _STATISTICS[key] = LockStatistics()
+        stats.record(event, wait_time, nattempts)
+
     def _poll_lock(self, op: int) -> bool:
         """Attempt to acquire the lock in a non-blocking manner. Return whether
         the locking attempt succeeds
@@ -477,6 +570,7 @@ def acquire_read(self, timeout: Optional[float] = None) -> bool:
             # can raise LockError.
             wait_time, nattempts = self._lock(LockType.READ, timeout=timeout)
             self._reads += 1
+            self._record("acquisitions", wait_time, nattempts)
             # Log if acquired, which includes counts when verbose
             self._log_acquired("READ LOCK", wait_time, nattempts)
             return True
@@ -502,6 +596,7 @@ def acquire_write(self, timeout: Optional[float] = None) -> bool:
             # can raise LockError.
             wait_time, nattempts = self._lock(LockType.WRITE, timeout=timeout)
             self._writes += 1
+            self._record("acquisitions", wait_time, nattempts)
             # Log if acquired, which includes counts when verbose
             self._log_acquired("WRITE LOCK", wait_time, nattempts)
 
@@ -515,6 +610,10 @@ def acquire_write(self, timeout: Optional[float] = None) -> bool:
             self._writes += 1
             return False
 
+    def is_held(self) -> bool:
+        """Whether this process currently holds the lock, for reading or for writing"""
+        return self._reads > 0 or self._writes > 0
+
     def is_write_locked(self) -> bool:
         """Check if the file is write locked
 
@@ -547,6 +646,7 @@ def downgrade_write_to_read(self, timeout: Optional[float] = None) -> None:
             wait_time, nattempts = self._lock(LockType.READ, timeout=timeout)
             self._reads = 1
             self._writes = 0
+            self._record("downgrades", wait_time, nattempts)
             self._log_downgraded(wait_time, nattempts)
         else:
             raise LockDowngradeError(self.path)
@@ -566,6 +666,7 @@ def upgrade_read_to_write(self, timeout: Optional[float] = None) -> None:
             wait_time, nattempts = self._lock(LockType.WRITE, timeout=timeout)
             self._reads = 0
             self._writes = 1
+            self._record("upgrades", wait_time, nattempts)
             self._log_upgraded(wait_time, nattempts)
         else:
             raise LockUpgradeError(self.path)
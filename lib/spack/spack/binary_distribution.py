@@ -7,6 +7,7 @@
 import concurrent.futures
 import contextlib
 import copy
+import functools
 import hashlib
 import io
 import itertools
@@ -18,6 +19,7 @@
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import urllib.error
 import urllib.parse
@@ -89,11 +91,27 @@
 
 #: The build cache layout version that this version of Spack creates.
 #: Version 2: includes parent directories of the package prefix in the tarball
-CURRENT_BUILD_CACHE_LAYOUT_VERSION = 2
+#: Version 3: the tarball may be compressed with zstd instead of gzip. Tarballs compressed with
+#: gzip are still created with version 2, so that older versions of Spack can install them.
+CURRENT_BUILD_CACHE_LAYOUT_VERSION = 3
+
+
+def layout_version_for(compression: str) -> int:
+    """Returns the build cache layout version of tarballs with the given compression."""
+    return 2 if compression == "gzip" else CURRENT_BUILD_CACHE_LAYOUT_VERSION
+
+
+def buildcache_compression() -> str:
+    """Returns the configured compression of the tarballs pushed to build caches."""
+    return spack.config.get("config:buildcache_compression", "gzip")
 
 
 INDEX_HASH_FILE = "index.json.hash"
 
+#: Packed copy of index.json, which is smaller and faster to read. Its header records the hash
+#: of the index.json it was packed from.
+INDEX_PACKED_FILE = "index.packed"
+
 
 class BuildCacheDatabase(spack_db.Database):
     """A database for binary buildcaches.
@@ -526,11 +544,14 @@ def _fetch_and_cache_index(self, mirror_url, cache_entry={}):
         if result.fresh:
             return False
 
-        # Persist new index.json
+        # Persist new index.json, or its packed copy
+        packed = isinstance(result.data, bytes)
         url_hash = compute_hash(mirror_url)
-        cache_key = "{}_{}.json".format(url_hash[:10], result.hash[:10])
+        cache_key = "{}_{}.{}".format(
+            url_hash[:10], result.hash[:10], "packed" if packed else "json"
+        )
         self._index_file_cache.init_entry(cache_key)
-        with self._index_file_cache.write_transaction(cache_key) as (old, new):
+        with self._index_file_cache.write_transaction(cache_key, binary=packed) as (old, new):
             new.write(result.data)
 
         self._local_index_cache[mirror_url] = {
@@ -706,8 +727,8 @@ def _read_specs_and_push_index(
         db.add(fetched_spec)
         db.mark(fetched_spec, "in_buildcache", True)
 
-    # Now generate the index, compute its hash, and push the two files to
-    # the mirror.
+    # Now generate the index, compute its hash, and push the index, its packed copy and the
+    # hash to the mirror.
     index_json_path = os.path.join(temp_dir, spack_db.INDEX_JSON_FILE)
     with open(index_json_path, "w", encoding="utf-8") as f:
         db._write_to_file(f)
@@ -722,6 +743,19 @@ def _read_specs_and_push_index(
     with open(index_hash_path, "w", encoding="utf-8") as f:
         f.write(index_hash)
 
+    # Clients that can read it fetch the packed copy instead of index.json. It is pushed first,
+    # so that it is never older than the hash pushed last.
+    index_packed_path = os.path.join(temp_dir, INDEX_PACKED_FILE)
+    with open(index_packed_path, "wb") as f:
+        f.write(spack_db.pack_database(sjson.load(index_string), index_hash=index_hash))
+
+    web_util.push_to_url(
+        index_packed_path,
+        url_util.join(cache_prefix, INDEX_PACKED_FILE),
+        keep_original=False,
+        extra_args={"ContentType": "application/octet-stream", "CacheControl": "no-cache"},
+    )
+
     # Push the index itself
     web_util.push_to_url(
         index_json_path,
@@ -1026,25 +1060,32 @@ def add_symlink(tar: tarfile.TarFile, info: tarfile.TarInfo, path: str):
     }
 
 
-def create_tarball(spec: spack.spec.Spec, tarfile_path: str) -> Tuple[str, str]:
+def create_tarball(
+    spec: spack.spec.Spec, tarfile_path: str, compression: str = "gzip"
+) -> Tuple[str, str]:
     """Create a tarball of a spec and return the checksums of the compressed tarfile and the
-    uncompressed tarfile."""
+    uncompressed tarfile. The tarball is compressed by as many threads as build jobs."""
     return _do_create_tarball(
         tarfile_path,
         spec.prefix,
         buildinfo=get_buildinfo_dict(spec),
         prefixes_to_relocate=prefixes_to_relocate(spec),
+        compression=compression,
     )
 
 
 def _do_create_tarball(
-    tarfile_path: str, prefix: str, buildinfo: dict, prefixes_to_relocate: List[str]
+    tarfile_path: str,
+    prefix: str,
+    buildinfo: dict,
+    prefixes_to_relocate: List[str],
+    compression: str = "gzip",
 ) -> Tuple[str, str]:
-    with spack.util.archive.gzip_compressed_tarfile(tarfile_path) as (
-        tar,
-        tar_gz_checksum,
-        tar_checksum,
-    ):
+    with spack.util.archive.compressed_tarfile(
+        tarfile_path,
+        compression=compression,
+        jobs=spack.config.determine_number_of_jobs(parallel=True),
+    ) as (tar, tar_gz_checksum, tar_checksum):
         # Tarball the install prefix
         files_to_relocate = tarfile_of_spec_prefix(tar, prefix, prefixes_to_relocate)
         buildinfo.update(files_to_relocate)
@@ -1125,10 +1166,15 @@ def _url_upload_tarball_and_specfile(
 ):
     files = BuildcacheFiles(spec, tmpdir, out_url)
     tarball = files.local_tarball()
-    checksum, _ = create_tarball(spec, tarball)
+    compression = buildcache_compression()
+    checksum, _ = create_tarball(spec, tarball, compression)
     spec_dict = spec.to_dict(hash=ht.dag_hash)
-    spec_dict["buildcache_layout_version"] = CURRENT_BUILD_CACHE_LAYOUT_VERSION
-    spec_dict["binary_cache_checksum"] = {"hash_algorithm": "sha256", "hash": checksum}
+    spec_dict["buildcache_layout_version"] = layout_version_for(compression)
+    spec_dict["binary_cache_checksum"] = {
+        "hash_algorithm": "sha256",
+        "hash": checksum,
+        "compression": compression,
+    }
 
     if exists.tarball:
         web_util.remove_url(files.remote_tarball())
@@ -1437,6 +1483,9 @@ def _oci_get_blob_info(image_ref: ImageReference) -> Optional[spack.oci.oci.Blob
             compressed_digest=Digest.from_string(manifest["layers"][-1]["digest"]),
             uncompressed_digest=Digest.from_string(config["rootfs"]["diff_ids"][-1]),
             size=manifest["layers"][-1]["size"],
+            compression=(
+                "zstd" if manifest["layers"][-1]["mediaType"].endswith("+zstd") else "gzip"
+            ),
         )
     except Exception:
         return None
@@ -1449,12 +1498,14 @@ def _oci_push_pkg_blob(
     filename = os.path.join(tmpdir, f"{spec.dag_hash()}.tar.gz")
 
     # Create an oci.image.layer aka tarball of the package
-    tar_gz_checksum, tar_checksum = create_tarball(spec, filename)
+    compression = buildcache_compression()
+    tar_gz_checksum, tar_checksum = create_tarball(spec, filename, compression)
 
     blob = spack.oci.oci.Blob(
         Digest.from_sha256(tar_gz_checksum),
         Digest.from_sha256(tar_checksum),
         os.path.getsize(filename),
+        compression,
     )
 
     # Upload the blob
@@ -1493,6 +1544,16 @@ def _oci_archspec_to_gooarch(spec: spack.spec.Spec) -> str:
     return name_map.get(name, name)
 
 
+def _oci_layer_media_type(compression: str, use_docker_format: bool) -> str:
+    """Returns the media type of a layer. Docker manifests have no media type for zstd layers,
+    so the OCI one is used for them."""
+    if compression == "zstd":
+        return "application/vnd.oci.image.layer.v1.tar+zstd"
+    elif use_docker_format:
+        return "application/vnd.docker.image.rootfs.diff.tar.gzip"
+    return "application/vnd.oci.image.layer.v1.tar+gzip"
+
+
 def _oci_put_manifest(
     base_images: Dict[str, Tuple[dict, dict]],
     checksums: Dict[str, spack.oci.oci.Blob],
@@ -1570,10 +1631,8 @@ def _oci_put_manifest(
             *(layer for layer in base_manifest["layers"]),
             *(
                 {
-                    "mediaType": (
-                        "application/vnd.docker.image.rootfs.diff.tar.gzip"
-                        if use_docker_format
-                        else "application/vnd.oci.image.layer.v1.tar+gzip"
+                    "mediaType": _oci_layer_media_type(
+                        checksums[s.dag_hash()].compression, use_docker_format
                     ),
                     "digest": str(checksums[s.dag_hash()].compressed_digest),
                     "size": checksums[s.dag_hash()].size,
@@ -1717,11 +1776,13 @@ def _oci_push(
         )
 
     def extra_config(spec: spack.spec.Spec):
+        blob = checksums[spec.dag_hash()]
         spec_dict = spec.to_dict(hash=ht.dag_hash)
-        spec_dict["buildcache_layout_version"] = CURRENT_BUILD_CACHE_LAYOUT_VERSION
+        spec_dict["buildcache_layout_version"] = layout_version_for(blob.compression)
         spec_dict["binary_cache_checksum"] = {
             "hash_algorithm": "sha256",
-            "hash": checksums[spec.dag_hash()].compressed_digest.digest,
+            "hash": blob.compressed_digest.digest,
+            "compression": blob.compression,
         }
         return spec_dict
 
@@ -1879,7 +1940,8 @@ def try_fetch(url_to_fetch):
 
 def _delete_staged_downloads(download_result):
     """Clean up stages used to download tarball and specfile"""
-    download_result["tarball_stage"].destroy()
+    if "tarball_stage" in download_result:
+        download_result["tarball_stage"].destroy()
     download_result["specfile_stage"].destroy()
 
 
@@ -1919,7 +1981,17 @@ def _get_valid_spec_file(path: str, max_supported_layout: int) -> Tuple[Dict, in
     return spec_dict, layout_version
 
 
-def download_tarball(spec, unsigned: Optional[bool] = False, mirrors_for_spec=None):
+def _open_tarball_url(url: str, oci: bool = False) -> IO[bytes]:
+    """Open a HTTP response, or a file, to stream a tarball from a mirror"""
+    if oci:
+        return spack.oci.opener.urlopen(urllib.request.Request(url))
+    _, _, response = web_util.read_from_url(url)
+    return response
+
+
+def download_tarball(
+    spec, unsigned: Optional[bool] = False, mirrors_for_spec=None, stream: Optional[bool] = None
+):
     """
     Download binary tarball for given package into stage area, returning
     path to downloaded tarball if successful, None otherwise.
@@ -1931,6 +2003,9 @@ def download_tarball(spec, unsigned: Optional[bool] = False, mirrors_for_spec=No
             obtained by calling binary_distribution.get_mirrors_for_spec().
             These will be checked in order first before looking in other
             configured mirrors.
+        stream: if ``True``, only the specfile is downloaded, and the tarball is streamed by
+            ``extract_tarball`` instead, unless it has the oldest layout. If ``None``, the value
+            of ``config:stream_binaries`` is used.
 
     Returns:
         ``None`` if the tarball could not be downloaded (maybe also verified,
@@ -1946,7 +2021,13 @@ def download_tarball(spec, unsigned: Optional[bool] = False, mirrors_for_spec=No
            "specfile_path": "none-or-path-to-locally-saved-specfile",
            "signature_verified": "true-if-binary-pkg-was-already-verified"
        }
+
+    When the tarball is streamed, the object has no ``tarball_stage``, but the URL of the
+    tarball under ``tarball_url``, and a function opening it under ``open_tarball``.
     """
+    if stream is None:
+        stream = config.get("config:stream_binaries", False)
+
     configured_mirrors: Iterable[spack.mirrors.mirror.Mirror] = (
         spack.mirrors.mirror.MirrorCollection(binary=True).values()
     )
@@ -2025,7 +2106,7 @@ def fetch_url_to_mirror(url):
                         local_specfile_stage.fetch()
                         local_specfile_stage.check()
                         try:
-                            _get_valid_spec_file(
+                            _, layout_version = _get_valid_spec_file(
                                 local_specfile_stage.save_filename,
                                 CURRENT_BUILD_CACHE_LAYOUT_VERSION,
                             )
@@ -2040,6 +2121,18 @@ def fetch_url_to_mirror(url):
                         continue
                     local_specfile_stage.cache_local()
 
+                if stream and layout_version >= 1:
+                    tarball_url = ref.blob_url(tarball_digest)
+                    return {
+                        "tarball_url": tarball_url,
+                        "open_tarball": functools.partial(
+                            _open_tarball_url, tarball_url, oci=True
+                        ),
+                        "specfile_stage": local_specfile_stage,
+                        "signature_verified": False,
+                        "signature_required": not currently_unsigned,
+                    }
+
                 with spack.oci.oci.make_stage(
                     ref.blob_url(tarball_digest), tarball_digest, keep=True
                 ) as tarball_stage:
@@ -2070,7 +2163,7 @@ def fetch_url_to_mirror(url):
                     signature_verified = False
 
                     try:
-                        _get_valid_spec_file(
+                        _, layout_version = _get_valid_spec_file(
                             local_specfile_path, CURRENT_BUILD_CACHE_LAYOUT_VERSION
                         )
                     except InvalidMetadataFile as e:
@@ -2107,6 +2200,22 @@ def fetch_url_to_mirror(url):
                         #     verify signature, checksum doesn't match) we will fail at
                         #     that point instead of trying to download more tarballs from
                         #     the remaining mirrors, looking for one we can use.
+                        if stream and layout_version >= 1:
+                            # Only check that the tarball exists, it's downloaded while
+                            # being extracted.
+                            if web_util.url_exists(spackfile_url):
+                                return {
+                                    "tarball_url": spackfile_url,
+                                    "open_tarball": functools.partial(
+                                        _open_tarball_url, spackfile_url
+                                    ),
+                                    "specfile_stage": local_specfile_stage,
+                                    "signature_verified": signature_verified,
+                                    "signature_required": not currently_unsigned,
+                                }
+                            local_specfile_stage.destroy()
+                            continue
+
                         tarball_stage = try_fetch(spackfile_url)
                         if tarball_stage:
                             return {
@@ -2136,6 +2245,149 @@ def fetch_url_to_mirror(url):
     return None
 
 
+def _prefetch_tarball(spec, unsigned: Optional[bool], mirrors_for_spec):
+    """Downloads the binary package of a spec like ``download_tarball``, and computes the
+    checksum of its tarball, so that ``extract_tarball`` doesn't have to."""
+    download_result = download_tarball(spec, unsigned, mirrors_for_spec)
+    if download_result is not None and "tarball_stage" in download_result:
+        tarball_path = download_result["tarball_stage"].save_filename
+        download_result["tarball_checksum"] = spack.util.crypto.checksum(
+            hashlib.sha256, tarball_path
+        )
+    return download_result
+
+
+class BinaryPrefetcher:
+    """Downloads binary packages in background threads, ahead of their installation.
+
+    The signatures of the specfiles are verified, and the checksums of the tarballs are
+    computed, by the threads as well, so that only the extraction and the relocation of the
+    packages are left to their installation.
+
+    Downloads start in the order in which they are requested, as long as fewer than
+    ``lookahead`` downloaded binary packages are waiting to be installed, so that the disk space
+    used by the stage does not grow with the number of packages to be installed. The threads are
+    daemon threads, so that an interrupted installation doesn't wait for them.
+    """
+
+    def __init__(self, jobs: int, lookahead: Optional[int] = None):
+        """
+        Args:
+            jobs: maximum number of binary packages downloaded at the same time
+            lookahead: maximum number of binary packages downloaded, or being downloaded, and
+                not installed yet. By default twice the number of jobs.
+        """
+        self.lookahead = lookahead or 2 * jobs
+        self.semaphore = threading.BoundedSemaphore(jobs)
+        self.threads: List[threading.Thread] = []
+        #: Downloads of binary packages, keyed on the DAG hash of their spec and on the
+        #: signature verification override they were started with
+        self.downloads: Dict[Tuple[str, Optional[bool]], concurrent.futures.Future] = {}
+        #: Binary packages whose download is not started yet, in the same order as their keys
+        self.queue: Dict[Tuple[str, Optional[bool]], Tuple[spack.spec.Spec, Optional[bool]]] = {}
+
+    def prefetch(self, spec: spack.spec.Spec, unsigned: Optional[bool] = False) -> None:
+        """Request the download of the binary package of a concrete spec. The mirrors whose
+        index has the spec are tried first, like in ``download_tarball``.
+
+        Args:
+            spec: concrete spec whose binary package is downloaded
+            unsigned: if ``True`` or ``False`` override the mirror signature verification
+                defaults
+        """
+        key = (spec.dag_hash(), unsigned)
+        if key in self.downloads or key in self.queue:
+            return
+        self.queue[key] = (spec, unsigned)
+        self._start_downloads()
+
+    def _start_downloads(self) -> None:
+        self.threads = [t for t in self.threads if t.is_alive()]
+        while self.queue and len(self.downloads) < self.lookahead:
+            key = next(iter(self.queue))
+            spec, unsigned = self.queue.pop(key)
+
+            # The binary index is not thread-safe, so mirrors are looked up here
+            mirrors_for_spec = get_mirrors_for_spec(spec, index_only=True)
+            tty.debug(f"Prefetching the binary package of {spec.format('{name}/{hash:7}')}")
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            thread = threading.Thread(
+                target=self._download, args=(future, spec, unsigned, mirrors_for_spec), daemon=True
+            )
+            thread.start()
+            self.threads.append(thread)
+            self.downloads[key] = future
+
+    def _download(self, future: concurrent.futures.Future, *args) -> None:
+        with self.semaphore:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(_prefetch_tarball(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def download_tarball(self, spec, unsigned: Optional[bool] = False, mirrors_for_spec=None):
+        """Same as ``download_tarball``, but waits for the binary package of the spec to be
+        prefetched instead of downloading it, if it was prefetched."""
+        key = (spec.dag_hash(), unsigned)
+        future = self.downloads.pop(key, None)
+        self.queue.pop(key, None)
+
+        # Start the next download before waiting for this one
+        self._start_downloads()
+
+        if future is None:
+            return download_tarball(spec, unsigned, mirrors_for_spec)
+        return future.result()
+
+    def discard(self, spec, unsigned: Optional[bool] = False) -> None:
+        """Drop the download of the binary package of a spec that won't be installed from it,
+        e.g. because one of its dependencies failed, or because another process installed it.
+        The download is cancelled if not started, and deleted once done otherwise, and the next
+        download is started in its place.
+
+        Args:
+            spec: concrete spec whose binary package was requested
+            unsigned: the signature verification override the download was requested with
+        """
+        key = (spec.dag_hash(), unsigned)
+        self.queue.pop(key, None)
+        future = self.downloads.pop(key, None)
+        if future is None:
+            return
+        if not future.cancel():
+            future.add_done_callback(_delete_prefetched_download)
+        self._start_downloads()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Cancel the downloads that are not started, and delete the binary packages that
+        were downloaded but not installed, also those still being downloaded once they are.
+
+        Args:
+            wait: whether to wait for the downloads in progress, which an interrupted
+                installation doesn't do
+        """
+        self.queue.clear()
+        for future in self.downloads.values():
+            if not future.cancel():
+                future.add_done_callback(_delete_prefetched_download)
+        self.downloads.clear()
+
+        if wait:
+            for thread in self.threads:
+                thread.join()
+        self.threads.clear()
+
+
+def _delete_prefetched_download(future: concurrent.futures.Future) -> None:
+    if future.exception() is not None:
+        return
+    download_result = future.result()
+    if download_result is not None:
+        _delete_staged_downloads(download_result)
+
+
 def dedupe_hardlinks_if_necessary(root, buildinfo):
     """Updates a buildinfo dict for old archives that did not dedupe hardlinks. De-duping hardlinks
     is necessary when relocating files in parallel and in-place. This means we must preserve inodes
@@ -2363,13 +2615,59 @@ def _tar_strip_component(tar: tarfile.TarFile, prefix: str):
 
 
 def extract_buildcache_tarball(tarfile_path: str, destination: str) -> None:
-    with closing(tarfile.open(tarfile_path, "r")) as tar:
+    with spack.util.archive.open_compressed_tarfile(tarfile_path) as tar:
         # Remove common prefix from tarball entries and directly extract them to the install dir.
         tar.extractall(
             path=destination, members=_tar_strip_component(tar, prefix=_ensure_common_prefix(tar))
         )
 
 
+def _checked_members(tar: tarfile.TarFile, destination: str):
+    """Yield all members of a tarfile, ensuring that they, and the targets of hardlinks, are in
+    the destination dir. Paths are resolved when members are yielded, i.e. after the previous
+    members are extracted, so that writing through symlinks extracted before is not possible.
+    Symlinks themselves may point anywhere, since they are relocated after extraction."""
+    root = os.path.realpath(destination)
+    for m in tar:
+        for name in (m.name, m.linkname) if m.islnk() else (m.name,):
+            path = os.path.realpath(os.path.join(root, name))
+            if os.path.commonpath([root, path]) != root:
+                raise ValueError(f"Tarball contains file {name} outside of the destination dir")
+        yield m
+
+
+def extract_buildcache_tarball_stream(
+    fileobj: IO[bytes],
+    destination: str,
+    *,
+    checksum: str,
+    compression: str = "gzip",
+    source: str = "<stream>",
+) -> None:
+    """Extract a tarball from a file object, such as a HTTP response, in a single pass: the
+    tarball is hashed, decompressed and extracted into a temporary dir next to ``destination`` at
+    the same time, and the package prefix is moved to ``destination`` once the sha256 checksum of
+    the tarball is verified. An existing, empty ``destination`` dir is replaced."""
+    reader = spack.util.archive.ChecksumReader(fileobj)
+    tmpdir = tempfile.mkdtemp(prefix=".extract-", dir=os.path.dirname(destination))
+    try:
+        with spack.util.archive.open_compressed_tarfile_stream(reader, compression) as tar:
+            tar.extractall(path=tmpdir, members=_checked_members(tar, tmpdir))
+            pkg_prefix = _ensure_common_prefix(tar)
+
+        local_checksum = reader.hexdigest()
+        if local_checksum != checksum:
+            raise NoChecksumException(
+                source, reader.length, b"", "sha256", checksum, local_checksum
+            )
+
+        if os.path.isdir(destination):
+            os.rmdir(destination)
+        os.rename(os.path.join(tmpdir, *pathlib.PurePosixPath(pkg_prefix).parts), destination)
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
 def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
     """
     extract binary tarball for given package into install area
@@ -2395,7 +2693,9 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
     )
     bchecksum = spec_dict["binary_cache_checksum"]
 
-    filename = download_result["tarball_stage"].save_filename
+    # Without a staged tarball, it's streamed from the mirror while being extracted
+    streamed = "tarball_stage" not in download_result
+    filename = None if streamed else download_result["tarball_stage"].save_filename
     signature_verified: bool = download_result["signature_verified"]
     signature_required: bool = download_result["signature_required"]
     tmpdir = None
@@ -2413,7 +2713,7 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
             _delete_staged_downloads(download_result)
             shutil.rmtree(tmpdir)
             raise e
-    elif 1 <= layout_version <= 2:
+    elif 1 <= layout_version <= 3:
         # Newer buildcache layout: the .spack file contains just
         # in the install tree, the signature, if it exists, is
         # wrapped around the spec.json at the root.  If sig verify
@@ -2427,25 +2727,44 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
                 "or configure the mirror with signed: false."
             )
 
-        # compute the sha256 checksum of the tarball
-        local_checksum = spack.util.crypto.checksum(hashlib.sha256, tarfile_path)
-        expected = bchecksum["hash"]
-
-        # if the checksums don't match don't install
-        if local_checksum != expected:
-            size, contents = fsys.filesummary(tarfile_path)
-            _delete_staged_downloads(download_result)
-            raise NoChecksumException(
-                tarfile_path, size, contents, "sha256", expected, local_checksum
+        # compute the sha256 checksum of the tarball, unless it was computed when prefetched,
+        # or it's computed while streaming the tarball.
+        if not streamed:
+            local_checksum = download_result.get("tarball_checksum") or spack.util.crypto.checksum(
+                hashlib.sha256, tarfile_path
             )
+            expected = bchecksum["hash"]
+
+            # if the checksums don't match don't install
+            if local_checksum != expected:
+                size, contents = fsys.filesummary(tarfile_path)
+                _delete_staged_downloads(download_result)
+                raise NoChecksumException(
+                    tarfile_path, size, contents, "sha256", expected, local_checksum
+                )
     try:
-        extract_buildcache_tarball(tarfile_path, destination=spec.prefix)
+        if streamed:
+            with download_result["open_tarball"]() as response:
+                extract_buildcache_tarball_stream(
+                    response,
+                    spec.prefix,
+                    checksum=bchecksum["hash"],
+                    compression=bchecksum.get("compression", "gzip"),
+                    source=download_result["tarball_url"],
+                )
+            # The prefix was replaced, so its group has to be set again
+            group = get_package_group(spec)
+            if group:
+                fsys.chgrp(spec.prefix, group)
+        else:
+            extract_buildcache_tarball(tarfile_path, destination=spec.prefix)
     except Exception:
         shutil.rmtree(spec.prefix, ignore_errors=True)
         _delete_staged_downloads(download_result)
         raise
 
-    os.remove(tarfile_path)
+    if not streamed:
+        os.remove(tarfile_path)
     os.remove(specfile_path)
     timer.stop("extract")
 
@@ -2458,7 +2777,7 @@ def extract_tarball(spec, download_result, force=False, timer=timer.NULL_TIMER):
     finally:
         if tmpdir:
             shutil.rmtree(tmpdir, ignore_errors=True)
-        if os.path.exists(filename):
+        if filename and os.path.exists(filename):
             os.remove(filename)
         _delete_staged_downloads(download_result)
     timer.stop("relocate")
@@ -2536,7 +2855,8 @@ def install_root_node(
         warnings.warn("Package for spec {0} already installed.".format(spec.format()))
         return
 
-    download_result = download_tarball(spec.build_spec, unsigned)
+    # The checksum of a streamed tarball can only be verified once it's extracted
+    download_result = download_tarball(spec.build_spec, unsigned, stream=False if sha256 else None)
     if not download_result:
         msg = 'download of binary cache file for spec "{0}" failed'
         raise RuntimeError(msg.format(spec.build_spec.format()))
@@ -2967,15 +3287,41 @@ def get_remote_hash(self):
             return None
         return remote_hash.decode("utf-8")
 
+    def fetch_packed(self, remote_hash: str) -> Optional[FetchIndexResult]:
+        """Fetch the packed copy of index.json, if the mirror has one for the index.json
+        with the given hash"""
+        url_index = url_util.join(self.url, BUILD_CACHE_RELATIVE_PATH, INDEX_PACKED_FILE)
+        try:
+            response = self.urlopen(urllib.request.Request(url_index, headers=self.headers))
+            result = response.read()
+            header = spack_db.read_packed_header(result)
+        except Exception as e:
+            tty.debug(f"Could not fetch packed index {url_index}: {e}")
+            return None
+
+        # Mirrors updated by older versions of Spack may have a stale packed copy
+        if header.get("index_hash") != remote_hash:
+            return None
+
+        return FetchIndexResult(etag=None, hash=remote_hash, data=result, fresh=False)
+
     def conditional_fetch(self) -> FetchIndexResult:
         # Do an intermediate fetch for the hash
         # and a conditional fetch for the contents
 
         # Early exit if our cache is up to date.
-        if self.local_hash and self.local_hash == self.get_remote_hash():
+        remote_hash = self.get_remote_hash()
+        if self.local_hash and self.local_hash == remote_hash:
             return FetchIndexResult(etag=None, hash=None, data=None, fresh=True)
 
-        # Otherwise, download index.json
+        # Otherwise, download the packed copy of index.json if there is one, and it's known to
+        # be up to date
+        if remote_hash:
+            packed_result = self.fetch_packed(remote_hash)
+            if packed_result is not None:
+                return packed_result
+
+        # Or else, download index.json
         url_index = url_util.join(self.url, BUILD_CACHE_RELATIVE_PATH, spack_db.INDEX_JSON_FILE)
 
         try:
@@ -34,6 +34,7 @@
 import inspect
 import io
 import multiprocessing
+import multiprocessing.connection
 import os
 import re
 import stat
@@ -148,6 +149,39 @@ def jobserver_enabled():
     return "MAKEFLAGS" in os.environ and "--jobserver" in os.environ["MAKEFLAGS"]
 
 
+class Jobserver:
+    """A POSIX jobserver created by Spack, which limits the total number of jobs of the builds
+    sharing it.
+
+    Build tools supporting the jobserver protocol of GNU make find it in ``MAKEFLAGS``. Each of
+    them runs one job without a token, and takes a token from the pipe before running any other
+    job at the same time. The jobserver is inherited by the build processes that are forked
+    while it's open.
+    """
+
+    def __init__(self, jobs: int, *, clients: int = 1) -> None:
+        """
+        Args:
+            jobs: maximum number of jobs running at the same time
+            clients: number of build tools sharing the jobserver at the same time, each of
+                which runs one job without a token
+        """
+        self.jobs = jobs
+        self.read_fd, self.write_fd = os.pipe()
+        for fd in (self.read_fd, self.write_fd):
+            os.set_inheritable(fd, True)
+        os.write(self.write_fd, b"+" * max(0, jobs - clients))
+
+    @property
+    def makeflags(self) -> str:
+        """Value of ``MAKEFLAGS`` for the clients of the jobserver."""
+        return f"-j{self.jobs} --jobserver-auth={self.read_fd},{self.write_fd}"
+
+    def close(self) -> None:
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
 def get_effective_jobs(jobs, parallel=True, supports_jobserver=False):
     """Return the number of jobs, or None if supports_jobserver and a jobserver is detected."""
     if not parallel or jobs <= 1 or env_flag(SPACK_NO_PARALLEL_MAKE):
@@ -1293,6 +1327,12 @@ def _setup_pkg_and_run(
 
         pkg = serialized_pkg.restore()
 
+        # The build jobs are shared among the builds running at the same time
+        if kwargs.get("build_jobs") is not None:
+            spack.config.set("config:build_jobs", kwargs["build_jobs"])
+        if kwargs.get("makeflags") is not None:
+            os.environ["MAKEFLAGS"] = kwargs["makeflags"]
+
         if not kwargs.get("fake", False):
             kwargs["unmodified_env"] = os.environ.copy()
             kwargs["env_modifications"] = setup_package(
@@ -1362,6 +1402,149 @@ def _setup_pkg_and_run(
             input_pipe.close()
 
 
+class BuildProcess:
+    """A child process doing part of a Spack build, see :func:`start_build_process`.
+
+    The process is started by :meth:`start`, and its result is collected by :meth:`complete`,
+    which waits for it. Several build processes can run at the same time, and
+    :func:`wait_for_build_processes` waits until any of them has finished.
+    """
+
+    def __init__(self, pkg, function, kwargs, *, forward_stdin: bool = True) -> None:
+        """
+        Args:
+            pkg (spack.package_base.PackageBase): package whose environment we should set up
+                the child process for.
+            function (typing.Callable): function to run in the child process
+            kwargs: keyword arguments passed to ``function``
+            forward_stdin: whether the child process reads the standard input of this one,
+                when it is a terminal, to allow toggling verbosity. Only one of the build
+                processes running at the same time should read it.
+        """
+        self.pkg = pkg
+        self.function = function
+        self.kwargs = kwargs
+        self.forward_stdin = forward_stdin
+        self.read_pipe: Optional[Connection] = None
+        self.process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> None:
+        """Starts the child process."""
+        read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
+        input_fd = None
+        jobserver_fd1 = None
+        jobserver_fd2 = None
+
+        serialized_pkg = spack.subprocess_context.PackageInstallContext(self.pkg)
+
+        try:
+            # Forward sys.stdin when appropriate, to allow toggling verbosity
+            if (
+                self.forward_stdin
+                and sys.platform != "win32"
+                and sys.stdin.isatty()
+                and hasattr(sys.stdin, "fileno")
+            ):
+                input_fd = Connection(os.dup(sys.stdin.fileno()))
+            mflags = os.environ.get("MAKEFLAGS", False)
+            if mflags:
+                m = re.search(r"--jobserver-[^=]*=(\d),(\d)", mflags)
+                if m:
+                    jobserver_fd1 = Connection(int(m.group(1)))
+                    jobserver_fd2 = Connection(int(m.group(2)))
+
+            p = multiprocessing.Process(
+                target=_setup_pkg_and_run,
+                args=(
+                    serialized_pkg,
+                    self.function,
+                    self.kwargs,
+                    write_pipe,
+                    input_fd,
+                    jobserver_fd1,
+                    jobserver_fd2,
+                ),
+            )
+
+            p.start()
+
+            # We close the writable end of the pipe now to be sure that p is the
+            # only process which owns a handle for it. This ensures that when p
+            # closes its handle for the writable end, read_pipe.recv() will
+            # promptly report the readable end as being ready.
+            write_pipe.close()
+
+        except InstallError as e:
+            e.pkg = self.pkg
+            raise
+
+        finally:
+            # Close the input stream in the parent process
+            if input_fd is not None:
+                input_fd.close()
+
+        self.read_pipe, self.process = read_pipe, p
+
+    def complete(self):
+        """Waits for the child process to finish, and returns the value returned by the
+        function. Errors in the child process are raised here."""
+        assert self.read_pipe is not None and self.process is not None, "not started"
+        p, pkg = self.process, self.pkg
+
+        def exitcode_msg(p):
+            typ = "exit" if p.exitcode >= 0 else "signal"
+            return f"{typ} {abs(p.exitcode)}"
+
+        try:
+            child_result = self.read_pipe.recv()
+        except EOFError:
+            p.join()
+            raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
+        finally:
+            self.read_pipe.close()
+
+        p.join()
+
+        # If returns a StopPhase, raise it
+        if isinstance(child_result, spack.error.StopPhase):
+            # do not print
+            raise child_result
+
+        # let the caller know which package went wrong.
+        if isinstance(child_result, InstallError):
+            child_result.pkg = pkg
+
+        if isinstance(child_result, ChildError):
+            # If the child process raised an error, print its output here rather
+            # than waiting until the call to SpackError.die() in main(). This
+            # allows exception handling output to be logged from within Spack.
+            # see spack.main.SpackCommand.
+            child_result.print_context()
+            raise child_result
+
+        # Fallback. Usually caught beforehand in EOFError above.
+        if p.exitcode != 0:
+            raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
+
+        return child_result
+
+    def terminate(self) -> None:
+        """Stops the child process, if it's still running."""
+        if self.process is None or self.read_pipe is None:
+            return
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.read_pipe.close()
+
+
+def wait_for_build_processes(processes: List[BuildProcess]) -> List[BuildProcess]:
+    """Waits until at least one of the build processes has finished, and returns the ones
+    that have. Their results are then collected by :meth:`BuildProcess.complete`."""
+    ready = multiprocessing.connection.wait([p.read_pipe for p in processes])
+    return [p for p in processes if p.read_pipe in ready]
+
+
 def start_build_process(pkg, function, kwargs):
     """Create a child process to do part of a spack build.
 
@@ -1387,88 +1570,9 @@ def child_fun():
     passes it to the parent wrapped in a ChildError.  The parent is
     expected to handle (or re-raise) the ChildError.
     """
-    read_pipe, write_pipe = multiprocessing.Pipe(duplex=False)
-    input_fd = None
-    jobserver_fd1 = None
-    jobserver_fd2 = None
-
-    serialized_pkg = spack.subprocess_context.PackageInstallContext(pkg)
-
-    try:
-        # Forward sys.stdin when appropriate, to allow toggling verbosity
-        if sys.platform != "win32" and sys.stdin.isatty() and hasattr(sys.stdin, "fileno"):
-            input_fd = Connection(os.dup(sys.stdin.fileno()))
-        mflags = os.environ.get("MAKEFLAGS", False)
-        if mflags:
-            m = re.search(r"--jobserver-[^=]*=(\d),(\d)", mflags)
-            if m:
-                jobserver_fd1 = Connection(int(m.group(1)))
-                jobserver_fd2 = Connection(int(m.group(2)))
-
-        p = multiprocessing.Process(
-            target=_setup_pkg_and_run,
-            args=(
-                serialized_pkg,
-                function,
-                kwargs,
-                write_pipe,
-                input_fd,
-                jobserver_fd1,
-                jobserver_fd2,
-            ),
-        )
-
-        p.start()
-
-        # We close the writable end of the pipe now to be sure that p is the
-        # only process which owns a handle for it. This ensures that when p
-        # closes its handle for the writable end, read_pipe.recv() will
-        # promptly report the readable end as being ready.
-        write_pipe.close()
-
-    except InstallError as e:
-        e.pkg = pkg
-        raise
-
-    finally:
-        # Close the input stream in the parent process
-        if input_fd is not None:
-            input_fd.close()
-
-    def exitcode_msg(p):
-        typ = "exit" if p.exitcode >= 0 else "signal"
-        return f"{typ} {abs(p.exitcode)}"
-
-    try:
-        child_result = read_pipe.recv()
-    except EOFError:
-        p.join()
-        raise InstallError(f"The process has stopped unexpectedly ({exitcode_msg(p)})")
-
-    p.join()
-
-    # If returns a StopPhase, raise it
-    if isinstance(child_result, spack.error.StopPhase):
-        # do not print
-        raise child_result
-
-    # let the caller know which package went wrong.
-    if isinstance(child_result, InstallError):
-        child_result.pkg = pkg
-
-    if isinstance(child_result, ChildError):
-        # If the child process raised an error, print its output here rather
-        # than waiting until the call to SpackError.die() in main(). This
-        # allows exception handling output to be logged from within Spack.
-        # see spack.main.SpackCommand.
-        child_result.print_context()
-        raise child_result
-
-    # Fallback. Usually caught beforehand in EOFError above.
-    if p.exitcode != 0:
-        raise InstallError(f"The process failed unexpectedly ({exitcode_msg(p)})")
-
-    return child_result
+    process = BuildProcess(pkg, function, kwargs)
+    process.start()
+    return process.complete()
 
 
 CONTEXT_BASES = (spack.package_base.PackageBase, spack.builder.Builder)
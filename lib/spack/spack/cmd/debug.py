@@ -2,11 +2,18 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import json
+import os
 import platform
+import sys
+
+import llnl.util.tty as tty
 
 import spack
+import spack.paths
 import spack.platforms
 import spack.spec
+import spack.util.lock
 
 description = "debugging commands for troubleshooting Spack"
 section = "developer"
@@ -17,6 +24,23 @@ def setup_parser(subparser):
     sp = subparser.add_subparsers(metavar="SUBCOMMAND", dest="debug_command")
     sp.add_parser("report", help="print information useful for bug reports")
 
+    locks = sp.add_parser(
+        "locks", help="report the time spent waiting for locks (see config:lock_stats)"
+    )
+    locks.add_argument(
+        "-n",
+        "--limit",
+        type=int,
+        default=20,
+        help="number of locks to report, by decreasing wait time (0 for all)",
+    )
+    locks.add_argument(
+        "--json", action="store_true", help="print the statistics of all the locks as JSON"
+    )
+    locks.add_argument(
+        "--clear", action="store_true", help="remove the statistics recorded so far"
+    )
+
 
 def report(args):
     host_platform = spack.platforms.host()
@@ -28,6 +52,45 @@ def report(args):
     print("* **Platform:**", architecture)
 
 
+def locks(args):
+    directory = spack.paths.default_lock_stats_path
+    if args.clear:
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.endswith(".json"):
+                    os.unlink(os.path.join(directory, name))
+        tty.msg("Removed the lock statistics")
+        return
+
+    stats, nprocesses = spack.util.lock.read_statistics(directory)
+    if args.json:
+        json.dump({key: entry.to_dict() for key, entry in stats.items()}, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+
+    if not stats:
+        tty.msg(
+            f"No lock statistics in {directory}", "Set config:lock_stats to true to record them"
+        )
+        return
+
+    tty.msg(f"Statistics of {nprocesses} processes")
+    ordered = sorted(stats.items(), key=lambda item: item[1].wait_time, reverse=True)
+    if args.limit > 0:
+        ordered = ordered[: args.limit]
+    print(
+        f"{'wait [s]':>8}  {'max [s]':>7}  {'acquired':>8}  {'attempts':>8}  "
+        f"{'upgrades':>8}  {'timeouts':>8}  lock"
+    )
+    for key, entry in ordered:
+        print(
+            f"{entry.wait_time:8.2f}  {entry.max_wait_time:7.2f}  {entry.acquisitions:8d}  "
+            f"{entry.attempts:8d}  {entry.upgrades:8d}  {entry.timeouts:8d}  {key}"
+        )
+
+
 def debug(parser, args):
     if args.debug_command == "report":
         report(args)
+    elif args.debug_command == "locks":
+        locks(args)
@@ -13,6 +13,7 @@
 import spack.repo
 import spack.store
 from spack.cmd.common import arguments
+from spack.solver.input_analysis import create_graph_analyzer
 
 description = "show packages that depend on another"
 section = "basic"
@@ -46,18 +47,19 @@ def inverted_dependencies():
     dependents of, e.g., `mpi`, but virtuals are not included as
     actual dependents.
     """
+    graph = create_graph_analyzer(static_analysis=False)
     dag = collections.defaultdict(set)
-    for pkg_cls in spack.repo.PATH.all_package_classes():
-        for _, deps_by_name in pkg_cls.dependencies.items():
-            for dep in deps_by_name:
-                deps = [dep]
+    for pkg_name in spack.repo.PATH.all_package_names():
+        for dep in graph.direct_dependencies(pkg_name):
+            deps = [dep]
 
-                # expand virtuals if necessary
-                if spack.repo.PATH.is_virtual(dep):
-                    deps += [s.name for s in spack.repo.PATH.providers_for(dep)]
+            # expand virtuals if necessary
+            if spack.repo.PATH.is_virtual(dep):
+                deps += [s.name for s in spack.repo.PATH.providers_for(dep)]
 
-                for d in deps:
-                    dag[d].add(pkg_cls.name)
+            for d in deps:
+                dag[d].add(pkg_name)
+    graph.flush()
     return dag
 
 
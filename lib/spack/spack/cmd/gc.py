@@ -45,28 +45,28 @@ def setup_parser(subparser):
 
 def roots_from_environments(args, active_env):
     # if we're using -E or -e, make a list of environments whose roots we should consider.
-    all_environments = []
+    # Roots are read from the lockfiles, without reading the environments.
+    env_dirs = []
+    root_hashes = set()
 
     # -E will garbage collect anything not needed by any env, including the current one
     if args.except_any_environment:
-        all_environments += list(ev.all_environments())
+        env_dirs += [ev.root(name) for name in ev.all_environment_names()]
         if active_env:
-            all_environments.append(active_env)
+            root_hashes |= set(active_env.concretized_order)
 
     # -e says "also preserve things needed by this particular env"
     for env_name_or_dir in args.except_environment:
         if ev.exists(env_name_or_dir):
-            env = ev.read(env_name_or_dir)
+            env_dirs.append(ev.root(env_name_or_dir))
         elif ev.is_env_dir(env_name_or_dir):
-            env = ev.Environment(env_name_or_dir)
+            env_dirs.append(env_name_or_dir)
         else:
             tty.die(f"No such environment: '{env_name_or_dir}'")
-        all_environments.append(env)
 
     # add root hashes from all considered environments to list of roots
-    root_hashes = set()
-    for env in all_environments:
-        root_hashes |= set(env.concretized_order)
+    for env_dir in env_dirs:
+        root_hashes |= set(ev.concretized_root_hashes(env_dir))
 
     return root_hashes
 
@@ -85,6 +85,13 @@ def setup_parser(subparser):
         help="phase to stop after when installing (default None)",
     )
     arguments.add_common_arguments(subparser, ["jobs"])
+    subparser.add_argument(
+        "-p",
+        "--concurrent-packages",
+        type=int,
+        default=None,
+        help="maximum number of packages to build at the same time, sharing the build jobs",
+    )
     subparser.add_argument(
         "--overwrite",
         action="store_true",
@@ -323,6 +330,13 @@ def install(parser, args):
     if args.no_checksum:
         spack.config.set("config:checksum", False, scope="command_line")
 
+    if args.concurrent_packages is not None:
+        if args.concurrent_packages < 1:
+            tty.die("the number of concurrent packages must be at least 1")
+        spack.config.set(
+            "config:concurrent_packages", args.concurrent_packages, scope="command_line"
+        )
+
     if args.log_file and not args.log_format:
         msg = "the '--log-format' must be specified when using '--log-file'"
         tty.die(msg)
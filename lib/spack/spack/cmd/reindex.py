@@ -2,6 +2,8 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import argparse
+
 import spack.store
 
 description = "rebuild Spack's package database"
@@ -9,5 +11,22 @@
 level = "long"
 
 
+def _positive_int(value: str) -> int:
+    jobs = int(value)
+    if jobs < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return jobs
+
+
+def setup_parser(subparser):
+    subparser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=None,
+        help="number of threads searching the install tree for prefixes",
+    )
+
+
 def reindex(parser, args):
-    spack.store.STORE.reindex()
+    spack.store.STORE.reindex(jobs=args.jobs)
@@ -15,6 +15,7 @@
 import spack.environment
 import spack.hash_types as ht
 import spack.solver.asp as asp
+import spack.solver.benchmark as benchmark
 import spack.spec
 
 description = "concretize a specs using an ASP solver"
@@ -48,6 +49,38 @@ def setup_parser(subparser):
         "--stats", action="store_true", default=False, help="print out statistics from clingo"
     )
 
+    benchmark = subparser.add_argument_group("benchmark")
+    benchmark.add_argument(
+        "--benchmark",
+        metavar="REPORT",
+        default=None,
+        help="solve each spec separately and write timings and statistics to a JSON report",
+    )
+    benchmark.add_argument(
+        "--corpus",
+        metavar="FILE",
+        default=None,
+        help="file with the specs to be benchmarked, one per line",
+    )
+    benchmark.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="number of times each spec is solved in a benchmark (default: 3)",
+    )
+    benchmark.add_argument(
+        "--baseline",
+        metavar="REPORT",
+        default=None,
+        help="compare the benchmark against a previous report, and fail on regressions",
+    )
+    benchmark.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative increase considered a regression when comparing (default: 0.1)",
+    )
+
     spack.cmd.spec.setup_parser(subparser)
 
 
@@ -55,6 +88,8 @@ def _process_result(result, show, required_format, kwargs):
     opt, _, _ = min(result.answers)
     if ("opt" in show) and (not required_format):
         tty.msg("Best of %d considered solutions." % result.nmodels)
+        if result.optimal is False:
+            tty.warn("The solve was interrupted, so the solution is not proven to be optimal")
         tty.msg("Optimization Criteria:")
 
         maxlen = max(len(s[2]) for s in result.criteria)
@@ -91,6 +126,34 @@ def _process_result(result, show, required_format, kwargs):
         tty.msg(asp.Result.format_unsolved(result.unsolved_specs))
 
 
+def _benchmark(specs, args):
+    if args.repeat < 1:
+        tty.die("the number of repetitions must be a positive integer")
+
+    allow_deprecated = spack.config.get("config:deprecated", False)
+    report = benchmark.run(specs, repeat=args.repeat, allow_deprecated=allow_deprecated)
+    benchmark.write_report(report, args.benchmark)
+
+    for entry in report["specs"]:
+        seconds = entry["seconds"]
+        phases = " ".join(f"{p}={seconds[p]['min']:.3f}s" for p in benchmark.PHASES)
+        tty.msg(f"{entry['spec']}: total={seconds['total']['min']:.3f}s {phases}")
+    tty.msg(f"Benchmark report written to {args.benchmark}")
+
+    if args.baseline is None:
+        return
+
+    regressions = benchmark.compare(
+        report, benchmark.read_report(args.baseline), threshold=args.threshold
+    )
+    if regressions:
+        tty.die(
+            f"{len(regressions)} regressions with respect to {args.baseline}:",
+            *(str(x) for x in regressions),
+        )
+    tty.msg(f"No regressions with respect to {args.baseline}")
+
+
 def solve(parser, args):
     # these are the same options as `spack spec`
     install_status_fn = spack.spec.Spec.install_status
@@ -126,11 +189,17 @@ def solve(parser, args):
     env = spack.environment.active_environment()
     if args.specs:
         specs = spack.cmd.parse_specs(args.specs)
+    elif args.corpus:
+        specs = spack.cmd.parse_specs(benchmark.read_corpus(args.corpus))
     elif env:
         specs = list(env.user_specs)
     else:
         tty.die("spack solve requires at least one spec or an active environment")
 
+    if args.benchmark:
+        _benchmark(specs, args)
+        return
+
     solver = asp.Solver()
     output = sys.stdout if "asp" in show else None
     setup_only = set(show) == {"asp"}
@@ -18,6 +18,10 @@
 
 CHECK_COMPILER_EXISTENCE = True
 
+#: Solver used by worker processes when concretizing specs separately. It is set in the parent
+#: process before forking, so that the part of the setup it shares among solves is inherited.
+_SHARED_SOLVER: Optional["spack.solver.asp.Solver"] = None
+
 
 @contextmanager
 def disable_compiler_existence_check():
@@ -122,6 +126,7 @@ def concretize_separately(
             will have test dependencies. If False, test dependencies will be disregarded.
     """
     from spack.bootstrap import ensure_bootstrap_configuration, ensure_clingo_importable_or_raise
+    from spack.solver.asp import Solver
 
     to_concretize = [abstract for abstract, concrete in spec_list if not concrete]
     args = [
@@ -153,6 +158,14 @@ def concretize_separately(
             (abstract, concrete) for abstract, concrete in spec_list if concrete
         ]
 
+    # Compute the part of the setup that is common to all the specs only once. Worker
+    # processes inherit it when they are forked.
+    global _SHARED_SOLVER
+    start = time.time()
+    shared_solver = Solver()
+    shared_solver.prepare([abstract for abstract in to_concretize if not abstract.concrete])
+    tty.debug(f"Setup shared among all the specs computed in {time.time() - start:.1f}s")
+
     # Solve the environment in parallel on Linux
     # TODO: support parallel concretization on macOS and Windows
     num_procs = min(len(args), spack.config.determine_number_of_jobs(parallel=True))
@@ -162,18 +175,26 @@ def concretize_separately(
         msg += f" pool with {num_procs} processes"
     tty.msg(msg)
 
-    for j, (i, concrete, duration) in enumerate(
-        spack.util.parallel.imap_unordered(
-            _concretize_task, args, processes=num_procs, debug=tty.is_debug(), maxtaskperchild=1
-        )
-    ):
-        ret.append((i, concrete))
-        percentage = (j + 1) / len(args) * 100
-        tty.verbose(
-            f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
-            f"{to_concretize[i].colored_str}"
-        )
-        sys.stdout.flush()
+    _SHARED_SOLVER, saved_solver = shared_solver, _SHARED_SOLVER
+    try:
+        for j, (i, concrete, duration) in enumerate(
+            spack.util.parallel.imap_unordered(
+                _concretize_task,
+                args,
+                processes=num_procs,
+                debug=tty.is_debug(),
+                maxtaskperchild=1,
+            )
+        ):
+            ret.append((i, concrete))
+            percentage = (j + 1) / len(args) * 100
+            tty.verbose(
+                f"{duration:6.1f}s [{percentage:3.0f}%] {concrete.cformat('{hash:7}')} "
+                f"{to_concretize[i].colored_str}"
+            )
+            sys.stdout.flush()
+    finally:
+        _SHARED_SOLVER = saved_solver
 
     # Add specs in original order
     ret.sort(key=lambda x: x[0])
@@ -187,7 +208,7 @@ def _concretize_task(packed_arguments: Tuple[int, str, TestsType]) -> Tuple[int,
     index, spec_str, tests = packed_arguments
     with tty.SuppressOutput(msg_enabled=False):
         start = time.time()
-        spec = concretize_one(Spec(spec_str), tests=tests)
+        spec = _concretize_one(Spec(spec_str), tests=tests, solver=_SHARED_SOLVER)
         return index, spec, time.time() - start
 
 
@@ -198,6 +219,14 @@ def concretize_one(spec: Union[str, Spec], tests: TestsType = False) -> Spec:
         tests: if False disregard 'test' dependencies, if a list of names activate them for
             the packages in the list, if True activate 'test' dependencies for all packages.
     """
+    return _concretize_one(spec, tests=tests)
+
+
+def _concretize_one(
+    spec: Union[str, Spec],
+    tests: TestsType = False,
+    solver: Optional["spack.solver.asp.Solver"] = None,
+) -> Spec:
     from spack.solver.asp import Solver, SpecBuilder
 
     if isinstance(spec, str):
@@ -214,7 +243,8 @@ def concretize_one(spec: Union[str, Spec], tests: TestsType = False) -> Spec:
             )
 
     allow_deprecated = spack.config.get("config:deprecated", False)
-    result = Solver().solve([spec], tests=tests, allow_deprecated=allow_deprecated)
+    solver = solver or Solver()
+    result = solver.solve([spec], tests=tests, allow_deprecated=allow_deprecated)
 
     # take the best answer
     opt, i, answer = min(result.answers)
@@ -17,8 +17,15 @@
 provides a cache and a sanity checking mechanism for what is in the
 filesystem.
 """
+import bisect
+import collections.abc
+import concurrent.futures
 import contextlib
 import datetime
+import gzip
+import hashlib
+import io
+import itertools
 import os
 import pathlib
 import socket
@@ -33,6 +40,7 @@
     Generator,
     Iterable,
     List,
+    MutableMapping,
     NamedTuple,
     Optional,
     Set,
@@ -131,9 +139,115 @@
 # Verifier file to check last modification of the DB
 _INDEX_VERIFIER_FILE = "index_verifier"
 
+#: File where changes to the database are appended, when the journal is enabled
+INDEX_JOURNAL_FILE = "index.journal"
+
+#: Packed copy of the index file, written next to it when the packed format is enabled. Its
+#: header records the status of the index file it was packed from.
+_INDEX_PACKED_FILE = "index.packed"
+
+#: File where the spec files read by a reindex are recorded, so that it can be resumed
+_REINDEX_CHECKPOINT_FILE = "reindex.checkpoint"
+
+#: Minimum number of seconds between progress messages during a reindex
+_REINDEX_PROGRESS_INTERVAL = 10
+
+#: The journal is compacted into the index file once it is larger than this fraction
+#: of the index file...
+_JOURNAL_COMPACTION_RATIO = 0.25
+
+#: ...and larger than this number of bytes
+_JOURNAL_MIN_COMPACTION_SIZE = 64 * 1024
+
 # Lockfile for the database
 _LOCK_FILE = "lock"
 
+#: Version of the layout of packed databases, which is stored in their header
+_PACKED_FORMAT_VERSION = 1
+
+#: Fields of the spec nodes in a packed database whose values are stored only once, in a
+#: table, and referred to by their position in that table. These values are the same for
+#: most of the specs in a database, and account for most of its size.
+_PACKED_NODE_FIELDS = ("arch", "compiler", "parameters", "patches", "external", "build_spec")
+
+#: Packed databases are gzip compressed, so they start with the gzip magic number
+_PACKED_MAGIC = b"\x1f\x8b"
+
+
+def _snapshot_id(stat_result: os.stat_result) -> List[int]:
+    """Identifies an index file, so that a journal is replayed only on top of the index it
+    extends.
+    """
+    return [stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def pack_database(database: Dict[str, Any], **metadata: Any) -> bytes:
+    """Returns the packed form of a database in JSON format.
+
+    A packed database is made of three JSON lines, compressed with gzip: a header with the
+    version of the database and the given metadata, a table with the values of the fields
+    in ``_PACKED_NODE_FIELDS``, and the install records, where those fields are replaced by
+    the position of their value in the table. Packed databases are much smaller than JSON
+    databases, and faster to read.
+    """
+    values: List[Any] = []
+    positions: Dict[str, int] = {}
+    installs = {}
+    for key, rec in database["database"]["installs"].items():
+        node = dict(rec["spec"])
+        for field in _PACKED_NODE_FIELDS:
+            if field not in node:
+                continue
+            value_key = sjson.dump(node[field])
+            position = positions.get(value_key)
+            if position is None:
+                position = positions[value_key] = len(values)
+                values.append(node[field])
+            node[field] = position
+        installs[key] = {**rec, "spec": node}
+
+    header = {
+        **metadata,
+        "packed_database": {
+            "format": _PACKED_FORMAT_VERSION,
+            "version": database["database"]["version"],
+        },
+    }
+    lines = (sjson.dump(header), sjson.dump(values), sjson.dump(installs), "")
+    return gzip.compress("\n".join(lines).encode("utf-8"))
+
+
+def read_packed_header(data: bytes) -> Dict[str, Any]:
+    """Returns the header of a packed database, without reading the rest of it."""
+    with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+        return _packed_header(f.readline())
+
+
+def _packed_header(line: bytes) -> Dict[str, Any]:
+    header = sjson.load(line.decode("utf-8"))
+    version = header["packed_database"]["format"]
+    if version > _PACKED_FORMAT_VERSION:
+        raise ValueError(f"unsupported format of packed database: {version}")
+    return header
+
+
+def unpack_database(data: bytes) -> Dict[str, Any]:
+    """Returns a packed database in JSON format. The metadata in the header of the packed
+    database are returned as top-level attributes.
+    """
+    header_line, values_line, installs_line = gzip.decompress(data).split(b"\n", 2)
+    header = _packed_header(header_line)
+    values = sjson.load(values_line.decode("utf-8"))
+    installs = sjson.load(installs_line.decode("utf-8"))
+    for rec in installs.values():
+        node = rec["spec"]
+        for field in _PACKED_NODE_FIELDS:
+            if field in node:
+                node[field] = values[node[field]]
+
+    packed = header.pop("packed_database")
+    return {**header, "database": {"version": packed["version"], "installs": installs}}
+
 
 @llnl.util.lang.memoized
 def _getfqdn():
@@ -265,6 +379,269 @@ def from_dict(cls, spec, dictionary):
         return InstallRecord(spec, **d)
 
 
+#: Width, in seconds, of the buckets used to index installation times
+INSTALLATION_TIME_BUCKET = 24 * 3600
+
+
+class RecordIndex:
+    """Secondary indexes over the install records of a database.
+
+    Records are indexed by package name, by origin, by a coarse bucket of their installation
+    time, and by whether they are explicit, so that a query only iterates over the records
+    that can possibly match it. The indexes select a superset of the matching records, and
+    queries still check all of their criteria on each selected record.
+
+    Every index maps a value to an insertion ordered dictionary of DAG hashes, so that
+    selected records keep the order in which they were added to the database.
+    """
+
+    def __init__(self) -> None:
+        self.by_name: Dict[str, Dict[str, None]] = {}
+        self.by_origin: Dict[Optional[str], Dict[str, None]] = {}
+        self.by_time_bucket: Dict[int, Dict[str, None]] = {}
+        self.explicit: Dict[str, None] = {}
+
+        #: Values under which each hash is currently indexed
+        self._entries: Dict[str, Tuple[str, Optional[str], int, bool]] = {}
+
+    @staticmethod
+    def from_records(records: MutableMapping[str, InstallRecord]) -> "RecordIndex":
+        """Creates the indexes for a dictionary of install records, keyed by DAG hash"""
+        index = RecordIndex()
+        for key, record in records.items():
+            index.update(key, record)
+        return index
+
+    def update(self, key: str, record: InstallRecord) -> None:
+        """Indexes a record that was added or modified"""
+        self._update(
+            key, record.spec.name, record.origin, record.installation_time, record.explicit
+        )
+
+    def update_from_dict(self, key: str, name: str, rec_dict: Dict[str, Any]) -> None:
+        """Indexes a record read from a database file, without constructing its spec"""
+        self._update(
+            key,
+            name,
+            rec_dict.get("origin"),
+            rec_dict["installation_time"],
+            rec_dict.get("explicit", False),
+        )
+
+    def _update(
+        self, key: str, name: str, origin: Optional[str], installation_time: float, explicit: bool
+    ) -> None:
+        entry = (name, origin, int(installation_time // INSTALLATION_TIME_BUCKET), bool(explicit))
+        old = self._entries.get(key)
+        if old == entry:
+            return
+
+        self.discard(key)
+        self._entries[key] = entry
+        name, origin, bucket, explicit = entry
+        self.by_name.setdefault(name, {})[key] = None
+        self.by_origin.setdefault(origin, {})[key] = None
+        self.by_time_bucket.setdefault(bucket, {})[key] = None
+        if explicit:
+            self.explicit[key] = None
+
+    def discard(self, key: str) -> None:
+        """Removes a record from the indexes, if present"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        name, origin, bucket, _ = entry
+        for index, value in ((self.by_name, name), (self.by_origin, origin)):
+            index[value].pop(key, None)
+            if not index[value]:
+                del index[value]
+        self.by_time_bucket[bucket].pop(key, None)
+        if not self.by_time_bucket[bucket]:
+            del self.by_time_bucket[bucket]
+        self.explicit.pop(key, None)
+
+    def select(
+        self,
+        *,
+        names: Optional[Iterable[str]] = None,
+        explicit: Optional[bool] = None,
+        origin: Optional[str] = None,
+        start_date: Optional[datetime.datetime] = None,
+        end_date: Optional[datetime.datetime] = None,
+    ) -> Optional[Iterable[str]]:
+        """Returns the hashes of the records that may match the criteria in input, or None if
+        none of the criteria can be answered by the indexes.
+        """
+        candidates: List[Dict[str, None]] = []
+        if names is not None:
+            candidates.append(_union(self.by_name.get(name, {}) for name in dict.fromkeys(names)))
+        if explicit:
+            candidates.append(self.explicit)
+        if origin:
+            candidates.append(self.by_origin.get(origin, {}))
+        if start_date or end_date:
+            try:
+                lo = (
+                    int(start_date.timestamp() // INSTALLATION_TIME_BUCKET) if start_date else None
+                )
+                hi = int(end_date.timestamp() // INSTALLATION_TIME_BUCKET) if end_date else None
+            except (OverflowError, ValueError, OSError):
+                # Dates too far in the past or in the future select all the records
+                pass
+            else:
+                candidates.append(
+                    _union(
+                        keys
+                        for bucket, keys in self.by_time_bucket.items()
+                        if (lo is None or lo <= bucket) and (hi is None or bucket <= hi)
+                    )
+                )
+
+        if not candidates:
+            return None
+
+        smallest, *others = sorted(candidates, key=len)
+        return [key for key in smallest if all(key in other for other in others)]
+
+
+def _name_and_node_dict(spec_dict: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    """Returns the package name, and the node dictionary, of the spec in an install record"""
+    if "name" in spec_dict:
+        return spec_dict["name"], spec_dict
+    # old format, where the node is keyed by name
+    name = next(iter(spec_dict))
+    return name, spec_dict[name]
+
+
+def _dependency_edges(record: InstallRecord) -> List[Tuple[str, dt.DepFlag]]:
+    """Returns the DAG hashes of the dependencies of a record, with the types of the edges"""
+    return [
+        (edge.spec.dag_hash(), edge.depflag)
+        for edge in record.spec.edges_to_dependencies(depflag=_TRACKED_DEPENDENCIES)
+    ]
+
+
+def _union(dicts: Iterable[Dict[str, None]]) -> Dict[str, None]:
+    result: Dict[str, None] = {}
+    for d in dicts:
+        result.update(d)
+    return result
+
+
+class LazyInstallRecords(collections.abc.MutableMapping):
+    """Install records read from a database file, keyed by DAG hash.
+
+    The spec of a record, together with the specs of its dependencies, is constructed the first
+    time the record is accessed, so that commands touching only a few records don't pay for
+    reading the entire database. The dependents of a spec are constructed the first time they
+    are accessed, so that specs in the database always have all of their edges.
+    """
+
+    def __init__(
+        self,
+        db: "Database",
+        spec_reader: Type["spack.spec.SpecfileReaderBase"],
+        installs: Dict[str, Any],
+        dependents: Dict[str, List[str]],
+        *,
+        write_as_read: bool,
+    ) -> None:
+        """
+        Args:
+            db: database the records belong to
+            spec_reader: reader for the specs in the records
+            installs: dictionaries of the records, keyed by DAG hash
+            dependents: DAG hashes of the dependents of each record in ``installs``
+            write_as_read: whether the dictionaries of records that were never accessed can be
+                written back as they are
+        """
+        self.db = db
+        self.spec_reader = spec_reader
+        self.dependents = dependents
+        self.write_as_read = write_as_read
+        #: Values are either install records, or dictionaries of records not accessed yet
+        self._entries: Dict[str, Union[InstallRecord, Dict[str, Any]]] = dict(installs)
+
+    def __getitem__(self, key: str) -> InstallRecord:
+        entry = self._entries[key]
+        if isinstance(entry, InstallRecord):
+            return entry
+        return self._construct(key, entry)
+
+    def __setitem__(self, key: str, record: InstallRecord) -> None:
+        self._entries[key] = record
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def to_dict(self, key: str, include_fields: Tuple[str, ...]) -> Dict[str, Any]:
+        """Returns the dictionary to be written for a record, without constructing its spec
+        if it was never accessed.
+        """
+        entry = self._entries[key]
+        if isinstance(entry, InstallRecord):
+            return entry.to_dict(include_fields=include_fields)
+        elif self.write_as_read:
+            return entry
+        return self._construct(key, entry).to_dict(include_fields=include_fields)
+
+    def _construct(self, key: str, rec_dict: Dict[str, Any]) -> InstallRecord:
+        installs = {key: rec_dict}
+        try:
+            spec = self.db._read_spec_from_dict(self.spec_reader, key, installs)
+            spec._dependents = spack.spec._LazyEdgeMap(
+                store_by_child=False, load=lambda: self.construct_dependents(key)
+            )
+            record = InstallRecord.from_dict(spec, rec_dict)
+            # Dependencies are looked up in this mapping, so they are constructed first
+            self._entries[key] = record
+            self.db._assign_dependencies(self.spec_reader, key, installs, self)
+        except (CorruptDatabaseError, MissingDependenciesError):
+            self._entries[key] = rec_dict
+            raise
+        except Exception as e:
+            self._entries[key] = rec_dict
+            raise self.db._invalid_record(key, e) from e
+
+        # Mark the spec concrete only after all dependencies are connected, to avoid
+        # caching hashes prematurely
+        spec._mark_root_concrete()
+        return record
+
+    def dependency_edges(self, key: str) -> List[Tuple[str, dt.DepFlag]]:
+        """Returns the DAG hashes of the dependencies of a record, with the types of the edges
+        to them, without constructing its spec if it was never accessed.
+        """
+        entry = self._entries[key]
+        if isinstance(entry, InstallRecord):
+            return _dependency_edges(entry)
+        _, node = _name_and_node_dict(entry["spec"])
+        if not node.get("dependencies"):
+            return []
+        return [
+            (dep_hash, dt.canonicalize(deptypes))
+            for _, dep_hash, deptypes, *_ in self.spec_reader.read_specfile_dep_specs(
+                node["dependencies"]
+            )
+        ]
+
+    def construct_dependents(self, key: str) -> None:
+        """Constructs the records depending on the record with the given key"""
+        for parent_key in self.dependents.get(key, ()):
+            if parent_key in self._entries:
+                self[parent_key]
+
+
 class ForbiddenLockError(SpackError):
     """Raised when an upstream DB attempts to acquire a lock"""
 
@@ -563,6 +940,56 @@ def _path(self, spec: "spack.spec.Spec") -> pathlib.Path:
 SelectType = Callable[[InstallRecord], bool]
 
 
+def _new_nodes(spec: "spack.spec.Spec", written: Set[str]) -> List[Dict[str, Any]]:
+    """Returns the node dicts of a spec, and of its dependencies and build specs, whose DAG
+    hash is not in ``written``, which is updated. The root comes first, if it's returned."""
+    nodes = []
+    stack = [spec]
+    while stack:
+        node = stack.pop()
+        hash_key = node.dag_hash()
+        if hash_key in written:
+            continue
+        written.add(hash_key)
+        nodes.append(node.node_dict_with_hashes())
+        stack.extend(node.dependencies(deptype=ht.dag_hash.depflag))
+        if node.build_spec is not node:
+            stack.append(node.build_spec)
+    return nodes
+
+
+def _specs_from_checkpoint(
+    nodes: Dict[str, Dict[str, Any]], roots: Dict[str, str]
+) -> Dict[str, "spack.spec.Spec"]:
+    """Constructs the specs with the given root hashes, keyed by prefix, from the nodes of a
+    reindex checkpoint. Specs with missing nodes are left out, so that they are read again."""
+    specs = {}
+    for prefix, hash_key in roots.items():
+        spec_nodes, seen, stack = [], set(), [hash_key]
+        try:
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                node = nodes[current]
+                spec_nodes.append(node)
+                stack.extend(dep[ht.dag_hash.name] for dep in node.get("dependencies", ()))
+                if "build_spec" in node:
+                    stack.append(node["build_spec"][ht.dag_hash.name])
+            specs[prefix] = spack.spec.Spec.from_dict(
+                {
+                    "spec": {
+                        "_meta": {"version": spack.spec.SPECFILE_FORMAT_VERSION},
+                        "nodes": spec_nodes,
+                    }
+                }
+            )
+        except (KeyError, TypeError, SpackError):
+            continue
+    return specs
+
+
 class Database:
     #: Fields written for each install record
     record_fields: Tuple[str, ...] = DEFAULT_INSTALL_RECORD_FIELDS
@@ -575,6 +1002,10 @@ def __init__(
         is_upstream: bool = False,
         lock_cfg: LockConfiguration = DEFAULT_LOCK_CFG,
         layout: Optional[DirectoryLayout] = None,
+        journal: bool = False,
+        packed: bool = False,
+        cache_dir: Optional[str] = None,
+        snapshot_reads: bool = False,
     ) -> None:
         """Database for Spack installations.
 
@@ -594,6 +1025,18 @@ def __init__(
             is_upstream: whether this repository is an upstream.
             lock_cfg: configuration for the locks to be used by this repository.
                 Relevant only if the repository is not an upstream.
+            journal: if True, changes are appended to an ``index.journal`` file next to the
+                index, which is rewritten only when the journal grows too large. Journals
+                written by other processes are always read, regardless of this setting.
+            packed: if True, a packed copy of the index is written next to it, and read
+                instead of the index as long as the index is not modified. The index itself
+                is always written in JSON, so that older versions of Spack can read it.
+                Packed copies are read regardless of this setting.
+            cache_dir: directory where a packed copy of the index is kept, and read instead of
+                the index as long as the index is not modified. This speeds up reading
+                databases that are written rarely, like upstreams.
+            snapshot_reads: if True, read transactions don't take the lock, and read the
+                latest index published by writers (see ``read_transaction``)
         """
         self.root = root
         self.database_directory = pathlib.Path(self.root) / _DB_DIRNAME
@@ -602,6 +1045,9 @@ def __init__(
         # Set up layout of database files within the db dir
         self._index_path = self.database_directory / INDEX_JSON_FILE
         self._verifier_path = self.database_directory / _INDEX_VERIFIER_FILE
+        self._packed_path = self.database_directory / _INDEX_PACKED_FILE
+        self._journal_path = self.database_directory / INDEX_JOURNAL_FILE
+        self._reindex_checkpoint_path = self.database_directory / _REINDEX_CHECKPOINT_FILE
         self._lock_path = self.database_directory / _LOCK_FILE
 
         self.is_upstream = is_upstream
@@ -629,7 +1075,32 @@ def __init__(
                 desc="database",
                 enable=lock_cfg.enable,
             )
-        self._data: Dict[str, InstallRecord] = {}
+        self._data: MutableMapping[str, InstallRecord] = {}
+
+        # Secondary indexes over the records in self._data, used to speed-up queries
+        self._index = RecordIndex()
+
+        # Keys of the records changed since the last write, mapped to whether their spec
+        # must be written too (i.e. whether the record is new)
+        self.journal = journal
+        self.packed = packed
+        self.snapshot_reads = snapshot_reads
+        # Depth of the read transactions currently open without taking the lock
+        self._snapshot_depth = 0
+        self._changes: Dict[str, bool] = {}
+        # Offset of the end of the last complete entry in the journal, or None if the
+        # journal doesn't extend the current index file
+        self._journal_end: Optional[int] = None
+        # Whether the next write must rewrite the entire index file
+        self._compact = False
+
+        # Maximum number of changed records, and maximum number of seconds, for which writes
+        # are deferred, or None if they are not (see batched_writes)
+        self._batch: Optional[Tuple[int, float]] = None
+        # Records changed by deferred writes, or None if removed, and the time of the first
+        # deferred write
+        self._pending: Dict[str, Optional[InstallRecord]] = {}
+        self._pending_since: Optional[float] = None
 
         # For every installed spec we keep track of its install prefix, so that
         # we can answer the simple query whether a given path is already taken
@@ -638,6 +1109,22 @@ def __init__(
 
         self.upstream_dbs = list(upstream_dbs) if upstream_dbs else []
 
+        # Map from the hashes of the specs in upstream databases to the positions of the
+        # upstreams containing them, and the sorted list of those hashes, together with the
+        # upstream records they were computed from
+        self._upstream_hashes: Optional[
+            Tuple[
+                List[Tuple[MutableMapping[str, InstallRecord], int]],
+                Dict[str, List[int]],
+                List[str],
+            ]
+        ] = None
+
+        self._cache_path: Optional[pathlib.Path] = None
+        if cache_dir is not None:
+            digest = hashlib.sha256(str(self.database_directory).encode("utf-8")).hexdigest()
+            self._cache_path = pathlib.Path(cache_dir) / f"{digest[:32]}.packed"
+
         self._write_transaction_impl = lk.WriteTransaction
         self._read_transaction_impl = lk.ReadTransaction
 
@@ -650,10 +1137,33 @@ def write_transaction(self):
         """Get a write lock context manager for use in a `with` block."""
         return self._write_transaction_impl(self.lock, acquire=self._read, release=self._write)
 
-    def read_transaction(self):
-        """Get a read lock context manager for use in a `with` block."""
+    def read_transaction(self, *, locked: bool = False):
+        """Get a read lock context manager for use in a `with` block.
+
+        If the database uses snapshot reads, the transaction doesn't take the lock, unless
+        ``locked`` is True or this process already holds it. It reads the index and the journal
+        as published by the last complete write: the index is replaced atomically by renaming
+        it, and entries of the journal that are incomplete, or that extend a different index,
+        are skipped. The data read may miss writes that other processes complete while the
+        transaction is open, or that are not yet visible on network file systems, so callers
+        that act on the absence of a record must pass ``locked=True``.
+        """
+        if self.snapshot_reads and not locked and not self.is_upstream and not self.lock.is_held():
+            return self._snapshot_read_transaction()
         return self._read_transaction_impl(self.lock, acquire=self._read)
 
+    @contextlib.contextmanager
+    def _snapshot_read_transaction(self) -> Generator[None, None, None]:
+        """Read transaction that doesn't take the lock. Only the outermost one reads the
+        database, so that nested transactions see the same data."""
+        if self._snapshot_depth == 0:
+            self._read()
+        self._snapshot_depth += 1
+        try:
+            yield
+        finally:
+            self._snapshot_depth -= 1
+
     def _write_to_file(self, stream):
         """Write out the database in JSON format to the stream passed
         as argument.
@@ -661,11 +1171,21 @@ def _write_to_file(self, stream):
         This function does not do any locking or transactions.
         """
         self._ensure_parent_directories()
+        database = self._to_dict()
+        try:
+            sjson.dump(database, stream)
+        except (TypeError, ValueError) as e:
+            raise sjson.SpackJSONError("error writing JSON database:", str(e))
 
+    def _to_dict(self) -> Dict[str, Any]:
+        """Returns the content of the database, in the layout of its JSON format."""
         # map from per-spec hash code to installation record.
-        installs = dict(
-            (k, v.to_dict(include_fields=self.record_fields)) for k, v in self._data.items()
-        )
+        if isinstance(self._data, LazyInstallRecords):
+            installs = {k: self._data.to_dict(k, self.record_fields) for k in self._data}
+        else:
+            installs = {
+                k: v.to_dict(include_fields=self.record_fields) for k, v in self._data.items()
+            }
 
         # database includes installation list and version.
 
@@ -673,7 +1193,7 @@ def _write_to_file(self, stream):
         # the same spec well.  If there are 2 identical specs with
         # different paths, it can't differentiate.
         # TODO: fix this before we support multiple install locations.
-        database = {
+        return {
             "database": {
                 # TODO: move this to a top-level _meta section if we ever
                 # TODO: bump the DB version to 7
@@ -683,11 +1203,6 @@ def _write_to_file(self, stream):
             }
         }
 
-        try:
-            sjson.dump(database, stream)
-        except (TypeError, ValueError) as e:
-            raise sjson.SpackJSONError("error writing JSON database:", str(e))
-
     def _read_spec_from_dict(self, spec_reader, hash_key, installs, hash=ht.dag_hash):
         """Recursively construct a spec from a hash in a YAML database.
 
@@ -706,19 +1221,19 @@ def _read_spec_from_dict(self, spec_reader, hash_key, installs, hash=ht.dag_hash
             spec_dict[hash.name] = hash_key
 
         # Build spec from dict first.
-        return spec_reader.from_node_dict(spec_dict)
+        return spec_reader.from_concrete_node_dict(spec_dict)
 
     def db_for_spec_hash(self, hash_key):
         with self.read_transaction():
             if hash_key in self._data:
                 return self
 
-        for db in self.upstream_dbs:
-            if hash_key in db._data:
-                return db
+        for i in self._upstream_hash_index()[0].get(hash_key, ()):
+            if hash_key in self.upstream_dbs[i]._data:
+                return self.upstream_dbs[i]
 
     def query_by_spec_hash(
-        self, hash_key: str, data: Optional[Dict[str, InstallRecord]] = None
+        self, hash_key: str, data: Optional[MutableMapping[str, InstallRecord]] = None
     ) -> Tuple[bool, Optional[InstallRecord]]:
         """Get a spec for hash, and whether it's installed upstream.
 
@@ -733,11 +1248,34 @@ def query_by_spec_hash(
             with self.read_transaction():
                 if hash_key in self._data:
                     return False, self._data[hash_key]
-        for db in self.upstream_dbs:
-            if hash_key in db._data:
-                return True, db._data[hash_key]
+        for i in self._upstream_hash_index()[0].get(hash_key, ()):
+            if hash_key in self.upstream_dbs[i]._data:
+                return True, self.upstream_dbs[i]._data[hash_key]
         return False, None
 
+    def _upstream_hash_index(self) -> Tuple[Dict[str, List[int]], List[str]]:
+        """Returns a map from the hashes of the specs in all the upstream databases to the
+        positions of the upstreams containing them, and the sorted list of those hashes, so
+        that specs are looked up in all the upstreams at once.
+
+        Upstreams are not modified once read, except when they are made writable in tests, so
+        the map is computed again only if their records are read again, or change in number.
+        Callers must still check that the records they look up are there.
+        """
+        data = [(db._data, len(db._data)) for db in self.upstream_dbs]
+        cached = self._upstream_hashes
+        if (
+            cached is None
+            or len(cached[0]) != len(data)
+            or any(x is not y or m != n for (x, m), (y, n) in zip(cached[0], data))
+        ):
+            positions: Dict[str, List[int]] = {}
+            for i, (records, _) in enumerate(data):
+                for key in records:
+                    positions.setdefault(key, []).append(i)
+            cached = self._upstream_hashes = data, positions, sorted(positions)
+        return cached[1], cached[2]
+
     def query_local_by_spec_hash(self, hash_key):
         """Get a spec by hash in the local database
 
@@ -752,7 +1290,7 @@ def _assign_dependencies(
         spec_reader: Type["spack.spec.SpecfileReaderBase"],
         hash_key: str,
         installs: dict,
-        data: Dict[str, InstallRecord],
+        data: MutableMapping[str, InstallRecord],
     ):
         # Add dependencies from other records in the install DB to
         # form a full spec.
@@ -782,7 +1320,9 @@ def _assign_dependencies(
                     )
                     continue
 
-                spec._add_dependency(child, depflag=dt.canonicalize(dtypes), virtuals=virtuals)
+                spec._add_trusted_dependency(
+                    child, depflag=dt.canonicalize(dtypes), virtuals=virtuals
+                )
 
     def _read_from_file(self, filename):
         """Fill database from file, do not maintain old data.
@@ -791,15 +1331,22 @@ def _read_from_file(self, filename):
         Does not do any locking.
         """
         try:
-            with open(str(filename), "r", encoding="utf-8") as f:
+            with open(str(filename), "rb") as f:
+                snapshot = _snapshot_id(os.fstat(f.fileno()))
+                content = f.read()
+            if content.startswith(_PACKED_MAGIC):
+                fdata = unpack_database(content)
+            else:
                 # In the future we may use a stream of JSON objects, hence `raw_decode` for compat.
-                fdata, _ = JSONDecoder().raw_decode(f.read())
+                fdata, _ = JSONDecoder().raw_decode(content.decode("utf-8"))
         except Exception as e:
             raise CorruptDatabaseError("error parsing database:", str(e)) from e
 
         if fdata is None:
             return
 
+        journal_end = None
+
         def check(cond, msg):
             if not cond:
                 raise CorruptDatabaseError("Spack database is corrupt: %s" % msg, self._index_path)
@@ -820,74 +1367,101 @@ def check(cond, msg):
             tty.warn(f"Spack database version changed from {version} to {_DB_VERSION}. Upgrading.")
 
             self.reindex()
-            installs = dict(
-                (k, v.to_dict(include_fields=self._record_fields)) for k, v in self._data.items()
-            )
-        else:
-            check("installs" in db, "no 'installs' in JSON DB.")
-            installs = db["installs"]
+            return
 
+        check("installs" in db, "no 'installs' in JSON DB.")
+        installs = db["installs"]
+        if pathlib.Path(filename) == self._index_path:
+            journal_end = self._replay_journal(installs, snapshot)
+        elif pathlib.Path(filename) == self._packed_path:
+            # The journal extends the index file the packed copy was made from
+            journal_end = self._replay_journal(installs, fdata["index_snapshot"])
+
+        # Records are turned into specs only when they are accessed, so here we just index
+        # them. The database is built up so that ALL specs in it share nodes (i.e., its specs
+        # are a true Merkle DAG, unlike most specs.)
         spec_reader = reader(version)
-
-        def invalid_record(hash_key, error):
-            return CorruptDatabaseError(
-                f"Invalid record in Spack database: hash: {hash_key}, cause: "
-                f"{type(error).__name__}: {error}",
-                self._index_path,
-            )
-
-        # Build up the database in three passes:
-        #
-        #   1. Read in all specs without dependencies.
-        #   2. Hook dependencies up among specs.
-        #   3. Mark all specs concrete.
-        #
-        # The database is built up so that ALL specs in it share nodes
-        # (i.e., its specs are a true Merkle DAG, unlike most specs.)
-
-        # Pass 1: Iterate through database and build specs w/o dependencies
-        data: Dict[str, InstallRecord] = {}
+        index = RecordIndex()
+        dependents: Dict[str, List[str]] = {}
         installed_prefixes: Set[str] = set()
         for hash_key, rec in installs.items():
             try:
-                # This constructs a spec DAG from the list of all installs
-                spec = self._read_spec_from_dict(spec_reader, hash_key, installs)
-
-                # Insert the brand new spec in the database.  Each
-                # spec has its own copies of its dependency specs.
-                # TODO: would a more immmutable spec implementation simplify
-                #       this?
-                data[hash_key] = InstallRecord.from_dict(spec, rec)
-
-                if not spec.external and "installed" in rec and rec["installed"]:
+                name, node = _name_and_node_dict(rec["spec"])
+                if not rec.get("installation_time"):
+                    rec["installation_time"] = _now()
+                index.update_from_dict(hash_key, name, rec)
+
+                if node.get("dependencies"):
+                    for _, dep_hash, *_ in spec_reader.read_specfile_dep_specs(
+                        node["dependencies"]
+                    ):
+                        dependents.setdefault(dep_hash, []).append(hash_key)
+
+                if not node.get("external") and rec.get("installed"):
                     installed_prefixes.add(rec["path"])
             except Exception as e:
-                raise invalid_record(hash_key, e) from e
+                raise self._invalid_record(hash_key, e) from e
 
-        # Pass 2: Assign dependencies once all specs are created.
-        for hash_key in data:
-            try:
-                self._assign_dependencies(spec_reader, hash_key, installs, data)
-            except MissingDependenciesError:
-                raise
-            except Exception as e:
-                raise invalid_record(hash_key, e) from e
+        self._data = LazyInstallRecords(
+            self, spec_reader, installs, dependents, write_as_read=version == _DB_VERSION
+        )
+        self._index = index
+        self._installed_prefixes = installed_prefixes
+        self._changes = {}
+        self._journal_end = journal_end
+
+    def _invalid_record(self, hash_key: str, error: Exception) -> "CorruptDatabaseError":
+        return CorruptDatabaseError(
+            f"Invalid record in Spack database: hash: {hash_key}, cause: "
+            f"{type(error).__name__}: {error}",
+            self._index_path,
+        )
 
-        # Pass 3: Mark all specs concrete.  Specs representing real
-        # installations must be explicitly marked.
-        # We do this *after* all dependencies are connected because if we
-        # do it *while* we're constructing specs,it causes hashes to be
-        # cached prematurely.
-        for hash_key, rec in data.items():
-            rec.spec._mark_root_concrete()
+    def _replay_journal(self, installs: Dict[str, Any], snapshot: List[int]) -> Optional[int]:
+        """Applies the changes in the journal to the records read from the index file.
 
-        self._data = data
-        self._installed_prefixes = installed_prefixes
+        Returns the offset after the last complete entry in the journal, or None if there is
+        no journal extending the index file that was read.
+        """
+        try:
+            with self._journal_path.open("rb") as f:
+                lines = f.read().split(b"\n")
+        except OSError:
+            return None
 
-    def reindex(self):
+        # Each line but the first holds the changes of one write transaction. The last element
+        # is either empty, or an entry that was interrupted while being written.
+        try:
+            header = sjson.load(lines[0].decode("utf-8"))
+        except ValueError:
+            return None
+        if len(lines) < 2 or not isinstance(header, dict) or header.get("snapshot") != snapshot:
+            return None
+
+        end = len(lines[0]) + 1
+        for line in lines[1:-1]:
+            try:
+                changes = sjson.load(line.decode("utf-8"))["installs"]
+            except (ValueError, KeyError, TypeError):
+                break
+
+            for hash_key, record in changes.items():
+                if record is None:
+                    installs.pop(hash_key, None)
+                elif "spec" in record:
+                    installs[hash_key] = record
+                elif hash_key in installs:
+                    installs[hash_key].update(record)
+            end += len(line) + 1
+
+        return end
+
+    def reindex(self, jobs: Optional[int] = None):
         """Build database index from scratch based on a directory layout.
 
-        Locks the DB if it isn't locked already.
+        Locks the DB if it isn't locked already. Prefixes are searched, and their spec files
+        read, by ``jobs`` threads. The spec files read are recorded in a checkpoint, so that
+        a reindex that is interrupted doesn't read them again when it is run again.
         """
         if self.is_upstream:
             raise UpstreamDatabaseLockingError("Cannot reindex an upstream database")
@@ -900,29 +1474,39 @@ def _read_suppress_error():
             try:
                 if self._index_path.is_file():
                     self._read_from_file(self._index_path)
+                    # Records are read lazily, so construct all of them to detect corrupt ones
+                    list(self._data.values())
             except CorruptDatabaseError as e:
                 tty.warn(f"Reindexing corrupt database, error was: {e}")
                 self._data = {}
+                self._index = RecordIndex()
                 self._installed_prefixes = set()
 
         with lk.WriteTransaction(self.lock, acquire=_read_suppress_error, release=self._write):
             old_installed_prefixes, self._installed_prefixes = self._installed_prefixes, set()
             old_data, self._data = self._data, {}
             try:
-                self._reindex(old_data)
+                self._reindex(old_data, jobs=jobs)
+                self._compact = True
             except BaseException:
                 # If anything explodes, restore old data, skip write.
                 self._data = old_data
+                self._index = RecordIndex.from_records(old_data)
                 self._installed_prefixes = old_installed_prefixes
                 raise
 
-    def _reindex(self, old_data: Dict[str, InstallRecord]):
+        try:
+            self._reindex_checkpoint_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _reindex(self, old_data: MutableMapping[str, InstallRecord], jobs: Optional[int] = None):
         # Specs on the file system are the source of truth for record.spec. The old database values
         # if available are the source of truth for the rest of the record.
         assert self.layout, "Database layout must be set to reindex"
 
-        specs_from_fs = self.layout.all_specs()
-        deprecated_for = self.layout.deprecated_for(specs_from_fs)
+        specs_from_fs = self._specs_from_layout(jobs)
+        deprecated_for = self.layout.deprecated_for(specs_from_fs, jobs=jobs)
 
         known_specs: List[spack.spec.Spec] = [
             *specs_from_fs,
@@ -954,12 +1538,14 @@ def create_node(edge: spack.spec.DependencySpec, is_upstream: bool):
         )
 
         # Store the prefix and other information for specs were found on the file system
-        for s in specs_from_fs:
-            record = self._data[s.dag_hash()]
-            record.path = s.prefix
-            record.installed = True
-            record.explicit = True  # conservative assumption
-            record.installation_time = os.stat(s.prefix).st_ctime
+        with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+            prefix_stats = executor.map(os.stat, [s.prefix for s in specs_from_fs])
+            for s, prefix_stat in zip(specs_from_fs, prefix_stats):
+                record = self._data[s.dag_hash()]
+                record.path = s.prefix
+                record.installed = True
+                record.explicit = True  # conservative assumption
+                record.installation_time = prefix_stat.st_ctime
 
         # Deprecate specs
         for new, old in deprecated_for:
@@ -1010,8 +1596,62 @@ def create_edge(edge: spack.spec.DependencySpec, is_upstream: bool):
             if record.deprecated_for:
                 self._data[record.deprecated_for].ref_count += 1
 
+        self._index = RecordIndex.from_records(self._data)
         self._check_ref_counts()
 
+    def _specs_from_layout(self, jobs: Optional[int]) -> List["spack.spec.Spec"]:
+        """Returns the specs of all the prefixes in the layout. The specs found are appended to
+        the reindex checkpoint, and the prefixes already in it are not read again.
+
+        Each line of the checkpoint has a prefix, the DAG hash of its spec, and the nodes of the
+        spec that are not in the previous lines, in the same format as in the index.
+        """
+        assert self.layout, "Database layout must be set to reindex"
+        try:
+            with self._reindex_checkpoint_path.open("rb") as f:
+                lines = f.read().split(b"\n")
+        except OSError:
+            lines = []
+
+        # An entry interrupted while being written is skipped
+        nodes: Dict[str, Dict[str, Any]] = {}
+        roots: Dict[str, str] = {}
+        for line in lines:
+            try:
+                entry = sjson.load(line.decode("utf-8"))
+                prefix, hash_key, entry_nodes = entry["prefix"], entry["hash"], entry["nodes"]
+                nodes.update((node[ht.dag_hash.name], node) for node in entry_nodes)
+            except (ValueError, KeyError, TypeError):
+                continue
+            roots[prefix] = hash_key
+
+        found = _specs_from_checkpoint(nodes, roots)
+        if found:
+            tty.msg(f"Resuming the reindex, {len(found)} spec files were already read")
+
+        written = set(nodes)
+        count, last_report = len(found), time.monotonic()
+        with self._reindex_checkpoint_path.open("a", encoding="utf-8") as checkpoint:
+            if lines and lines[-1]:
+                checkpoint.write("\n")
+
+            def _on_found(spec: "spack.spec.Spec") -> None:
+                nonlocal count, last_report
+                entry = {
+                    "prefix": spec.prefix,
+                    "hash": spec.dag_hash(),
+                    "nodes": _new_nodes(spec, written),
+                }
+                checkpoint.write(sjson.dump(entry) + "\n")
+                count += 1
+                now = time.monotonic()
+                if now - last_report >= _REINDEX_PROGRESS_INTERVAL:
+                    checkpoint.flush()
+                    tty.msg(f"Reindexing: read {count} spec files")
+                    last_report = now
+
+            return self.layout.all_specs(jobs=jobs, found=found, on_found=_on_found)
+
     def _check_ref_counts(self):
         """Ensure consistency of reference counts in the DB.
 
@@ -1062,19 +1702,29 @@ def _write(self, type=None, value=None, traceback=None):
             self._state_is_inconsistent = True
             return
 
+        if self._defer_write():
+            return
+
         temp_file = str(self._index_path) + (".%s.%s.temp" % (_getfqdn(), os.getpid()))
 
-        # Write a temporary database file them move it into place
+        # Append the changes to the journal if possible, otherwise write a temporary database
+        # file then move it into place
         try:
-            with open(temp_file, "w", encoding="utf-8") as f:
-                self._write_to_file(f)
-            fs.rename(temp_file, str(self._index_path))
+            if not self._append_to_journal():
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    self._write_to_file(f)
+                fs.rename(temp_file, str(self._index_path))
+                self._remove_journal()
+                if self.packed:
+                    self._write_packed_copy()
 
             if _use_uuid:
                 with self._verifier_path.open("w", encoding="utf-8") as f:
                     new_verifier = str(uuid.uuid4())
                     f.write(new_verifier)
                     self.last_seen_verifier = new_verifier
+            else:
+                self.last_seen_verifier = self._stat_verifier()
         except BaseException as e:
             tty.debug(e)
             # Clean up temp file if something goes wrong.
@@ -1082,6 +1732,232 @@ def _write(self, type=None, value=None, traceback=None):
                 os.remove(temp_file)
             raise
 
+        self._changes = {}
+        self._compact = False
+        self._pending = {}
+        self._pending_since = None
+
+    @contextlib.contextmanager
+    def batched_writes(self, max_records: int, max_seconds: float) -> Generator[None, None, None]:
+        """Context manager that defers writing changes to the database, until the changes
+        affect ``max_records`` records, or the first of them was deferred ``max_seconds`` ago.
+        All deferred changes are written when the context exits.
+
+        Deferred changes are seen by this process only, also after the database is read again
+        because of changes made by other processes. Callers must ensure that other processes
+        don't act on the specs whose changes are deferred, e.g. by holding their prefix locks.
+        """
+        if max_records <= 1:
+            yield
+            return
+
+        self._batch = max_records, max_seconds
+        try:
+            yield
+        finally:
+            self._batch = None
+            self.flush_batch()
+
+    def flush_batch(self, *, force: bool = True) -> None:
+        """Writes the deferred changes to the database. If ``force`` is False, they are written
+        only if the limits of the batch were reached.
+        """
+        if not self._pending:
+            return
+
+        batch = self._batch
+        if force:
+            self._batch = None
+        try:
+            with self.write_transaction():
+                pass
+        finally:
+            self._batch = batch
+
+    def pending_write(self, spec: "spack.spec.Spec") -> bool:
+        """Returns whether changes to the record of the spec are deferred"""
+        return spec.dag_hash() in self._pending
+
+    def _defer_write(self) -> bool:
+        """Returns True if the current changes must not be written yet, because writes are
+        batched and the limits of the batch were not reached.
+        """
+        if self._batch is None and not self._pending:
+            return False
+
+        for key in self._changes:
+            self._pending[key] = self._data.get(key)
+        if self._batch is None or not self._pending:
+            return False
+
+        max_records, max_seconds = self._batch
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        return len(self._pending) < max_records and now - self._pending_since < max_seconds
+
+    def _apply_pending(self) -> None:
+        """Applies the deferred changes again, after the database was read again."""
+        for key, record in self._pending.items():
+            current = self._data.get(key)
+            if record is None:
+                if current is not None:
+                    self._remove(current.spec)
+            elif current is None:
+                self._add(
+                    record.spec,
+                    explicit=record.explicit,
+                    installation_time=record.installation_time,
+                    allow_missing=True,
+                )
+            else:
+                current.installed = record.installed
+                current.explicit = record.explicit
+                current.deprecated_for = record.deprecated_for
+                current.installation_time = record.installation_time
+                self._record_changed(key)
+
+        self._pending = {key: self._data.get(key) for key in self._pending}
+
+    def _append_to_journal(self) -> bool:
+        """Appends the records changed since the last write to the journal.
+
+        Returns False, without writing anything, if the entire index file must be written
+        instead. This routine does no locking.
+        """
+        if not self.journal or self._compact:
+            return False
+
+        try:
+            index_stat = self._index_path.stat()
+        except OSError:
+            return False
+
+        if not self._changes:
+            return True
+
+        entry = {
+            "installs": {key: self._journal_record(key, new) for key, new in self._changes.items()}
+        }
+        content = (sjson.dump(entry) + "\n").encode("utf-8")
+        start = self._journal_end
+        if start is None:
+            # Start a new journal, extending the current index file
+            header = sjson.dump({"snapshot": _snapshot_id(index_stat)}) + "\n"
+            content = header.encode("utf-8") + content
+
+        end = (start or 0) + len(content)
+        if end > max(_JOURNAL_MIN_COMPACTION_SIZE, _JOURNAL_COMPACTION_RATIO * index_stat.st_size):
+            return False
+
+        # Truncating drops any entry left incomplete by an interrupted write
+        with self._journal_path.open("wb" if start is None else "r+b") as f:
+            f.seek(start or 0)
+            f.truncate()
+            f.write(content)
+
+        self._journal_end = end
+        return True
+
+    def _journal_record(self, key: str, new: bool) -> Optional[Dict[str, Any]]:
+        """Returns the journal entry for a changed record. Specs are written only for new
+        records, since they never change afterwards.
+        """
+        record = self._data.get(key)
+        if record is None:
+            return None
+        if new:
+            return record.to_dict(include_fields=self.record_fields)
+        return record.to_dict(include_fields=[f for f in self.record_fields if f != "spec"])
+
+    def _remove_journal(self) -> None:
+        """Removes the journal, after its changes were written to the index file."""
+        self._journal_end = None
+        try:
+            self._journal_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _stat_verifier(self) -> str:
+        """Returns a verifier derived from the status of the index file and of its journal, to
+        be used when there is no verifier file.
+        """
+        status = []
+        for path in (self._index_path, self._journal_path):
+            try:
+                status.append(_snapshot_id(path.stat()))
+            except OSError:
+                status.append(None)
+        return str(status)
+
+    def _write_packed_copy(self) -> None:
+        """Writes the packed copy of the index file, after the index file was written. A copy
+        that can't be written is not an error, since the index file is read instead. This does
+        no locking.
+        """
+        temp_file = f"{self._packed_path}.{_getfqdn()}.{os.getpid()}.temp"
+        try:
+            index_snapshot = _snapshot_id(self._index_path.stat())
+            with open(temp_file, "wb") as f:
+                f.write(pack_database(self._to_dict(), index_snapshot=index_snapshot))
+            fs.rename(temp_file, str(self._packed_path))
+        except OSError as e:
+            tty.debug(f"Cannot write the packed copy of the database in {self.root}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_file)
+
+    def _read_packed_copy(self) -> bool:
+        """Reads the packed copy of the index file, if it was made from the current index file.
+        Returns whether it was read. This does no locking.
+        """
+        try:
+            with self._packed_path.open("rb") as f:
+                header = read_packed_header(f.read())
+            if header.get("index_snapshot") == _snapshot_id(self._index_path.stat()):
+                self._read_from_file(self._packed_path)
+                return True
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            tty.debug(f"Cannot use the packed copy of the database in {self.root}: {e}")
+        return False
+
+    def _read_index(self) -> None:
+        """Reads the packed copy of the index file next to it, if it is up to date, or else
+        the index file, or its packed copy in the cache directory if the index was not modified
+        since the copy was made. This does no locking.
+        """
+        if self._read_packed_copy():
+            return
+
+        if self._cache_path is None:
+            self._read_from_file(self._index_path)
+            return
+
+        # The status is taken before reading the index, so that a copy is never considered
+        # up to date with changes it doesn't have
+        source = self._stat_verifier()
+        try:
+            with self._cache_path.open("rb") as f:
+                if read_packed_header(f.read()).get("source") == source:
+                    self._read_from_file(self._cache_path)
+                    return
+        except Exception as e:
+            tty.debug(f"Cannot use the cached copy of the database in {self.root}: {e}")
+
+        self._read_from_file(self._index_path)
+
+        temp_file = f"{self._cache_path}.{_getfqdn()}.{os.getpid()}.temp"
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_file, "wb") as f:
+                f.write(pack_database(self._to_dict(), source=source))
+            fs.rename(temp_file, str(self._cache_path))
+        except OSError as e:
+            tty.debug(f"Cannot cache the database in {self.root}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(temp_file)
+
     def _read(self):
         """Re-read Database from the data in the set location. This does no locking."""
         if self._index_path.is_file():
@@ -1092,12 +1968,16 @@ def _read(self):
                         current_verifier = f.read()
                 except BaseException:
                     pass
-            if (current_verifier != self.last_seen_verifier) or (current_verifier == ""):
+            if current_verifier == "":
+                current_verifier = self._stat_verifier()
+            if current_verifier != self.last_seen_verifier:
                 self.last_seen_verifier = current_verifier
                 # Read from file if a database exists
-                self._read_from_file(self._index_path)
+                self._read_index()
+                self._apply_pending()
             elif self._state_is_inconsistent:
                 self._read_from_file(self._index_path)
+                self._apply_pending()
                 self._state_is_inconsistent = False
             return
         elif self.is_upstream:
@@ -1175,7 +2055,8 @@ def _add(
             path = None
             installed = True
 
-        if key not in self._data:
+        is_new = key not in self._data
+        if is_new:
             # Create a new install record with no deps initially.
             new_spec = spec.copy(deps=False)
             self._data[key] = InstallRecord(
@@ -1196,6 +2077,7 @@ def _add(
                 new_spec._add_dependency(record.spec, depflag=dep.depflag, virtuals=dep.virtuals)
                 if not upstream:
                     record.ref_count += 1
+                    self._record_changed(dkey)
 
             # Mark concrete once everything is built, and preserve the original hashes of concrete
             # specs.
@@ -1209,6 +2091,18 @@ def _add(
             self._data[key].installation_time = _now()
 
         self._data[key].explicit = explicit
+        self._record_changed(key, new=is_new)
+
+    def _record_changed(self, key: str, *, new: bool = False) -> None:
+        """Updates the secondary indexes, and the changes to be written, after the record with
+        the given key was added, modified or removed.
+        """
+        record = self._data.get(key)
+        if record is None:
+            self._index.discard(key)
+        else:
+            self._index.update(key, record)
+        self._changes[key] = new or self._changes.get(key, False)
 
     @_autospec
     def add(self, spec: "spack.spec.Spec", *, explicit: bool = False, allow_missing=False) -> None:
@@ -1256,6 +2150,8 @@ def _decrement_ref_count(self, spec: "spack.spec.Spec") -> None:
             for dep in spec.dependencies(deptype=_TRACKED_DEPENDENCIES):
                 self._decrement_ref_count(dep)
 
+        self._record_changed(key)
+
     def _increment_ref_count(self, spec: "spack.spec.Spec") -> None:
         key = spec.dag_hash()
 
@@ -1264,6 +2160,7 @@ def _increment_ref_count(self, spec: "spack.spec.Spec") -> None:
 
         rec = self._data[key]
         rec.ref_count += 1
+        self._record_changed(key)
 
     def _remove(self, spec: "spack.spec.Spec") -> "spack.spec.Spec":
         """Non-locking version of remove(); does real work."""
@@ -1277,9 +2174,11 @@ def _remove(self, spec: "spack.spec.Spec") -> "spack.spec.Spec":
 
         if rec.ref_count > 0:
             rec.installed = False
+            self._record_changed(key)
             return rec.spec
 
         del self._data[key]
+        self._record_changed(key)
 
         # Remove any reference to this node from dependencies and
         # decrement the reference count
@@ -1345,6 +2244,7 @@ def _deprecate(self, spec: "spack.spec.Spec", deprecator: "spack.spec.Spec") ->
         spec_rec.deprecated_for = deprecator_key
         spec_rec.installed = False
         self._data[spec_key] = spec_rec
+        self._record_changed(spec_key)
 
     @_autospec
     def mark(self, spec: "spack.spec.Spec", key: str, value: Any) -> None:
@@ -1353,8 +2253,10 @@ def mark(self, spec: "spack.spec.Spec", key: str, value: Any) -> None:
             return self._mark(spec, key, value)
 
     def _mark(self, spec: "spack.spec.Spec", key, value) -> None:
-        record = self._data[self._get_matching_spec_key(spec)]
+        hash_key = self._get_matching_spec_key(spec)
+        record = self._data[hash_key]
         setattr(record, key, value)
+        self._record_changed(hash_key)
 
     @_autospec
     def deprecate(self, spec: "spack.spec.Spec", deprecator: "spack.spec.Spec") -> None:
@@ -1374,6 +2276,12 @@ def installed_relatives(
         if direction not in ("parents", "children"):
             raise ValueError("Invalid direction: %s" % direction)
 
+        if direction == "parents" and self.upstream_dbs:
+            # Specs in this database become dependents of specs in upstream databases only
+            # once they are constructed
+            with self.read_transaction():
+                list(self._data.values())
+
         relatives: Set[spack.spec.Spec] = set()
         for spec in self.query(spec):
             if transitive:
@@ -1478,12 +2386,24 @@ def get_by_hash(
         if spec is not None:
             return spec
 
-        for upstream_db in self.upstream_dbs:
-            spec = upstream_db._get_by_hash_local(dag_hash, default=default, installed=installed)
-            if spec is not None:
-                return spec
+        # Specs in upstreams are found with a single lookup for full hashes, and a bisection
+        # for hash prefixes. Only matches from the first upstream that has any are returned.
+        installed = normalize_query(installed)
+        positions, hashes = self._upstream_hash_index()
+        if dag_hash in positions:
+            candidates: Iterable[str] = (dag_hash,)
+        else:
+            start = bisect.bisect_left(hashes, dag_hash)
+            candidates = itertools.takewhile(lambda h: h.startswith(dag_hash), hashes[start:])
 
-        return default
+        matches: Dict[int, List["spack.spec.Spec"]] = {}
+        for key in candidates:
+            for i in positions[key]:
+                record = self.upstream_dbs[i]._data.get(key)
+                if record is not None and record.install_type_matches(installed):
+                    matches.setdefault(i, []).append(record.spec)
+
+        return matches[min(matches)] if matches else default
 
     def _query(
         self,
@@ -1500,73 +2420,86 @@ def _query(
     ) -> List["spack.spec.Spec"]:
         installed = normalize_query(installed)
 
-        # Restrict the set of records over which we iterate first
-        matching_hashes = self._data
-        if hashes is not None:
-            matching_hashes = {h: self._data[h] for h in hashes if h in self._data}
-
         if isinstance(query_spec, str):
             query_spec = spack.spec.Spec(query_spec)
 
-        if query_spec is not None and query_spec.concrete:
-            hash_key = query_spec.dag_hash()
-            if hash_key not in matching_hashes:
-                return []
-            matching_hashes = {hash_key: matching_hashes[hash_key]}
+        # Results follow the order of the hashes, if given, without duplicates
+        ordered_hashes = list(dict.fromkeys(hashes)) if hashes is not None else None
 
-        results = []
-        start_date = start_date or datetime.datetime.min
-        end_date = end_date or datetime.datetime.max
+        def select(names: Optional[Iterable[str]] = None) -> Iterable[InstallRecord]:
+            """Returns the records that pass all the filters of the query, except the spec"""
+            # Restrict the set of records over which we iterate first
+            if query_spec is not None and query_spec.concrete:
+                keys: Optional[Iterable[str]] = [query_spec.dag_hash()]
+            else:
+                keys = self._index.select(
+                    names=names,
+                    explicit=explicit,
+                    origin=origin,
+                    start_date=start_date,
+                    end_date=end_date,
+                )
 
-        deferred = []
-        for rec in matching_hashes.values():
-            if origin and not (origin == rec.origin):
-                continue
+            if ordered_hashes is not None:
+                if keys is None:
+                    keys = ordered_hashes
+                else:
+                    selected = set(keys)
+                    keys = [h for h in ordered_hashes if h in selected]
 
-            if not rec.install_type_matches(installed):
-                continue
+            if keys is None:
+                records: Iterable[InstallRecord] = self._data.values()
+            else:
+                records = [self._data[h] for h in keys if h in self._data]
 
-            if in_buildcache is not None and rec.in_buildcache != in_buildcache:
-                continue
+            lo = start_date or datetime.datetime.min
+            hi = end_date or datetime.datetime.max
+            for rec in records:
+                if origin and not (origin == rec.origin):
+                    continue
 
-            if explicit is not None and rec.explicit != explicit:
-                continue
+                if not rec.install_type_matches(installed):
+                    continue
 
-            if predicate_fn is not None and not predicate_fn(rec):
-                continue
+                if in_buildcache is not None and rec.in_buildcache != in_buildcache:
+                    continue
 
-            if start_date or end_date:
-                inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
-                if not (start_date < inst_date < end_date):
+                if explicit is not None and rec.explicit != explicit:
                     continue
 
-            if query_spec is None or query_spec.concrete:
-                results.append(rec.spec)
-                continue
+                if predicate_fn is not None and not predicate_fn(rec):
+                    continue
 
-            # check anon specs and exact name matches first
-            if not query_spec.name or rec.spec.name == query_spec.name:
-                if rec.spec.satisfies(query_spec):
-                    results.append(rec.spec)
+                if start_date or end_date:
+                    inst_date = datetime.datetime.fromtimestamp(rec.installation_time)
+                    if not (lo < inst_date < hi):
+                        continue
 
-            # save potential virtual matches for later, but not if we already found a match
-            elif not results:
-                deferred.append(rec.spec)
+                yield rec
 
-        # Checking for virtuals is expensive, so we save it for last and only if needed.
-        # If we get here, we didn't find anything in the DB that matched by name.
-        # If we did fine something, the query spec can't be virtual b/c we matched an actual
-        # package installation, so skip the virtual check entirely. If we *didn't* find anything,
-        # check all the deferred specs *if* the query is virtual.
-        if (
-            not results
-            and query_spec is not None
-            and deferred
-            and spack.repo.PATH.is_virtual(query_spec.name)
-        ):
-            results = [spec for spec in deferred if spec.satisfies(query_spec)]
+        if query_spec is None or query_spec.concrete:
+            return [rec.spec for rec in select()]
 
-        return results
+        # Anonymous specs are checked against all the records, named specs only against the
+        # records with the same name
+        if not query_spec.name:
+            return [rec.spec for rec in select() if rec.spec.satisfies(query_spec)]
+
+        results = [
+            rec.spec for rec in select(names=[query_spec.name]) if rec.spec.satisfies(query_spec)
+        ]
+
+        # If nothing was found by name, the query spec may be virtual, in which case it is
+        # checked against the records of its possible providers.
+        if results or not spack.repo.PATH.is_virtual(query_spec.name):
+            return results
+
+        providers = spack.repo.PATH.provider_index.providers_for(query_spec.name)
+        return [
+            rec.spec
+            for rec in select(names=[p.name for p in providers])
+            if rec.spec.satisfies(query_spec)
+        ]
 
     def query_local(
         self,
@@ -1772,18 +2705,42 @@ def unused_specs(
                 considered needed. By default only link and run dependency types are considered.
         """
 
-        def root(key, record):
-            """Whether a DB record is a root for garbage collection."""
-            return key in root_hashes if root_hashes is not None else record.explicit
-
+        depflag = deptype if isinstance(deptype, int) else dt.canonicalize(deptype)
         with self.read_transaction():
-            roots = [rec.spec for key, rec in self._data.items() if root(key, rec)]
-            needed = set(id(spec) for spec in tr.traverse_nodes(roots, deptype=deptype))
-            return [
-                rec.spec
-                for rec in self._data.values()
-                if id(rec.spec) not in needed and rec.installed
-            ]
+            if isinstance(self._data, LazyInstallRecords):
+                dependency_edges = self._data.dependency_edges
+            else:
+                dependency_edges = lambda key: _dependency_edges(self._data[key])  # noqa: E731
+            edges = {key: dependency_edges(key) for key in self._data}
+
+            # Count the dependents of each record through edges of the given types. Records
+            # with no such dependents, other than roots, are unused, and so are the records
+            # whose dependents are all unused. The graph is acyclic, so releasing references
+            # from unused records finds all records not reachable from the roots.
+            ref_counts = dict.fromkeys(self._data, 0)
+            for key, dependencies in edges.items():
+                for dep_key, edge_depflag in dependencies:
+                    if edge_depflag & depflag and dep_key in ref_counts:
+                        ref_counts[dep_key] += 1
+
+            if root_hashes is None:
+                roots = set(self._index.explicit)
+            else:
+                roots = {key for key in self._data if key in root_hashes}
+
+            unused = [key for key, count in ref_counts.items() if not count and key not in roots]
+            for key in unused:
+                for dep_key, edge_depflag in edges[key]:
+                    if not edge_depflag & depflag or dep_key not in ref_counts:
+                        continue
+                    ref_counts[dep_key] -= 1
+                    if not ref_counts[dep_key] and dep_key not in roots:
+                        unused.append(dep_key)
+
+            # Keep the order of the database, and construct only the specs of unused records
+            unused_keys = set(unused)
+            unused_records = [self._data[key] for key in self._data if key in unused_keys]
+            return [rec.spec for rec in unused_records if rec.installed]
 
 
 class NoUpstreamVisitor:
@@ -2,13 +2,14 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import concurrent.futures
 import errno
 import os
 import re
 import shutil
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 import llnl.util.filesystem as fs
 from llnl.util.symlink import readlink
@@ -31,39 +32,106 @@ def _check_concrete(spec: "spack.spec.Spec") -> None:
         raise ValueError("Specs passed to a DirectoryLayout must be concrete!")
 
 
-def _get_spec(prefix: str) -> Optional["spack.spec.Spec"]:
-    """Returns a spec if the prefix contains a spec file in the .spack subdir"""
+#: Name and content of a spec file
+SpecFile = Tuple[str, str]
+
+
+def _read_spec_files(prefix: str) -> List[SpecFile]:
+    """Returns the name and content of the spec files in the .spack subdir of a prefix"""
+    result = []
     for f in ("spec.json", "spec.yaml"):
         try:
-            return spack.spec.Spec.from_specfile(os.path.join(prefix, ".spack", f))
+            with open(os.path.join(prefix, ".spack", f), encoding="utf-8") as fd:
+                result.append((f, fd.read()))
+        except OSError:
+            continue
+    return result
+
+
+def _spec_from_files(spec_files: List[SpecFile]) -> Optional["spack.spec.Spec"]:
+    """Returns the spec in the first of the spec files that can be parsed, if any"""
+    for name, content in spec_files:
+        try:
+            if name.endswith(".json"):
+                return spack.spec.Spec.from_json(content)
+            return spack.spec.Spec.from_yaml(content)
         except Exception:
             continue
     return None
 
 
-def specs_from_metadata_dirs(root: str) -> List["spack.spec.Spec"]:
-    stack = [root]
+def _scan_dir(path: str, read_spec_files: bool) -> Tuple[List[SpecFile], List[str]]:
+    """Returns the spec files of a directory, if it is a prefix, and otherwise the
+    subdirectories in it."""
+    if read_spec_files:
+        spec_files = _read_spec_files(path)
+        if spec_files:
+            return spec_files, []
+
+    try:
+        scandir = os.scandir(path)
+    except OSError:
+        return [], []
+
+    with scandir as entries:
+        return [], [entry.path for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+
+def specs_from_metadata_dirs(
+    root: str,
+    *,
+    jobs: Optional[int] = None,
+    found: Optional[Dict[str, "spack.spec.Spec"]] = None,
+    on_found: Optional[Callable[["spack.spec.Spec"], None]] = None,
+) -> List["spack.spec.Spec"]:
+    """Returns the specs of the prefixes under a root directory, i.e. of the directories with
+    a spec file in their ``.spack`` subdirectory. Their prefix is set to that directory.
+
+    Directories are listed, and spec files read, by a pool of threads, since on network file
+    systems the time is dominated by the latency of each operation.
+
+    Args:
+        root: directory where prefixes are searched
+        jobs: number of threads, by default the number chosen by ThreadPoolExecutor
+        found: specs already found, keyed by prefix, whose spec files are not read again
+        on_found: called with each spec whose spec files are read, with its prefix set
+    """
+    found = found or {}
     specs = []
 
-    while stack:
-        prefix = stack.pop()
-
-        spec = _get_spec(prefix)
-
-        if spec:
-            spec.set_prefix(prefix)
-            specs.append(spec)
-            continue
-
-        try:
-            scandir = os.scandir(prefix)
-        except OSError:
-            continue
+    def _add(prefix: str, files: List[SpecFile]) -> bool:
+        spec = _spec_from_files(files)
+        if spec is None:
+            return False
+        spec.set_prefix(prefix)
+        specs.append(spec)
+        if on_found:
+            on_found(spec)
+        return True
+
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        pending = {executor.submit(_scan_dir, root, True): root}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            for future in done:
+                path = pending.pop(future)
+                files, subdirs = future.result()
+                if files:
+                    if not _add(path, files):
+                        pending[executor.submit(_scan_dir, path, False)] = path
+                    continue
+
+                for subdir in subdirs:
+                    if subdir in found:
+                        found[subdir].set_prefix(subdir)
+                        specs.append(found[subdir])
+                        continue
+                    pending[executor.submit(_scan_dir, subdir, True)] = subdir
 
-        with scandir as entries:
-            for entry in entries:
-                if entry.is_dir(follow_symlinks=False):
-                    stack.append(entry.path)
+    # Sort by prefix, so that the result doesn't depend on the order in which threads finish
+    specs.sort(key=lambda s: s.prefix)
     return specs
 
 
@@ -325,35 +393,58 @@ def remove_install_directory(self, spec: "spack.spec.Spec", deprecated: bool = F
                         raise e
             path = os.path.dirname(path)
 
-    def all_specs(self) -> List["spack.spec.Spec"]:
+    def all_specs(
+        self,
+        *,
+        jobs: Optional[int] = None,
+        found: Optional[Dict[str, "spack.spec.Spec"]] = None,
+        on_found: Optional[Callable[["spack.spec.Spec"], None]] = None,
+    ) -> List["spack.spec.Spec"]:
         """Returns a list of all specs detected in self.root, detected by `.spack` directories.
         Their prefix is set to the directory containing the `.spack` directory. Note that these
         specs may follow a different layout than the current layout if it was changed after
-        installation."""
-        return specs_from_metadata_dirs(self.root)
+        installation.
+
+        Args:
+            jobs: number of threads searching prefixes
+            found: specs already found, keyed by prefix, whose spec files are not read again
+            on_found: called with each spec whose spec files are read, with its prefix set
+        """
+        return specs_from_metadata_dirs(self.root, jobs=jobs, found=found, on_found=on_found)
 
     def deprecated_for(
-        self, specs: List["spack.spec.Spec"]
+        self, specs: List["spack.spec.Spec"], *, jobs: Optional[int] = 1
     ) -> List[Tuple["spack.spec.Spec", "spack.spec.Spec"]]:
-        """Returns a list of tuples of specs (new, old) where new is deprecated for old"""
+        """Returns a list of tuples of specs (new, old) where new is deprecated for old. The
+        prefixes of the specs are searched by ``jobs`` threads."""
         spec_with_deprecated = []
-        for spec in specs:
-            try:
-                deprecated = os.scandir(
-                    os.path.join(str(spec.prefix), self.metadata_dir, self.deprecated_dir)
-                )
-            except OSError:
-                continue
-
-            with deprecated as entries:
-                for entry in entries:
-                    try:
-                        deprecated_spec = spack.spec.Spec.from_specfile(entry.path)
+        with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+            for spec, spec_files in zip(specs, executor.map(self._deprecated_spec_files, specs)):
+                for spec_file in spec_files:
+                    deprecated_spec = _spec_from_files([spec_file])
+                    if deprecated_spec is not None:
                         spec_with_deprecated.append((spec, deprecated_spec))
-                    except Exception:
-                        continue
         return spec_with_deprecated
 
+    def _deprecated_spec_files(self, spec: "spack.spec.Spec") -> List[SpecFile]:
+        """Returns the spec files of the specs deprecated in favor of the spec in input"""
+        try:
+            deprecated = os.scandir(
+                os.path.join(str(spec.prefix), self.metadata_dir, self.deprecated_dir)
+            )
+        except OSError:
+            return []
+
+        result = []
+        with deprecated as entries:
+            for entry in entries:
+                try:
+                    with open(entry.path, encoding="utf-8") as f:
+                        result.append((entry.name, f.read()))
+                except OSError:
+                    continue
+        return result
+
 
 class DirectoryLayoutError(SpackError):
     """Superclass for directory layout errors."""
@@ -473,6 +473,7 @@
     all_environment_names,
     all_environments,
     as_env_dir,
+    concretized_root_hashes,
     create,
     create_in_dir,
     deactivate,
@@ -510,6 +511,7 @@
     "all_environment_names",
     "all_environments",
     "as_env_dir",
+    "concretized_root_hashes",
     "create",
     "create_in_dir",
     "deactivate",
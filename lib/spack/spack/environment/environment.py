@@ -49,6 +49,7 @@
 from spack.schema.env import TOP_LEVEL_KEY
 from spack.spec import Spec
 from spack.spec_list import SpecList
+from spack.util.file_cache import CacheError
 from spack.util.path import substitute_path_variables
 
 from ..enums import ConfigScopePriority
@@ -527,6 +528,50 @@ def all_environments():
         yield read(name)
 
 
+def concretized_root_hashes(manifest_dir: Union[str, pathlib.Path]) -> List[str]:
+    """Returns the DAG hashes of the roots of the last concretization of an environment, in
+    order, without reading the environment.
+
+    The hashes are read from the lockfile, and cached in the misc cache until the lockfile
+    changes, so that commands like ``spack gc`` can consider many environments quickly.
+
+    Args:
+        manifest_dir: directory with the "spack.yaml" associated with the environment
+    """
+    lock_path = os.path.join(os.path.abspath(str(manifest_dir)), lockfile_name)
+    try:
+        lock_stat = os.stat(lock_path)
+    except OSError:
+        return []
+
+    cache = spack.caches.MISC_CACHE
+    key = os.path.join("environments", f"{spack.util.hash.b32_hash(lock_path)}.json")
+    source = [lock_path, lock_stat.st_mtime_ns, lock_stat.st_size]
+    try:
+        if cache.init_entry(key):
+            with cache.read_transaction(key) as f:
+                data = sjson.load(f)
+            if data.get("source") == source:
+                return list(data["roots"])
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, CacheError):
+        pass
+
+    with open(lock_path, encoding="utf-8") as f:
+        lockfile = sjson.load(f)
+    if lockfile["_meta"]["lockfile-version"] < lockfile_format_version:
+        # Older lockfiles can be keyed by other hashes than the DAG hash
+        hashes = Environment(manifest_dir).concretized_order
+    else:
+        hashes = [r["hash"] for r in lockfile["roots"]]
+
+    try:
+        with cache.write_transaction(key) as (_, new):
+            sjson.dump({"source": source, "roots": hashes}, new)
+    except (OSError, CacheError) as e:
+        tty.debug(f"cannot cache the roots of {lock_path}: {e}")
+    return hashes
+
+
 def _read_yaml(str_or_file):
     """Read YAML from a file for round-trip parsing."""
     try:
@@ -2264,7 +2309,7 @@ def filter_specs(self, reader, json_specs_by_hash, order_concretized):
 
         # First pass: Put each spec in the map ignoring dependencies
         for lockfile_key, node_dict in json_specs_by_hash.items():
-            spec = reader.from_node_dict(node_dict)
+            spec = reader.from_concrete_node_dict(node_dict)
             if not spec._hash:
                 # in v1 lockfiles, the hash only occurs as a key
                 spec._hash = lockfile_key
@@ -2274,8 +2319,10 @@ def filter_specs(self, reader, json_specs_by_hash, order_concretized):
         # and add them to the spec, including build specs
         for lockfile_key, node_dict in json_specs_by_hash.items():
             name, data = reader.name_and_data(node_dict)
+            spec = specs_by_hash[lockfile_key]
+            add_edge = spec._add_trusted_dependency if spec.concrete else spec._add_dependency
             for _, dep_hash, deptypes, _, virtuals in reader.dependencies_from_node_dict(data):
-                specs_by_hash[lockfile_key]._add_dependency(
+                add_edge(
                     specs_by_hash[dep_hash], depflag=dt.canonicalize(deptypes), virtuals=virtuals
                 )
 
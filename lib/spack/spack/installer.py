@@ -31,6 +31,7 @@
 import heapq
 import io
 import itertools
+import multiprocessing
 import os
 import shutil
 import sys
@@ -354,7 +355,10 @@ def _print_timer(pre: str, pkg_id: str, timer: timer.BaseTimer) -> None:
 
 
 def _install_from_cache(
-    pkg: "spack.package_base.PackageBase", explicit: bool, unsigned: Optional[bool] = False
+    pkg: "spack.package_base.PackageBase",
+    explicit: bool,
+    unsigned: Optional[bool] = False,
+    prefetcher: Optional["binary_distribution.BinaryPrefetcher"] = None,
 ) -> bool:
     """
     Install the package from binary cache
@@ -364,12 +368,13 @@ def _install_from_cache(
         explicit: ``True`` if installing the package was explicitly
             requested by the user, otherwise, ``False``
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
+        prefetcher: downloads of binary packages started ahead of their installation
 
     Return: ``True`` if the package was extract from binary cache, ``False`` otherwise
     """
     t = timer.Timer()
     installed_from_cache = _try_install_from_binary_cache(
-        pkg, explicit, unsigned=unsigned, timer=t
+        pkg, explicit, unsigned=unsigned, timer=t, prefetcher=prefetcher
     )
     if not installed_from_cache:
         return False
@@ -432,6 +437,7 @@ def _process_binary_cache_tarball(
     unsigned: Optional[bool],
     mirrors_for_spec: Optional[list] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    prefetcher: Optional["binary_distribution.BinaryPrefetcher"] = None,
 ) -> bool:
     """
     Process the binary cache tarball.
@@ -443,15 +449,17 @@ def _process_binary_cache_tarball(
         mirrors_for_spec: Optional list of concrete specs and mirrors
         obtained by calling binary_distribution.get_mirrors_for_spec().
         timer: timer to keep track of binary install phases.
+        prefetcher: downloads of binary packages started ahead of their installation
 
     Return:
         bool: ``True`` if the package was extracted from binary cache,
             else ``False``
     """
+    download_tarball = (
+        prefetcher.download_tarball if prefetcher else binary_distribution.download_tarball
+    )
     with timer.measure("fetch"):
-        download_result = binary_distribution.download_tarball(
-            pkg.spec.build_spec, unsigned, mirrors_for_spec
-        )
+        download_result = download_tarball(pkg.spec.build_spec, unsigned, mirrors_for_spec)
 
         if download_result is None:
             return False
@@ -479,6 +487,7 @@ def _try_install_from_binary_cache(
     explicit: bool,
     unsigned: Optional[bool] = None,
     timer: timer.BaseTimer = timer.NULL_TIMER,
+    prefetcher: Optional["binary_distribution.BinaryPrefetcher"] = None,
 ) -> bool:
     """
     Try to extract the package from binary cache.
@@ -488,6 +497,7 @@ def _try_install_from_binary_cache(
         explicit: the package was explicitly requested by the user
         unsigned: if ``True`` or ``False`` override the mirror signature verification defaults
         timer: timer to keep track of binary install phases.
+        prefetcher: downloads of binary packages started ahead of their installation
     """
     # Early exit if no binary mirrors are configured.
     if not spack.mirrors.mirror.MirrorCollection(binary=True):
@@ -499,7 +509,7 @@ def _try_install_from_binary_cache(
         matches = binary_distribution.get_mirrors_for_spec(pkg.spec, index_only=True)
 
     return _process_binary_cache_tarball(
-        pkg, explicit, unsigned, mirrors_for_spec=matches, timer=timer
+        pkg, explicit, unsigned, mirrors_for_spec=matches, timer=timer, prefetcher=prefetcher
     )
 
 
@@ -963,6 +973,9 @@ def __init__(
             pkg_id for pkg_id in self.dependencies if pkg_id not in installed
         )
 
+        # Downloads of binary packages started by the installer ahead of their installation
+        self.prefetcher: Optional["binary_distribution.BinaryPrefetcher"] = None
+
         # Ensure key sequence-related properties are updated accordingly.
         self.attempts = attempts
         self._update()
@@ -1136,10 +1149,53 @@ def priority(self):
 class BuildTask(Task):
     """Class for representing a build task for a package."""
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # Child process building the package, while it runs concurrently with other builds
+        self.process: Optional[spack.build_environment.BuildProcess] = None
+
+        # Result of an installation started with start_install that needed no build process
+        self.result: Optional[ExecuteResult] = None
+
     def execute(self, install_status):
         """
         Perform the installation of the requested spec and/or dependency
         represented by the build task.
+
+        If the installation was already started by ``start_install``, this
+        collects its result.
+        """
+        if self.process is None and self.result is None:
+            self.start_install(install_status)
+
+        if self.process is not None:
+            return self.finish_install()
+
+        result, self.result = self.result, None
+        return result
+
+    def start_install(
+        self,
+        install_status: InstallStatus,
+        *,
+        build_jobs: Optional[int] = None,
+        makeflags: Optional[str] = None,
+        forward_stdin: bool = True,
+    ) -> None:
+        """Start the installation of the package.
+
+        Installations from a binary cache complete here, and their result is
+        stored in ``self.result``. Otherwise, a child process is started to
+        build the package, which is stored in ``self.process``, and the build
+        is completed by ``finish_install``.
+
+        Args:
+            install_status: the installation status for the package
+            build_jobs: number of build jobs of the child process, if not the
+                configured one
+            makeflags: ``MAKEFLAGS`` of the child process, to share a jobserver
+            forward_stdin: whether the child process reads the standard input
         """
         install_args = self.request.install_args
         tests = install_args.get("tests")
@@ -1153,8 +1209,9 @@ def execute(self, install_status):
 
         # Use the binary cache if requested
         if self.use_cache:
-            if _install_from_cache(pkg, self.explicit, unsigned):
-                return ExecuteResult.SUCCESS
+            if _install_from_cache(pkg, self.explicit, unsigned, self.prefetcher):
+                self.result = ExecuteResult.SUCCESS
+                return
             elif self.cache_only:
                 raise spack.error.InstallError(
                     "No binary found when cache-only was specified", pkg=pkg
@@ -1167,20 +1224,33 @@ def execute(self, install_status):
         # hook that allows tests to inspect the Package before installation
         # see unit_test_check() docs.
         if not pkg.unit_test_check():
-            return ExecuteResult.FAILED
+            self.result = ExecuteResult.FAILED
+            return
 
-        try:
-            # Create stage object now and let it be serialized for the child process. That
-            # way monkeypatch in tests works correctly.
-            pkg.stage
+        # Create stage object now and let it be serialized for the child process. That
+        # way monkeypatch in tests works correctly.
+        pkg.stage
 
-            self._setup_install_dir(pkg)
+        self._setup_install_dir(pkg)
 
-            # Create a child process to do the actual installation.
+        # Create a child process to do the actual installation.
+        if build_jobs is not None or makeflags is not None:
+            install_args = {**install_args, "build_jobs": build_jobs, "makeflags": makeflags}
+        process = spack.build_environment.BuildProcess(
+            pkg, build_process, install_args, forward_stdin=forward_stdin
+        )
+        process.start()
+        self.process = process
+
+    def finish_install(self) -> ExecuteResult:
+        """Wait for the build process of the package to finish, and add the
+        package to the database."""
+        assert self.process is not None, "the build of the package was not started"
+        pkg = self.pkg
+        process, self.process = self.process, None
+        try:
             # Preserve verbosity settings across installs.
-            spack.package_base.PackageBase._verbose = spack.build_environment.start_build_process(
-                pkg, build_process, install_args
-            )
+            spack.package_base.PackageBase._verbose = process.complete()
 
             # Note: PARENT of the build process adds the new package to
             # the database, so that we don't need to re-read from file.
@@ -1215,7 +1285,9 @@ def execute(self, install_status):
             try:
                 install_args = self.request.install_args
                 unsigned = install_args.get("unsigned")
-                _process_binary_cache_tarball(self.pkg, explicit=self.explicit, unsigned=unsigned)
+                _process_binary_cache_tarball(
+                    self.pkg, explicit=self.explicit, unsigned=unsigned, prefetcher=self.prefetcher
+                )
                 _print_installed_pkg(self.pkg.prefix)
                 return ExecuteResult.SUCCESS
             except BaseException as e:
@@ -1341,6 +1413,11 @@ def __init__(
         # Locks on specs being built, keyed on the package's unique id
         self.locks: Dict[str, Tuple[str, Optional[lk.Lock]]] = {}
 
+        # Installed packages whose database records are not written yet, because database
+        # writes are batched, keyed on the package's unique id. Their prefix write locks are
+        # held until their records are written.
+        self.unwritten: Dict[str, "spack.package_base.PackageBase"] = {}
+
         # Cache fail_fast option to ensure if one build request asks to fail
         # fast then that option applies to all build requests.
         self.fail_fast = False
@@ -1348,6 +1425,28 @@ def __init__(
         # Initializing all_dependencies to empty. This will be set later in _init_queue.
         self.all_dependencies: Dict[str, Set[str]] = {}
 
+        # Maximum number of packages built at the same time, and the number of build jobs of
+        # each of them when there are several
+        self.concurrent_packages = max(1, spack.config.get("config:concurrent_packages", 1))
+        self.build_jobs: Optional[int] = None
+        if self.concurrent_packages > 1:
+            jobs = spack.config.determine_number_of_jobs(parallel=True)
+            self.build_jobs = max(1, jobs // self.concurrent_packages)
+
+        # Jobserver limiting the total number of jobs of the concurrent builds
+        self.jobserver: Optional["spack.build_environment.Jobserver"] = None
+
+        # Tasks whose packages are being built by a child process, keyed on the package's
+        # unique id
+        self.running: Dict[str, BuildTask] = {}
+
+        # Build requests that failed, with their package id and error message
+        self.failed_build_requests: List[Tuple["spack.package_base.PackageBase", str, str]] = []
+
+        # Downloads of the binary packages to be installed, started once the build queue is
+        # initialized
+        self.prefetcher: Optional["binary_distribution.BinaryPrefetcher"] = None
+
     def __repr__(self) -> str:
         """Returns a formal representation of the package installer."""
         rep = f"{self.__class__.__name__}("
@@ -1397,7 +1496,9 @@ def _check_db(
                 that's ``True`` iff the spec is considered installed
         """
         try:
-            rec = spack.store.STORE.db.get_record(spec)
+            # Other processes may have just installed the spec, so don't read a snapshot
+            with spack.store.STORE.db.read_transaction(locked=True):
+                rec = spack.store.STORE.db.get_record(spec)
             installed_in_db = rec.installed if rec else False
         except KeyError:
             # KeyError is raised if there is no matching spec in the database
@@ -1512,6 +1613,14 @@ def _prepare_for_install(self, task: Task) -> None:
 
     def _cleanup_all_tasks(self) -> None:
         """Cleanup all tasks to include releasing their locks."""
+        # Records must be written before the prefix locks are released, otherwise other
+        # processes would consider the prefixes as partial installations
+        try:
+            spack.store.STORE.db.flush_batch()
+        except Exception as exc:
+            tty.warn(f"Failed to write installed packages to the database: {str(exc)}")
+        self.unwritten.clear()
+
         for pkg_id in self.locks:
             self._release_lock(pkg_id)
 
@@ -1550,10 +1659,25 @@ def _cleanup_task(self, pkg: "spack.package_base.PackageBase") -> None:
         """
         self._remove_task(package_id(pkg.spec))
 
+        # Keep the write lock until the record of the spec is written to the
+        # database, so that others don't remove its prefix as a partial install.
+        if spack.store.STORE.db.pending_write(pkg.spec):
+            self.unwritten[package_id(pkg.spec)] = pkg
+            return
+
         # Ensure we have a read lock to prevent others from uninstalling the
         # spec during our installation.
         self._ensure_locked("read", pkg)
 
+    def _cleanup_written(self) -> None:
+        """Write the batch of database records if it is due, and downgrade the
+        write locks of the packages whose records were written to read locks."""
+        spack.store.STORE.db.flush_batch(force=False)
+        for pkg_id, pkg in list(self.unwritten.items()):
+            if not spack.store.STORE.db.pending_write(pkg.spec):
+                del self.unwritten[pkg_id]
+                self._ensure_locked("read", pkg)
+
     def _ensure_install_ready(self, pkg: "spack.package_base.PackageBase") -> None:
         """
         Ensure the package is ready to install locally, which includes
@@ -1773,6 +1897,18 @@ def _next_is_pri0(self) -> bool:
         task = self.build_pq[0][1]
         return task.priority == 0
 
+    def _next_is_ready(self) -> bool:
+        """
+        Determine if there is a task left whose dependencies are all installed
+
+        Return:
+            True if there is one, False otherwise
+        """
+        # Drop the entries of removed tasks, which may have a stale priority
+        while self.build_pq and self.build_pq[0][1].status == BuildStatus.REMOVED:
+            heapq.heappop(self.build_pq)
+        return bool(self.build_pq) and self._next_is_pri0()
+
     def _pop_task(self) -> Optional[Task]:
         """
         Remove and return the lowest priority task.
@@ -1811,7 +1947,7 @@ def _push_task(self, task: Task) -> None:
             return
 
         # Remove any associated task since its sequence will change
-        self._remove_task(task.pkg_id)
+        self._remove_task(task.pkg_id, requeue=True)
         desc = (
             "Queueing" if task.attempts == 1 else f"Requeueing ({ordinal(task.attempts)} attempt)"
         )
@@ -1845,7 +1981,7 @@ def _release_lock(self, pkg_id: str) -> None:
                 except Exception as exc:
                     tty.warn(err.format(exc.__class__.__name__, ltype, pkg_id, str(exc)))
 
-    def _remove_task(self, pkg_id: str) -> Optional[Task]:
+    def _remove_task(self, pkg_id: str, requeue: bool = False) -> Optional[Task]:
         """
         Mark the existing package task as being removed and return it.
         Raises KeyError if not found.
@@ -1854,15 +1990,31 @@ def _remove_task(self, pkg_id: str) -> Optional[Task]:
 
         Args:
             pkg_id: identifier for the package to be removed
+            requeue: ``True`` if the task is replaced by a new one, which
+                still uses the binary package prefetched for it
         """
         if pkg_id in self.build_tasks:
             tty.debug(f"Removing task for {pkg_id} from list")
             task = self.build_tasks.pop(pkg_id)
             task.status = BuildStatus.REMOVED
+            if not requeue:
+                self._discard_prefetched(task)
             return task
         else:
             return None
 
+    def _discard_prefetched(self, task: Task) -> None:
+        """
+        Drop the binary package prefetched for a task that is not installed
+        from it, so that the next binary package can be prefetched instead.
+
+        Args:
+            task: the task of the package
+        """
+        if self.prefetcher is not None:
+            unsigned = task.request.install_args.get("unsigned")
+            self.prefetcher.discard(task.pkg.spec.build_spec, unsigned)
+
     def _requeue_task(self, task: Task, install_status: InstallStatus) -> None:
         """
         Requeues a task that appears to be in progress by another process.
@@ -1901,6 +2053,7 @@ def _update_failed(
         else:
             self.failed[pkg_id] = None
         task.status = BuildStatus.FAILED
+        self._discard_prefetched(task)
 
         for dep_id in task.dependents:
             if dep_id in self.build_tasks:
@@ -1921,6 +2074,7 @@ def _update_installed(self, task: Task) -> None:
             task: the task for the installed package
         """
         task.status = BuildStatus.INSTALLED
+        self._discard_prefetched(task)
         self._flag_installed(task.pkg, task.dependents)
 
     def _flag_installed(
@@ -2012,13 +2166,222 @@ def _install_action(self, task: Task) -> InstallAction:
         # back on failure
         return InstallAction.OVERWRITE
 
+    def _run_task(self, task: Task, install_status: InstallStatus) -> None:
+        """
+        Install the package of a task, for which an exclusive write lock is held,
+        or collect the result of its build process if it was started before.
+        Builds from source are started in a child process, and left running, if
+        other packages can be built at the same time.
+
+        Args:
+            task: the installation task for a package
+            install_status: the installation status for the package
+        """
+        pkg, pkg_id = task.pkg, task.pkg_id
+        keep_prefix = task.request.install_args.get("keep_prefix")
+        fail_fast_err = "Terminating after first install failure"
+        running = False
+        try:
+            # The build process may have been started before, and have finished
+            finishing = isinstance(task, BuildTask) and task.process is not None
+            action = InstallAction.INSTALL if finishing else self._install_action(task)
+
+            if action == InstallAction.INSTALL:
+                running = not finishing and self._start_task(task, install_status)
+                if running:
+                    return
+                self._install_task(task, install_status)
+            elif action == InstallAction.OVERWRITE:
+                # spack.store.STORE.db is not really a Database object, but a small
+                # wrapper -- silence mypy
+                OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
+
+            # If we installed then we should keep the prefix
+            stop_before_phase = getattr(pkg, "stop_before_phase", None)
+            last_phase = getattr(pkg, "last_phase", None)
+            keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
+
+        except KeyboardInterrupt as exc:
+            # The build has been terminated with a Ctrl-C so terminate
+            # regardless of the number of remaining specs.
+            tty.error(
+                f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+            )
+            raise
+
+        except binary_distribution.NoChecksumException as exc:
+            if task.cache_only:
+                raise
+
+            # Checking hash on downloaded binary failed.
+            tty.error(
+                f"Failed to install {pkg.name} from binary cache due "
+                f"to {str(exc)}: Requeueing to install from source."
+            )
+            # this overrides a full method, which is ugly.
+            task.use_cache = False  # type: ignore[misc]
+            self._requeue_task(task, install_status)
+            return
+
+        except (Exception, SystemExit) as exc:
+            self._update_failed(task, True, exc)
+
+            # Best effort installs suppress the exception and mark the
+            # package as a failure.
+            if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
+                exc.printed = True  # type: ignore[union-attr]
+                # SpackErrors can be printed by the build process or at
+                # lower levels -- skip printing if already printed.
+                # TODO: sort out this and SpackError.print_context()
+                tty.error(
+                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
+                )
+            # Terminate if requested to do so on the first failure.
+            if self.fail_fast:
+                raise spack.error.InstallError(f"{fail_fast_err}: {str(exc)}", pkg=pkg) from exc
+
+            # Terminate when a single build request has failed, or summarize errors later.
+            if task.is_build_request:
+                if len(self.build_requests) == 1:
+                    raise
+                self.failed_build_requests.append((pkg, pkg_id, str(exc)))
+
+        finally:
+            # Remove the install prefix if anything went wrong during
+            # install.
+            if not running and not keep_prefix and not action == InstallAction.OVERWRITE:
+                pkg.remove_prefix()
+
+        # Perform basic task cleanup for the installed spec to
+        # include downgrading the write to a read lock
+        if pkg.spec.installed:
+            self._cleanup_task(pkg)
+
+    def _start_task(self, task: Task, install_status: InstallStatus) -> bool:
+        """
+        Start the installation of the package of a task without waiting for its
+        build process, if packages are built concurrently.
+
+        Args:
+            task: the installation task for a package
+            install_status: the installation status for the package
+
+        Return:
+            True if the package is being built by a child process, False if the
+            task must be executed by ``_install_task``
+        """
+        if self.concurrent_packages == 1 or not isinstance(task, BuildTask):
+            return False
+
+        # Only one build at a time may read the terminal, so that none does
+        task.start_install(
+            install_status,
+            build_jobs=self.build_jobs,
+            makeflags=self.jobserver.makeflags if self.jobserver else None,
+            forward_stdin=False,
+        )
+        if task.process is None:
+            return False
+
+        self.running[task.pkg_id] = task
+        names = ", ".join(sorted(t.pkg.name for t in self.running.values()))
+        install_status.set_term_title(f"Installing {names}")
+        return True
+
+    def _wait_for_builds(self, install_status: InstallStatus) -> None:
+        """
+        Wait until at least one of the packages being built is done, and
+        complete their installation.
+
+        Args:
+            install_status: the installation status for the packages
+        """
+        tasks = {id(task.process): task for task in self.running.values()}
+        processes = [task.process for task in self.running.values()]
+        for process in spack.build_environment.wait_for_build_processes(processes):  # type: ignore[arg-type] # noqa: E501
+            task = tasks[id(process)]
+            del self.running[task.pkg_id]
+            self._run_task(task, install_status)
+
+    def _terminate_builds(self) -> None:
+        """Stop the child processes of the packages that are still being built,
+        and remove their prefixes."""
+        for task in self.running.values():
+            assert task.process is not None
+            tty.debug(f"Stopping the build of {task.pkg_id}")
+            task.process.terminate()
+            task.process = None
+            if not task.request.install_args.get("keep_prefix"):
+                task.pkg.remove_prefix()
+        self.running.clear()
+
     def install(self) -> None:
         """Install the requested package(s) and or associated dependencies."""
+        max_records = spack.config.get("config:db_batch:max_records", 1)
+        max_seconds = spack.config.get("config:db_batch:max_seconds", 30)
+        self.jobserver = self._create_jobserver()
+        completed = False
+        try:
+            with spack.store.STORE.db.batched_writes(max_records, max_seconds):
+                try:
+                    self._install()
+                    completed = True
+                finally:
+                    # Stop the builds still running if the installation is interrupted
+                    self._terminate_builds()
+        finally:
+            if self.jobserver is not None:
+                self.jobserver.close()
+                self.jobserver = None
+            if self.prefetcher is not None:
+                # Don't wait for the downloads in progress if the installation is interrupted
+                self.prefetcher.shutdown(wait=completed)
+                self.prefetcher = None
+
+    def _create_jobserver(self) -> Optional["spack.build_environment.Jobserver"]:
+        """Create a jobserver shared by the concurrent builds, unless packages are built one at
+        a time, or Spack runs under the jobserver of another tool, like ``make``, which is used
+        instead. The jobserver is inherited by forked build processes only."""
+        if (
+            self.concurrent_packages == 1
+            or sys.platform == "win32"
+            or multiprocessing.get_start_method() != "fork"
+            or spack.build_environment.jobserver_enabled()
+        ):
+            return None
+        jobs = spack.config.determine_number_of_jobs(parallel=True)
+        return spack.build_environment.Jobserver(jobs, clients=self.concurrent_packages)
+
+    def _prefetch_binaries(self) -> None:
+        """Start downloading the binary packages of the queued tasks that may be installed
+        from a build cache, so that they are downloaded while other packages are installed.
+        The packages are still extracted one at a time, in the order of the build queue, and
+        they are requested in the order of the queue as well, since only a few downloads may
+        run ahead of the installation."""
+        jobs = spack.config.get("config:concurrent_binary_downloads", 4)
+        if jobs < 1 or not spack.mirrors.mirror.MirrorCollection(binary=True):
+            return
 
+        self.prefetcher = binary_distribution.BinaryPrefetcher(jobs)
+        with spack.store.STORE.db.read_transaction():
+            for task in sorted(self.build_tasks.values(), key=lambda t: t.key):
+                spec = task.pkg.spec
+                if (
+                    not isinstance(task, BuildTask)
+                    or not task.use_cache
+                    or spec.external
+                    or spec.installed
+                    or spec.installed_upstream
+                ):
+                    continue
+                unsigned = task.request.install_args.get("unsigned")
+                self.prefetcher.prefetch(spec.build_spec, unsigned)
+
+    def _install(self) -> None:
         self._init_queue()
+        self._prefetch_binaries()
         fail_fast_err = "Terminating after first install failure"
-        single_requested_spec = len(self.build_requests) == 1
-        failed_build_requests = []
+        self.failed_build_requests = []
 
         install_status = InstallStatus(len(self.build_pq))
 
@@ -2028,14 +2391,22 @@ def install(self) -> None:
             enabled=sys.stdout.isatty() and tty.msg_enabled() and not tty.is_debug()
         )
 
-        while self.build_pq:
+        while self.build_pq or self.running:
+            self._cleanup_written()
+
+            # Wait for a build to finish when as many packages as allowed are being built,
+            # or when the next task depends on the packages being built
+            if self.running and (
+                len(self.running) >= self.concurrent_packages or not self._next_is_ready()
+            ):
+                self._wait_for_builds(install_status)
+                continue
+
             task = self._pop_task()
             if task is None:
                 continue
 
-            install_args = task.request.install_args
-            keep_prefix = install_args.get("keep_prefix")
-
+            task.prefetcher = self.prefetcher
             pkg, pkg_id, spec = task.pkg, task.pkg_id, task.pkg.spec
             install_status.next_pkg(pkg)
             install_status.set_term_title(f"Processing {pkg.name}")
@@ -2153,79 +2524,7 @@ def install(self) -> None:
             # Proceed with the installation since we have an exclusive write
             # lock on the package.
             install_status.set_term_title(f"Installing {pkg.name}")
-            try:
-                action = self._install_action(task)
-
-                if action == InstallAction.INSTALL:
-                    self._install_task(task, install_status)
-                elif action == InstallAction.OVERWRITE:
-                    # spack.store.STORE.db is not really a Database object, but a small
-                    # wrapper -- silence mypy
-                    OverwriteInstall(self, spack.store.STORE.db, task, install_status).install()  # type: ignore[arg-type] # noqa: E501
-
-                # If we installed then we should keep the prefix
-                stop_before_phase = getattr(pkg, "stop_before_phase", None)
-                last_phase = getattr(pkg, "last_phase", None)
-                keep_prefix = keep_prefix or (stop_before_phase is None and last_phase is None)
-
-            except KeyboardInterrupt as exc:
-                # The build has been terminated with a Ctrl-C so terminate
-                # regardless of the number of remaining specs.
-                tty.error(
-                    f"Failed to install {pkg.name} due to " f"{exc.__class__.__name__}: {str(exc)}"
-                )
-                raise
-
-            except binary_distribution.NoChecksumException as exc:
-                if task.cache_only:
-                    raise
-
-                # Checking hash on downloaded binary failed.
-                tty.error(
-                    f"Failed to install {pkg.name} from binary cache due "
-                    f"to {str(exc)}: Requeueing to install from source."
-                )
-                # this overrides a full method, which is ugly.
-                task.use_cache = False  # type: ignore[misc]
-                self._requeue_task(task, install_status)
-                continue
-
-            except (Exception, SystemExit) as exc:
-                self._update_failed(task, True, exc)
-
-                # Best effort installs suppress the exception and mark the
-                # package as a failure.
-                if not isinstance(exc, spack.error.SpackError) or not exc.printed:  # type: ignore[union-attr] # noqa: E501
-                    exc.printed = True  # type: ignore[union-attr]
-                    # SpackErrors can be printed by the build process or at
-                    # lower levels -- skip printing if already printed.
-                    # TODO: sort out this and SpackError.print_context()
-                    tty.error(
-                        f"Failed to install {pkg.name} due to "
-                        f"{exc.__class__.__name__}: {str(exc)}"
-                    )
-                # Terminate if requested to do so on the first failure.
-                if self.fail_fast:
-                    raise spack.error.InstallError(
-                        f"{fail_fast_err}: {str(exc)}", pkg=pkg
-                    ) from exc
-
-                # Terminate when a single build request has failed, or summarize errors later.
-                if task.is_build_request:
-                    if single_requested_spec:
-                        raise
-                    failed_build_requests.append((pkg, pkg_id, str(exc)))
-
-            finally:
-                # Remove the install prefix if anything went wrong during
-                # install.
-                if not keep_prefix and not action == InstallAction.OVERWRITE:
-                    pkg.remove_prefix()
-
-            # Perform basic task cleanup for the installed spec to
-            # include downgrading the write to a read lock
-            if pkg.spec.installed:
-                self._cleanup_task(pkg)
+            self._run_task(task, install_status)
 
         # Cleanup, which includes releasing all of the read locks
         self._cleanup_all_tasks()
@@ -2238,16 +2537,16 @@ def install(self) -> None:
             if request.install_args.get("install_package") and request.pkg_id not in self.installed
         ]
 
-        if failed_build_requests or missing:
-            for _, pkg_id, err in failed_build_requests:
+        if self.failed_build_requests or missing:
+            for _, pkg_id, err in self.failed_build_requests:
                 tty.error(f"{pkg_id}: {err}")
 
             for _, pkg_id in missing:
                 tty.error(f"{pkg_id}: Package was not installed")
 
-            if len(failed_build_requests) > 0:
-                pkg = failed_build_requests[0][0]
-                ids = [pkg_id for _, pkg_id, _ in failed_build_requests]
+            if len(self.failed_build_requests) > 0:
+                pkg = self.failed_build_requests[0][0]
+                ids = [pkg_id for _, pkg_id, _ in self.failed_build_requests]
                 tty.debug(
                     "Associating installation failure with first failed "
                     f"explicit package ({ids[0]}) from {', '.join(ids)}"
@@ -8,6 +8,7 @@
 after the system path is set up.
 """
 import argparse
+import atexit
 
 # import spack.modules.common
 import inspect
@@ -27,6 +28,7 @@
 import archspec.cpu
 
 import llnl.util.lang
+import llnl.util.lock
 import llnl.util.tty as tty
 import llnl.util.tty.colify
 import llnl.util.tty.color as color
@@ -559,6 +561,11 @@ def setup_main_options(args):
     for config_var in args.config_vars or []:
         spack.config.add(fullpath=config_var, scope="command_line")
 
+    # report the time spent waiting for locks when the process exits
+    if args.debug or spack.config.get("config:lock_stats", False):
+        atexit.unregister(report_lock_statistics)
+        atexit.register(report_lock_statistics)
+
     # On Windows10 console handling for ASCI/VT100 sequences is not
     # on by default. Turn on before we try to write to console
     # with color
@@ -568,6 +575,28 @@ def setup_main_options(args):
         color.set_color_when(args.color)
 
 
+def report_lock_statistics():
+    """Prints the statistics of the locks taken by this process in debug mode, and writes
+    them where ``spack debug locks`` reads them if ``config:lock_stats`` is set."""
+    stats = llnl.util.lock.statistics()
+    if not stats:
+        return
+
+    total = llnl.util.lock.LockStatistics()
+    for entry in stats.values():
+        total.merge(entry)
+    tty.debug(f"Locks: {len(stats)} locks, {total}")
+    for key, entry in sorted(stats.items(), key=lambda item: item[1].wait_time, reverse=True):
+        tty.debug(f"Lock {key}: {entry}", level=2)
+
+    if spack.config.get("config:lock_stats", False):
+        try:
+            path = spack.util.lock.write_statistics(spack.paths.default_lock_stats_path)
+            tty.debug(f"Lock statistics written to {path}")
+        except OSError as e:
+            tty.debug(f"Cannot write lock statistics: {e}")
+
+
 def allows_unknown_args(command):
     """Implements really simple argument injection for unknown arguments.
 
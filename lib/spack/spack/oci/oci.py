@@ -28,6 +28,7 @@ class Blob(NamedTuple):
     compressed_digest: Digest
     uncompressed_digest: Digest
     size: int
+    compression: str = "gzip"
 
 
 def with_query_param(url: str, param: str, value: str) -> str:
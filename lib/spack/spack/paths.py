@@ -93,6 +93,9 @@ def _get_user_cache_path():
 #: junit, cdash, etc. reports about builds
 reports_path = os.path.join(user_cache_path, "reports")
 
+#: statistics of the locks taken by each Spack process, see ``spack debug locks``
+default_lock_stats_path = os.path.join(reports_path, "locks")
+
 #: installation test (spack test) output
 default_test_path = os.path.join(user_cache_path, "test")
 
@@ -8,6 +8,7 @@
 import difflib
 import errno
 import functools
+import hashlib
 import importlib
 import importlib.machinery
 import importlib.util
@@ -630,6 +631,30 @@ def _build_index(self, name: str, indexer: Indexer):
         return indexer.index
 
 
+#: Digests of package files, keyed by path and by the stat information used to invalidate them
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: str, sinfo: Optional[os.stat_result] = None) -> str:
+    """Returns the sha256 of the content of a file.
+
+    Digests are cached in memory, and recomputed only if the modification time or the size
+    of the file change.
+
+    Args:
+        path: path to the file
+        sinfo: stat information for the file, if already available
+    """
+    sinfo = sinfo or os.stat(path)
+    key = (path, sinfo.st_mtime_ns, sinfo.st_size)
+    result = _FILE_DIGESTS.get(key)
+    if result is None:
+        with open(path, "rb") as f:
+            result = hashlib.sha256(f.read()).hexdigest()
+        _FILE_DIGESTS[key] = result
+    return result
+
+
 class RepoPath:
     """A RepoPath is a list of repos that function as one.
 
@@ -802,6 +827,13 @@ def last_mtime(self):
         """Time a package file in this repo was last updated."""
         return max(repo.last_mtime() for repo in self.repos)
 
+    def digest(self) -> str:
+        """Returns a digest of the content of all the repositories in this path, in order."""
+        h = hashlib.sha256()
+        for repo in self.repos:
+            h.update(f"{repo.namespace}:{repo.digest()}\n".encode("utf-8"))
+        return h.hexdigest()
+
     def repo_for_pkg(self, spec: Union[str, "spack.spec.Spec"]) -> "Repo":
         """Given a spec, get the repository for its package."""
         # We don't @_autospec this function b/c it's called very frequently
@@ -1208,6 +1240,21 @@ def last_mtime(self):
         """Time a package file in this repo was last updated."""
         return self._pkg_checker.last_mtime()
 
+    def package_digest(self, pkg_name: str) -> str:
+        """Returns the sha256 of the content of the package.py file of a package."""
+        return file_digest(self.filename_for_package_name(pkg_name), self._pkg_checker[pkg_name])
+
+    def digest(self) -> str:
+        """Returns a digest of the content of all the package.py files in the repository.
+
+        Unlike ``last_mtime``, the digest depends only on the content of the files, so it is
+        stable across fresh checkouts of the same repository.
+        """
+        h = hashlib.sha256()
+        for pkg_name in sorted(self._pkg_checker):
+            h.update(f"{pkg_name}:{self.package_digest(pkg_name)}\n".encode("utf-8"))
+        return h.hexdigest()
+
     def is_virtual(self, pkg_name: str) -> bool:
         """Return True if the package with this name is virtual, False otherwise.
 
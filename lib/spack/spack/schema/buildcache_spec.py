@@ -21,7 +21,11 @@
     },
     "binary_cache_checksum": {
         "type": "object",
-        "properties": {"hash_algorithm": {"type": "string"}, "hash": {"type": "string"}},
+        "properties": {
+            "hash_algorithm": {"type": "string"},
+            "hash": {"type": "string"},
+            "compression": {"type": "string", "enum": ["gzip", "zstd"]},
+        },
     },
     "buildcache_layout_version": {"type": "number"},
 }
@@ -92,8 +92,22 @@
                 },
             },
             "static_analysis": {"type": "boolean"},
+            "cache": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "setup": {"type": "boolean"},
+                    "packages": {"type": "boolean"},
+                    "reusable_specs": {"type": "boolean"},
+                    "possible_dependencies": {"type": "boolean"},
+                },
+            },
             "timeout": {"type": "integer", "minimum": 0},
             "error_on_timeout": {"type": "boolean"},
+            "portfolio": {
+                "type": "array",
+                "items": {"type": "object", "additionalProperties": {"type": "string"}},
+            },
             "os_compatible": {"type": "object", "additionalProperties": {"type": "array"}},
         },
     }
@@ -80,11 +80,26 @@
             "checksum": {"type": "boolean"},
             "deprecated": {"type": "boolean"},
             "locks": {"type": "boolean"},
+            "lock_stats": {"type": "boolean"},
             "dirty": {"type": "boolean"},
             "build_language": {"type": "string"},
             "build_jobs": {"type": "integer", "minimum": 1},
+            "concurrent_packages": {"type": "integer", "minimum": 1},
+            "concurrent_binary_downloads": {"type": "integer", "minimum": 0},
+            "buildcache_compression": {"type": "string", "enum": ["gzip", "zstd"]},
+            "stream_binaries": {"type": "boolean"},
             "ccache": {"type": "boolean"},
             "db_lock_timeout": {"type": "integer", "minimum": 1},
+            "db_journal": {"type": "boolean"},
+            "db_format": {"type": "string", "enum": ["json", "packed"]},
+            "db_snapshot_reads": {"type": "boolean"},
+            "db_batch": {
+                "type": "object",
+                "properties": {
+                    "max_records": {"type": "integer", "minimum": 1},
+                    "max_seconds": {"type": "number", "minimum": 0},
+                },
+            },
             "package_lock_timeout": {
                 "anyOf": [{"type": "integer", "minimum": 1}, {"type": "null"}]
             },
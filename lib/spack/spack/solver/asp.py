@@ -17,7 +17,19 @@
 import typing
 import warnings
 from contextlib import contextmanager
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 
 import archspec.cpu
 
@@ -52,6 +64,15 @@
 import spack.version.git_ref_lookup
 from spack import traverse
 
+from .caching import (
+    LocalId,
+    PackageFactsCache,
+    create_package_facts_cache,
+    create_reusable_specs_cache,
+    create_setup_cache,
+    decode_argument,
+    encode_argument,
+)
 from .core import (
     AspFunction,
     AspVar,
@@ -65,7 +86,7 @@
     parse_files,
     parse_term,
 )
-from .input_analysis import create_counter, create_graph_analyzer
+from .input_analysis import PossibleDependencyGraph, create_counter, create_graph_analyzer
 from .requirements import RequirementKind, RequirementParser, RequirementRule
 from .version_order import concretization_version_order
 
@@ -96,12 +117,36 @@ class OutputConfiguration(NamedTuple):
 )
 
 
-def default_clingo_control():
-    """Return a control object with the default settings used in Spack"""
-    control = clingo().Control()
-    control.configuration.configuration = "tweety"
-    control.configuration.solver.heuristic = "Domain"
-    control.configuration.solver.opt_strategy = "usc,one"
+#: Default options of each clingo solver thread
+DEFAULT_SOLVER_OPTIONS = {"heuristic": "Domain", "opt_strategy": "usc,one"}
+
+
+def default_clingo_control(portfolio: Optional[List[Dict[str, str]]] = None):
+    """Return a control object with the default settings used in Spack
+
+    Args:
+        portfolio: options of solver threads that run in parallel, competing to find the
+            optimal solution first. Options of each thread override the default ones. If empty
+            or None, a single solver thread is used.
+    """
+    portfolio = portfolio or [{}]
+    if len(portfolio) == 1:
+        control = clingo().Control()
+        control.configuration.configuration = "tweety"
+        solvers = [control.configuration.solver]
+    else:
+        # Options of different threads can be set only starting from clasp's default portfolio
+        control = clingo().Control([f"--parallel-mode={len(portfolio)},compete"])
+        solvers = [control.configuration.solver[i] for i in range(len(portfolio))]
+
+    for solver, options in zip(solvers, portfolio):
+        for name, value in {**DEFAULT_SOLVER_OPTIONS, **options}.items():
+            try:
+                setattr(solver, name, value)
+            except (AttributeError, RuntimeError) as e:
+                raise spack.error.ConfigError(
+                    f"invalid solver option in concretizer:portfolio: {name}={value}"
+                ) from e
     return control
 
 
@@ -798,7 +843,9 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
         timer = spack.util.timer.Timer()
 
         # Initialize the control object for the solver
-        self.control = control or default_clingo_control()
+        self.control = control or default_clingo_control(
+            spack.config.CONFIG.get("concretizer:portfolio", [])
+        )
 
         # ensure core deps are present on Windows
         # needs to modify active config scope, so cannot be run within
@@ -808,7 +855,7 @@ def solve(self, setup, specs, reuse=None, output=None, control=None, allow_depre
             spack.bootstrap.core.ensure_winsdk_external_or_raise()
 
         timer.start("setup")
-        asp_problem = setup.setup(specs, reuse=reuse, allow_deprecated=allow_deprecated)
+        asp_problem = self._setup(setup, specs, reuse=reuse, allow_deprecated=allow_deprecated)
         if output.out is not None:
             output.out.write(asp_problem)
         if output.setup_only:
@@ -871,15 +918,23 @@ def on_model(model):
                 header = f"Spack is taking more than {time_limit} seconds to solve for {specs_str}"
                 if error_on_timeout:
                     raise UnsatisfiableSpecError(f"{header}, stopping concretization")
-                warnings.warn(f"{header}, using the best configuration found so far")
                 handle.cancel()
 
             solve_result = handle.get()
+            if not finished:
+                if not models:
+                    raise UnsatisfiableSpecError(f"{header}, and no solution was found so far")
+                best_cost = min(cost for cost, _ in models)
+                warnings.warn(
+                    f"{header}, using the best configuration found so far (cost: {best_cost})"
+                )
         timer.stop("solve")
 
         # once done, construct the solve result
         result = Result(specs)
         result.satisfiable = solve_result.satisfiable
+        # The optimum is proven only if the search space was exhausted
+        result.optimal = solve_result.exhausted
 
         if result.satisfiable:
             timer.start("construct_specs")
@@ -933,6 +988,30 @@ def on_model(model):
 
         return result, timer, self.control.statistics
 
+    def _setup(self, setup, specs, *, reuse, allow_deprecated) -> str:
+        """Returns the ASP problem for the input specs, either by running the setup phase,
+        or by retrieving it from the setup cache, if enabled.
+        """
+        cache = create_setup_cache(spack.config.CONFIG)
+        if cache is None:
+            return setup.setup(specs, reuse=reuse, allow_deprecated=allow_deprecated)
+
+        key = cache.key(
+            specs,
+            reuse=reuse,
+            tests=setup.tests,
+            allow_deprecated=allow_deprecated,
+            concretize_everything=setup.concretize_everything,
+        )
+        entry = cache.get(key)
+        if entry is not None and setup.restore_from_cache(entry, specs, reuse=reuse):
+            tty.debug(f"[SETUP CACHE] using cached ASP problem {key}")
+            return entry["problem"]
+
+        asp_problem = setup.setup(specs, reuse=reuse, allow_deprecated=allow_deprecated)
+        cache.put(key, setup.cache_entry(asp_problem))
+        return asp_problem
+
 
 class ConcreteSpecsByHash(collections.abc.Mapping):
     """Mapping containing concrete specs keyed by DAG hash.
@@ -1116,8 +1195,10 @@ def impose_context(self) -> ConditionIdContext:
 class SpackSolverSetup:
     """Class to set up and run a Spack concretization solve."""
 
-    def __init__(self, tests: bool = False):
-        self.possible_graph = create_graph_analyzer()
+    def __init__(
+        self, tests: bool = False, possible_graph: Optional[PossibleDependencyGraph] = None
+    ):
+        self.possible_graph = possible_graph or create_graph_analyzer()
 
         # these are all initialized in setup()
         self.gen: "ProblemInstanceBuilder" = ProblemInstanceBuilder()
@@ -1149,6 +1230,9 @@ def __init__(self, tests: bool = False):
 
         # Caches to optimize the setup phase of the solver
         self.target_specs_cache = None
+        self.package_facts_cache: Optional[PackageFactsCache] = None
+        # Packages consulted while recording facts for the package facts cache
+        self._accessed_packages: Optional[Set[Type[spack.package_base.PackageBase]]] = None
 
         # whether to add installed/binary hashes to the solve
         self.tests = tests
@@ -1320,6 +1404,15 @@ def pkg_rules(self, pkg, tests):
         self.pkg_version_rules(pkg)
         self.gen.newline()
 
+        if self.package_facts_cache is None:
+            self.pkg_condition_rules(pkg)
+        else:
+            self.cached_pkg_condition_rules(pkg)
+
+    def pkg_condition_rules(self, pkg):
+        """Output the facts derived from the directives in a package recipe, and from the
+        preferences and requirements on the package in configuration.
+        """
         # languages
         self.package_languages(pkg)
 
@@ -1351,6 +1444,152 @@ def pkg_rules(self, pkg, tests):
         self.trigger_rules()
         self.effect_rules()
 
+    def cached_pkg_condition_rules(self, pkg):
+        """Same as ``pkg_condition_rules``, but replays the facts from the package facts cache
+        when possible. Facts that are not in the cache are recorded and stored there.
+        """
+        cache = self.package_facts_cache
+        # Flush pending conditions, so that only the ones from this package are recorded
+        self.trigger_rules()
+        self.effect_rules()
+
+        key = cache.key(
+            pkg,
+            possible_virtuals=self.possible_virtuals,
+            tests=self.tests,
+            enable_splicing=self.enable_splicing,
+        )
+        entry = cache.get(pkg, key, pkg_class=self.pkg_class)
+        if entry is not None and self._replay_pkg_condition_rules(pkg, entry):
+            return
+
+        entry, depends = self._record_pkg_condition_rules(pkg)
+        cache.put(pkg, key, entry, depends=depends)
+        self._replay_pkg_condition_rules(pkg, entry)
+
+    def _record_pkg_condition_rules(self, pkg):
+        """Runs ``pkg_condition_rules`` on a package, and records the facts it emits, together
+        with its side effects on the state of the setup, in a JSON serializable form.
+
+        Returns:
+            the recorded data, and the classes of the packages that were consulted
+        """
+        saved_state = (
+            self.gen,
+            self._id_counter,
+            self.variant_ids_by_def_id,
+            self.variant_values_from_specs,
+            self.version_constraints,
+            self.target_constraints,
+            self.compiler_version_constraints,
+        )
+        recorder = _FactsRecorder()
+        self.gen = recorder
+        self._id_counter = map(LocalId, itertools.count())
+        self.variant_ids_by_def_id = {}
+        self.variant_values_from_specs = set()
+        self.version_constraints = set()
+        self.target_constraints = set()
+        self.compiler_version_constraints = set()
+        self._accessed_packages = {pkg}
+        try:
+            self.pkg_condition_rules(pkg)
+            nids = next(self._id_counter)
+            variant_ids_by_def_id = self.variant_ids_by_def_id
+            variant_values_from_specs = self.variant_values_from_specs
+            version_constraints = self.version_constraints
+            target_constraints = self.target_constraints
+            compiler_version_constraints = self.compiler_version_constraints
+            accessed_packages = self._accessed_packages
+        finally:
+            (
+                self.gen,
+                self._id_counter,
+                self.variant_ids_by_def_id,
+                self.variant_values_from_specs,
+                self.version_constraints,
+                self.target_constraints,
+                self.compiler_version_constraints,
+            ) = saved_state
+            self._accessed_packages = None
+
+        def variant_definitions_by_id(pkg_cls):
+            return {
+                id(variant_def): (name, idx)
+                for name in pkg_cls.variant_names()
+                for idx, (_, variant_def) in enumerate(pkg_cls.variant_definitions(name))
+            }
+
+        own_definitions = variant_definitions_by_id(pkg)
+        variant_ids = [
+            [*own_definitions[def_id], int(vid)] for def_id, vid in variant_ids_by_def_id.items()
+        ]
+
+        variant_values = []
+        for pkg_name, def_id, value in sorted(variant_values_from_specs, key=str):
+            definitions = variant_definitions_by_id(self.pkg_class(pkg_name))
+            if def_id in definitions:
+                variant_values.append([pkg_name, *definitions[def_id], value])
+
+        entry = {
+            "nids": nids,
+            "facts": recorder.encoded_facts(),
+            "variant_ids": variant_ids,
+            "variant_values": variant_values,
+            "version_constraints": sorted([name, str(v)] for name, v in version_constraints),
+            "target_constraints": sorted(str(x) for x in target_constraints),
+            "compiler_version_constraints": sorted(str(x) for x in compiler_version_constraints),
+        }
+        return entry, accessed_packages
+
+    def _replay_pkg_condition_rules(self, pkg, entry) -> bool:
+        """Emits the facts recorded by ``_record_pkg_condition_rules``, allocating new ids for
+        conditions and variants, and restores their side effects on the state of the setup.
+
+        Returns:
+            True if the entry could be replayed, False if it is malformed
+        """
+        # Allocate ids first, to preserve the relative order of the recorded ones
+        ids = [next(self._id_counter) for _ in range(entry.get("nids", 0))]
+        try:
+            facts = [
+                item if isinstance(item, str) else decode_argument(item, ids)
+                for item in entry["facts"]
+            ]
+            variant_ids = [
+                (id(pkg.variant_definitions(name)[idx][1]), ids[vid])
+                for name, idx, vid in entry["variant_ids"]
+            ]
+            variant_values = [
+                (pkg_name, id(self.pkg_class(pkg_name).variant_definitions(name)[idx][1]), value)
+                for pkg_name, name, idx, value in entry["variant_values"]
+            ]
+            version_constraints = [
+                (name, vn.VersionList(versions)) for name, versions in entry["version_constraints"]
+            ]
+            target_constraints = [
+                archspec.cpu.TARGETS.get(x, archspec.cpu.generic_microarchitecture(x))
+                for x in entry["target_constraints"]
+            ]
+            compiler_version_constraints = [
+                spack.spec.CompilerSpec(x) for x in entry["compiler_version_constraints"]
+            ]
+        except (KeyError, IndexError, TypeError, ValueError, spack.error.SpackError) as e:
+            tty.debug(f"[SETUP]: cannot replay cached facts for {pkg.name}: {e}")
+            return False
+
+        for item in facts:
+            if isinstance(item, str):
+                self.gen.append(item)
+            else:
+                self.gen.fact(item)
+        self.variant_ids_by_def_id.update(variant_ids)
+        self.variant_values_from_specs.update(variant_values)
+        self.version_constraints.update(version_constraints)
+        self.target_constraints.update(target_constraints)
+        self.compiler_version_constraints.update(compiler_version_constraints)
+        return True
+
     def trigger_rules(self):
         """Flushes all the trigger rules collected so far, and clears the cache."""
         if not self._trigger_cache:
@@ -2615,15 +2854,37 @@ def register_concrete_spec(self, spec, possible):
 
         self.reusable_and_possible.add(spec)
 
+    def concrete_spec_facts(self, h: str, spec: spack.spec.Spec) -> str:
+        """Returns the facts for a reusable spec, as text"""
+        gen = ProblemInstanceBuilder()
+        # this indicates that there is a spec like this installed
+        gen.fact(fn.installed_hash(spec.name, h))
+        # indirection layer between hash constraints and imposition to allow for splicing
+        for pred in self.spec_clauses(spec, body=True, required_from=None):
+            gen.fact(fn.hash_attr(h, *pred.args))
+        gen.newline()
+        return gen.value()
+
     def concrete_specs(self):
         """Emit facts for reusable specs"""
+        context = [
+            using_libc_compatibility(),
+            sorted([str(libc), libc.external_path] for libc in self.libcs),
+        ]
+        cache = create_reusable_specs_cache(spack.config.CONFIG, context=context)
         for h, spec in self.reusable_and_possible.explicit_items():
-            # this indicates that there is a spec like this installed
-            self.gen.fact(fn.installed_hash(spec.name, h))
-            # indirection layer between hash constraints and imposition to allow for splicing
-            for pred in self.spec_clauses(spec, body=True, required_from=None):
-                self.gen.fact(fn.hash_attr(h, *pred.args))
-            self.gen.newline()
+            if cache is None:
+                self.gen.append(self.concrete_spec_facts(h, spec))
+            else:
+                facts = cache.get(spec.name, h)
+                if facts is None:
+                    facts = self.concrete_spec_facts(h, spec)
+                    cache.add(spec.name, h, facts)
+                elif spec.architecture and spec.architecture.target:
+                    # side effect of computing the facts, for targets unknown to archspec
+                    self.target_ranges(spec, _Body.node_target)
+                self.gen.append(facts)
+
             # Declare as possible parts of specs that are not in package.py
             # - Add versions to possible versions
             # - Add OS to possible OS's
@@ -2641,6 +2902,9 @@ def concrete_specs(self):
                     )
                 self.possible_oses.add(dep.os)
 
+        if cache is not None:
+            cache.flush()
+
     def define_concrete_input_specs(self, specs, possible):
         # any concrete specs in the input spec list
         for input_spec in specs:
@@ -2688,6 +2952,7 @@ def setup(
                 self.explicitly_required_namespaces[node.name] = node.namespace
 
         self.gen = ProblemInstanceBuilder()
+        self.package_facts_cache = create_package_facts_cache(spack.config.CONFIG)
         compiler_parser = CompilerParser(configuration=spack.config.CONFIG).with_input_specs(specs)
 
         if using_libc_compatibility():
@@ -2807,6 +3072,52 @@ def setup(
 
         return self.gen.value()
 
+    def cache_entry(self, asp_problem: str) -> Dict[str, typing.Any]:
+        """Returns the data needed to restore the state of this object after a call to
+        ``setup()`` that returned the ASP problem in input.
+        """
+        return {
+            "problem": asp_problem,
+            "assumptions": [str(symbol) for symbol, _ in self.assumptions],
+            "reusable": [h for h, _ in self.reusable_and_possible.explicit_items()],
+            "possible_dependencies": sorted(self.pkgs),
+        }
+
+    def restore_from_cache(
+        self,
+        entry: Dict[str, typing.Any],
+        specs: List[spack.spec.Spec],
+        *,
+        reuse: Optional[List[spack.spec.Spec]] = None,
+    ) -> bool:
+        """Restores the state of this object from an entry returned by ``cache_entry()``, in
+        place of a call to ``setup()``. Returns False if the entry cannot be used.
+
+        Arguments:
+            entry: cached data
+            specs: list of Specs to solve
+            reuse: list of concrete specs that can be reused
+        """
+        candidates = {
+            s.dag_hash(): s
+            for s in traverse.traverse_nodes(itertools.chain(reuse or [], specs))
+            if s.concrete
+        }
+
+        try:
+            reusable = [candidates[h] for h in entry["reusable"]]
+            assumptions = [(parse_term(x), True) for x in entry["assumptions"]]
+            pkgs = set(entry["possible_dependencies"])
+        except (KeyError, TypeError):
+            return False
+
+        self.reusable_and_possible = ConcreteSpecsByHash()
+        for spec in reusable:
+            self.reusable_and_possible.add(spec)
+        self.assumptions = assumptions
+        self.pkgs = pkgs
+        return True
+
     def internal_errors(self):
         parent_dir = os.path.dirname(__file__)
 
@@ -2981,7 +3292,10 @@ def pkg_class(self, pkg_name: str) -> typing.Type[spack.package_base.PackageBase
         if pkg_name in self.explicitly_required_namespaces:
             namespace = self.explicitly_required_namespaces[pkg_name]
             request = f"{namespace}.{pkg_name}"
-        return spack.repo.PATH.get_pkg_class(request)
+        pkg_cls = spack.repo.PATH.get_pkg_class(request)
+        if self._accessed_packages is not None:
+            self._accessed_packages.add(pkg_cls)
+        return pkg_cls
 
 
 class _Head:
@@ -3062,6 +3376,22 @@ def value(self) -> str:
         return "".join(self.asp_problem)
 
 
+class _FactsRecorder(ProblemInstanceBuilder):
+    """Problem instance builder that keeps facts as ASP functions, so that they can be
+    serialized and replayed later with different ids.
+    """
+
+    def fact(self, atom: AspFunction) -> None:
+        if not isinstance(atom, AspFunction):
+            super().fact(atom)
+            return
+        self.asp_problem.append(atom)
+
+    def encoded_facts(self) -> List[Any]:
+        """Returns the facts and the text recorded so far, in a JSON serializable form"""
+        return [encode_argument(x) if isinstance(x, AspFunction) else x for x in self.asp_problem]
+
+
 class CompilerParser:
     """Parses configuration files, and builds a list of possible compilers for the solve."""
 
@@ -4156,13 +4486,29 @@ def __init__(self, configuration: spack.config.Configuration) -> None:
                         )
                     )
 
-    def reusable_specs(self, specs: List[spack.spec.Spec]) -> List[spack.spec.Spec]:
+    def selected_specs(self) -> List[spack.spec.Spec]:
+        """Returns the specs selected from all the reuse sources, regardless of the input specs"""
         if self.reuse_strategy == ReuseStrategy.NONE:
             return []
 
         result = []
         for reuse_source in self.reuse_sources:
             result.extend(reuse_source.selected_specs())
+        return result
+
+    def reusable_specs(
+        self, specs: List[spack.spec.Spec], *, selected: Optional[List[spack.spec.Spec]] = None
+    ) -> List[spack.spec.Spec]:
+        """Returns the specs that can be reused when solving for the input specs.
+
+        Args:
+            specs: input specs of the solve
+            selected: specs selected from the reuse sources, if already known
+        """
+        if self.reuse_strategy == ReuseStrategy.NONE:
+            return []
+
+        result = self.selected_specs() if selected is None else list(selected)
         # If we only want to reuse dependencies, remove the root specs
         if self.reuse_strategy == ReuseStrategy.DEPENDENCIES:
             result = [spec for spec in result if not any(root in spec for root in specs)]
@@ -4181,6 +4527,36 @@ def __init__(self):
         self.driver = PyclingoDriver()
         self.selector = ReusableSpecsSelector(configuration=spack.config.CONFIG)
 
+        # Part of the setup shared among solves, computed in prepare()
+        self.possible_graph: Optional[PossibleDependencyGraph] = None
+        self.selected_specs: Optional[List[spack.spec.Spec]] = None
+
+    def prepare(self, specs: List[spack.spec.Spec]) -> None:
+        """Computes the part of the setup that doesn't depend on the input specs, so that it is
+        shared among all the subsequent solves done with this object.
+
+        This is useful when many specs are solved separately. If it is called before forking
+        worker processes, the workers inherit the result without computing it again.
+
+        Arguments:
+            specs: specs that are going to be solved. Packages that are possible dependencies
+                of any of them are loaded upfront.
+        """
+        self.selected_specs = self.selector.selected_specs()
+        self.possible_graph = create_graph_analyzer()
+        try:
+            self.possible_graph.possible_dependencies(*specs, allowed_deps=dt.ALL)
+        except spack.error.SpackError as e:
+            # Errors are reported by the solve of the spec causing them
+            tty.debug(f"[SOLVER] cannot compute possible dependencies upfront: {e}")
+        # Ensure the libcs targeted by compilers are detected only once
+        all_libcs()
+
+    def _reusable_specs(self, specs: List[spack.spec.Spec]) -> List[spack.spec.Spec]:
+        reusable_specs = self._check_input_and_extract_concrete_specs(specs)
+        reusable_specs.extend(self.selector.reusable_specs(specs, selected=self.selected_specs))
+        return reusable_specs
+
     @staticmethod
     def _check_input_and_extract_concrete_specs(specs):
         reusable = []
@@ -4218,9 +4594,8 @@ def solve_with_stats(
           allow_deprecated (bool): allow deprecated version in the solve
         """
         specs = [s.lookup_hash() for s in specs]
-        reusable_specs = self._check_input_and_extract_concrete_specs(specs)
-        reusable_specs.extend(self.selector.reusable_specs(specs))
-        setup = SpackSolverSetup(tests=tests)
+        reusable_specs = self._reusable_specs(specs)
+        setup = SpackSolverSetup(tests=tests, possible_graph=self.possible_graph)
         output = OutputConfiguration(timers=timers, stats=stats, out=out, setup_only=setup_only)
         return self.driver.solve(
             setup, specs, reuse=reusable_specs, output=output, allow_deprecated=allow_deprecated
@@ -4255,9 +4630,8 @@ def solve_in_rounds(
             allow_deprecated (bool): allow deprecated version in the solve
         """
         specs = [s.lookup_hash() for s in specs]
-        reusable_specs = self._check_input_and_extract_concrete_specs(specs)
-        reusable_specs.extend(self.selector.reusable_specs(specs))
-        setup = SpackSolverSetup(tests=tests)
+        reusable_specs = self._reusable_specs(specs)
+        setup = SpackSolverSetup(tests=tests, possible_graph=self.possible_graph)
 
         # Tell clingo that we don't have to solve all the inputs at once
         setup.concretize_everything = False
@@ -0,0 +1,229 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Benchmarks for the concretizer.
+
+A benchmark solves each spec in a corpus a number of times, and records in a JSON report the
+time spent in each phase of the solve, together with a few statistics on the size of the ASP
+problem. Reports can be compared against a baseline to detect performance regressions.
+"""
+import io
+import statistics
+import sys
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import archspec.cpu
+
+import llnl.util.tty as tty
+
+import spack
+import spack.config
+import spack.platforms
+import spack.repo
+import spack.spec
+import spack.util.spack_json as sjson
+
+from . import asp
+
+#: Version of the format of the JSON report
+FORMAT_VERSION = 1
+
+#: Phases of a solve, as recorded by the timer in ``PyclingoDriver.solve``
+PHASES = ("setup", "load", "ground", "solve", "construct_specs")
+
+#: Statistics from clingo that are recorded in the report
+LP_STATISTICS = ("atoms", "bodies", "rules")
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of the current process in bytes, or None if it
+    cannot be determined on this platform.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, and in kilobytes elsewhere
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def count_facts(asp_problem: str) -> int:
+    """Returns the number of facts and rules in the text of an ASP problem"""
+    return sum(
+        1
+        for line in asp_problem.splitlines()
+        if line.rstrip().endswith(".") and not line.startswith("%")
+    )
+
+
+def read_corpus(path: str) -> List[str]:
+    """Reads a corpus of specs from a file with one spec per line. Blank lines, and lines
+    starting with ``#``, are ignored.
+    """
+    with open(path, encoding="utf-8") as f:
+        lines = (line.strip() for line in f)
+        return [line for line in lines if line and not line.startswith("#")]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {"min": min(samples), "mean": statistics.mean(samples), "max": max(samples)}
+
+
+def benchmark_spec(
+    spec: spack.spec.Spec, *, repeat: int = 1, tests: Any = False, allow_deprecated: bool = False
+) -> Dict[str, Any]:
+    """Solves a single spec a number of times, and returns the corresponding entry in the
+    report.
+
+    Args:
+        spec: spec to be solved
+        repeat: number of times the spec is solved
+        tests: whether test dependencies are considered, possibly for only some packages
+        allow_deprecated: whether deprecated versions are allowed in the solve
+    """
+    timings: Dict[str, List[float]] = {phase: [] for phase in PHASES + ("total",)}
+    entry: Dict[str, Any] = {"spec": str(spec)}
+    for _ in range(repeat):
+        problem = io.StringIO()
+        result, timer, stats = asp.Solver().solve_with_stats(
+            [spec.copy()], out=problem, tests=tests, allow_deprecated=allow_deprecated
+        )
+        for phase in PHASES:
+            timings[phase].append(timer.duration(phase))
+        timings["total"].append(timer.duration())
+
+    lp_stats = stats["problem"]["lp"]
+    entry.update(
+        {
+            "hash": result.specs[0].dag_hash() if result.specs else None,
+            "models": result.nmodels,
+            "optimal": result.optimal,
+            "possible_dependencies": len(result.possible_dependencies or ()),
+            "facts": count_facts(problem.getvalue()),
+            **{name: int(lp_stats[name]) for name in LP_STATISTICS},
+            "seconds": {name: _summary(samples) for name, samples in timings.items()},
+            "peak_rss": peak_rss(),
+        }
+    )
+    return entry
+
+
+def run(
+    specs: Iterable[spack.spec.Spec],
+    *,
+    repeat: int = 1,
+    tests: Any = False,
+    allow_deprecated: bool = False,
+) -> Dict[str, Any]:
+    """Runs a benchmark over a corpus of specs, and returns the report.
+
+    Each spec is solved separately. The peak RSS recorded for a spec is the peak of the
+    process up to that point, so it is monotonic over the corpus.
+
+    Args:
+        specs: corpus of specs
+        repeat: number of times each spec is solved
+        tests: whether test dependencies are considered, possibly for only some packages
+        allow_deprecated: whether deprecated versions are allowed in the solve
+    """
+    entries = []
+    for spec in specs:
+        tty.debug(f"[BENCHMARK] solving {spec}")
+        entries.append(
+            benchmark_spec(spec, repeat=repeat, tests=tests, allow_deprecated=allow_deprecated)
+        )
+
+    return {
+        "format": FORMAT_VERSION,
+        "spack": {"version": spack.spack_version, "commit": spack.get_spack_commit()},
+        "host": {
+            "platform": str(spack.platforms.host()),
+            "target": str(archspec.cpu.host()),
+            "python": ".".join(str(x) for x in sys.version_info[:3]),
+        },
+        "repos": [repo.namespace for repo in spack.repo.PATH.repos],
+        "config": {"concretizer": spack.config.get("concretizer")},
+        "repeat": repeat,
+        "specs": entries,
+    }
+
+
+def write_report(report: Dict[str, Any], path: str) -> None:
+    """Writes a report to a JSON file"""
+    with open(path, "w", encoding="utf-8") as f:
+        sjson.dump(report, f)
+
+
+def read_report(path: str) -> Dict[str, Any]:
+    """Reads a report from a JSON file"""
+    with open(path, encoding="utf-8") as f:
+        report = sjson.load(f)
+
+    if report.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a solver benchmark report with format {FORMAT_VERSION}")
+    return report
+
+
+class Difference(NamedTuple):
+    """A metric that differs between a report and its baseline"""
+
+    spec: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def __str__(self) -> str:
+        return (
+            f"{self.spec}: {self.metric} went from {self.baseline:.3g} to {self.current:.3g} "
+            f"({self.ratio:.2f}x)"
+        )
+
+
+def compare(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    threshold: float = 0.1,
+    min_seconds: float = 0.05,
+) -> List[Difference]:
+    """Compares a report with a baseline, and returns the regressions.
+
+    Timings are compared using the minimum over the repetitions, which is the least affected
+    by noise. The number of facts and atoms are compared too, since an increase usually
+    anticipates a slowdown.
+
+    Args:
+        report: current report
+        baseline: report to compare against
+        threshold: relative increase above which a metric is considered a regression
+        min_seconds: absolute increase in time below which a timing is not considered a
+            regression, regardless of the relative increase
+    """
+    baseline_by_spec = {entry["spec"]: entry for entry in baseline["specs"]}
+    regressions = []
+    for entry in report["specs"]:
+        old = baseline_by_spec.get(entry["spec"])
+        if old is None:
+            continue
+
+        for phase, summary in entry["seconds"].items():
+            if phase not in old["seconds"]:
+                continue
+            before, after = old["seconds"][phase]["min"], summary["min"]
+            if after - before > max(min_seconds, threshold * before):
+                regressions.append(Difference(entry["spec"], f"{phase} time", before, after))
+
+        for metric in ("facts",) + LP_STATISTICS:
+            before, after = old.get(metric), entry.get(metric)
+            if before is None or after is None:
+                continue
+            if after > (1 + threshold) * before:
+                regressions.append(Difference(entry["spec"], metric, before, after))
+
+    return regressions
@@ -0,0 +1,571 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Persistent caches used to reduce the time spent in the setup phase of the solver."""
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Type
+
+import archspec.cpu
+
+from llnl.util import lang, tty
+
+import spack
+import spack.caches
+import spack.config
+import spack.environment as ev
+import spack.platforms
+import spack.repo
+import spack.spec
+import spack.util.file_cache
+
+from .core import AspFunction, AspVar
+
+#: Version of the data stored in the caches. It must be bumped whenever the content of an
+#: entry, or the way the ASP problem is generated from it, changes in an incompatible way.
+FORMAT_VERSION = 1
+
+#: Configuration sections that are read during the setup phase of the solver
+SETUP_CONFIG_SECTIONS = ("compilers", "concretizer", "packages")
+
+
+def _digest(obj: Any) -> str:
+    """Returns the sha256 of the JSON representation of an object"""
+    as_bytes = json.dumps(obj, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(as_bytes.encode("utf-8")).hexdigest()
+
+
+@lang.memoized
+def _spack_version() -> List[Optional[str]]:
+    return [spack.spack_version, spack.get_spack_commit()]
+
+
+def _spec_key(spec: spack.spec.Spec) -> List[Any]:
+    """Returns a JSON serializable object that uniquely identifies a (possibly abstract) spec"""
+    if spec.concrete:
+        return [spec.dag_hash()]
+    nodes = [[n.name, n.namespace, n.dag_hash() if n.concrete else None] for n in spec.traverse()]
+    return [str(spec), nodes]
+
+
+def _read_entry(cache: spack.util.file_cache.FileCache, name: str) -> Optional[Dict[str, Any]]:
+    """Reads a JSON entry from a file cache. Returns None if the entry doesn't exist, or if it
+    cannot be read or has been written with a different format.
+    """
+    if not cache.init_entry(name):
+        return None
+
+    try:
+        with cache.read_transaction(name) as f:
+            if f is None:
+                return None
+            data = json.load(f)
+    except (OSError, ValueError, spack.util.file_cache.CacheError) as e:
+        tty.debug(f"[SOLVER CACHE] cannot read {name}: {e}")
+        return None
+
+    if not isinstance(data, dict) or data.get("format") != FORMAT_VERSION:
+        return None
+
+    return data
+
+
+def _write_entry(cache: spack.util.file_cache.FileCache, name: str, data: Dict[str, Any]) -> None:
+    """Writes a JSON entry to a file cache. Failures to write are not fatal."""
+    data = dict(data, format=FORMAT_VERSION)
+    try:
+        cache.init_entry(name)
+        with cache.write_transaction(name) as (_, new):
+            json.dump(data, new, separators=(",", ":"))
+    except (OSError, TypeError, ValueError, spack.util.file_cache.CacheError) as e:
+        tty.debug(f"[SOLVER CACHE] cannot write {name}: {e}")
+
+
+class SetupCache:
+    """Persistent cache for the ASP problems generated in the setup phase of the solver.
+
+    Entries are stored in the misc cache, and are keyed by a digest of everything the setup
+    phase depends on: the content of the package repositories, the relevant configuration
+    sections, the host, the active environment's develop specs, the input specs and the set
+    of specs that can be reused. Repeated solves of the same input can thus skip the setup
+    phase entirely.
+    """
+
+    #: Directory, relative to the root of the misc cache, where entries are stored
+    prefix = os.path.join("solver", "setup")
+
+    def __init__(
+        self,
+        cache: spack.util.file_cache.FileCache,
+        *,
+        configuration: spack.config.Configuration,
+        repo: spack.repo.RepoPath,
+    ) -> None:
+        self.cache = cache
+        self.configuration = configuration
+        self.repo = repo
+
+    def key(
+        self,
+        specs: List[spack.spec.Spec],
+        *,
+        reuse: Optional[List[spack.spec.Spec]],
+        tests: Any,
+        allow_deprecated: bool,
+        concretize_everything: bool,
+    ) -> str:
+        """Returns the key of the cache entry for a solve.
+
+        Args:
+            specs: input specs of the solve
+            reuse: concrete specs that can be reused in the solve
+            tests: whether test dependencies are considered, possibly for only some packages
+            allow_deprecated: whether deprecated versions are allowed in the solve
+            concretize_everything: whether all the input specs must be solved
+        """
+        env = ev.active_environment()
+        dev_specs = env.dev_specs if env else {}
+        tests_key = sorted(tests) if isinstance(tests, (list, tuple, set)) else bool(tests)
+        data = {
+            "format": FORMAT_VERSION,
+            "spack": _spack_version(),
+            "repo": self.repo.digest(),
+            "config": {s: self.configuration.get(s) for s in SETUP_CONFIG_SECTIONS},
+            "host": [str(spack.platforms.host()), str(archspec.cpu.host())],
+            "dev_specs": dev_specs,
+            "specs": [_spec_key(s) for s in specs],
+            "reuse": sorted({s.dag_hash() for s in reuse or []}),
+            "tests": tests_key,
+            "allow_deprecated": allow_deprecated,
+            "concretize_everything": concretize_everything,
+            "require_checksum": "SPACK_CONCRETIZER_REQUIRE_CHECKSUM" in os.environ,
+        }
+        return _digest(data)
+
+    def _entry_name(self, key: str) -> str:
+        return os.path.join(self.prefix, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cache entry associated with a key, or None if there is no valid entry"""
+        return _read_entry(self.cache, self._entry_name(key))
+
+    def put(self, key: str, data: Dict[str, Any]) -> None:
+        """Stores a cache entry under a key. Failures to write are not fatal."""
+        _write_entry(self.cache, self._entry_name(key), data)
+
+
+def create_setup_cache(configuration: spack.config.Configuration) -> Optional[SetupCache]:
+    """Returns the cache for the setup phase of the solver, or None if it is disabled"""
+    if not configuration.get("concretizer:cache:setup", False):
+        return None
+    return SetupCache(spack.caches.MISC_CACHE, configuration=configuration, repo=spack.repo.PATH)
+
+
+class LocalId(int):
+    """An id allocated by the solver setup while recording the facts of a package.
+
+    Recorded ids are replaced by ids allocated from the solver setup each time the facts are
+    replayed, in the same relative order.
+    """
+
+
+def encode_argument(arg: Any) -> Any:
+    """Encodes the argument of an ASP function into a JSON serializable object"""
+    if isinstance(arg, LocalId):
+        return ["i", int(arg)]
+    elif isinstance(arg, bool):
+        return str(arg)
+    elif isinstance(arg, int):
+        return ["n", arg]
+    elif isinstance(arg, AspFunction):
+        return ["f", arg.name, [encode_argument(x) for x in arg.args]]
+    elif isinstance(arg, AspVar):
+        return ["v", arg.name]
+    return str(arg)
+
+
+def decode_argument(data: Any, ids: List[int]) -> Any:
+    """Decodes an argument encoded by ``encode_argument``.
+
+    Args:
+        data: encoded argument
+        ids: ids to be substituted to the recorded ones
+    """
+    if isinstance(data, str):
+        return data
+
+    tag = data[0]
+    if tag == "i":
+        return ids[data[1]]
+    elif tag == "n":
+        return data[1]
+    elif tag == "f":
+        return AspFunction(data[1], tuple(decode_argument(x, ids) for x in data[2]))
+    elif tag == "v":
+        return AspVar(data[1])
+    raise ValueError(f"cannot decode {data}")
+
+
+def recipe_digest(pkg_cls: Type["spack.package_base.PackageBase"]) -> str:
+    """Returns a digest of the package.py files defining a package class, including those of
+    the other packages it inherits from.
+    """
+    files = [
+        spack.repo.file_digest(inspect.getfile(cls))
+        for cls in pkg_cls.__mro__
+        if cls.__module__.startswith(spack.repo.ROOT_PYTHON_NAMESPACE)
+    ]
+    return _digest(files)
+
+
+class PackageFactsCache:
+    """Persistent cache for the facts that the setup phase of the solver generates from the
+    recipe of each package (conditions, variants, conflicts, dependencies, requirements etc.).
+
+    Entries are stored in the misc cache, one for each package, and are keyed by a digest of the
+    package recipe and of the part of the configuration and of the solve that can affect its
+    facts. Each entry also records the recipes of the other packages that were consulted while
+    generating the facts, and is discarded if any of them changed.
+    """
+
+    #: Directory, relative to the root of the misc cache, where entries are stored
+    prefix = os.path.join("solver", "packages")
+
+    #: Entries already read or written in this process, by path
+    _in_memory: Dict[str, Dict[str, Any]] = {}
+
+    def __init__(
+        self,
+        cache: spack.util.file_cache.FileCache,
+        *,
+        configuration: spack.config.Configuration,
+        repo: spack.repo.RepoPath,
+    ) -> None:
+        self.cache = cache
+        self.configuration = configuration
+        # Part of the key that is common to all the packages
+        self._common_key = {
+            "format": FORMAT_VERSION,
+            "spack": _spack_version(),
+            "virtuals": _digest(sorted(repo.provider_index.providers)),
+            "all": self.configuration.get("packages:all", {}),
+        }
+
+    def key(
+        self,
+        pkg_cls: Type["spack.package_base.PackageBase"],
+        *,
+        possible_virtuals: Set[str],
+        tests: Any,
+        enable_splicing: bool,
+    ) -> str:
+        """Returns the key of the cache entry for a package.
+
+        Args:
+            pkg_cls: package class
+            possible_virtuals: virtuals that are possible in the current solve
+            tests: whether test dependencies are considered, possibly for only some packages
+            enable_splicing: whether automatic splicing is enabled
+        """
+        pkg_config = self.configuration.get(f"packages:{pkg_cls.name}", {})
+        relevant_virtuals = set(pkg_cls.provided_virtual_names()) | set(
+            pkg_config.get("providers", {})
+        )
+        tests_key = pkg_cls.name in tests if isinstance(tests, (list, tuple, set)) else tests
+        data = {
+            "common": self._common_key,
+            "name": pkg_cls.fullname,
+            "recipe": recipe_digest(pkg_cls),
+            "config": pkg_config,
+            "virtuals": sorted(relevant_virtuals & possible_virtuals),
+            "tests": bool(tests_key),
+            "splicing": enable_splicing,
+        }
+        return _digest(data)
+
+    def _entry_name(self, pkg_cls: Type["spack.package_base.PackageBase"]) -> str:
+        return os.path.join(self.prefix, f"{pkg_cls.fullname}.json")
+
+    def get(
+        self,
+        pkg_cls: Type["spack.package_base.PackageBase"],
+        key: str,
+        *,
+        pkg_class: Callable[[str], Type["spack.package_base.PackageBase"]],
+    ) -> Optional[Dict[str, Any]]:
+        """Returns the cache entry for a package, or None if there is no valid entry.
+
+        Args:
+            pkg_cls: package class
+            key: key of the entry, as returned by ``key()``
+            pkg_class: function returning the class of the other packages the entry depends on
+        """
+        name = self._entry_name(pkg_cls)
+        path = self.cache.cache_path(name)
+        data = self._in_memory.get(path)
+        if data is None or data.get("key") != key:
+            data = _read_entry(self.cache, name)
+        if data is None or data.get("key") != key:
+            return None
+        self._in_memory[path] = data
+
+        try:
+            for name, digest in data["depends"].items():
+                if recipe_digest(pkg_class(name)) != digest:
+                    return None
+        except (KeyError, AttributeError, spack.repo.RepoError):
+            return None
+
+        return data
+
+    def put(
+        self,
+        pkg_cls: Type["spack.package_base.PackageBase"],
+        key: str,
+        data: Dict[str, Any],
+        *,
+        depends: Iterable[Type["spack.package_base.PackageBase"]],
+    ) -> None:
+        """Stores the cache entry for a package.
+
+        Args:
+            pkg_cls: package class
+            key: key of the entry, as returned by ``key()``
+            data: facts and side effects recorded for the package
+            depends: classes of the other packages that were consulted to record the facts
+        """
+        data = dict(
+            data, key=key, depends={x.name: recipe_digest(x) for x in depends if x is not pkg_cls}
+        )
+        name = self._entry_name(pkg_cls)
+        self._in_memory[self.cache.cache_path(name)] = data
+        _write_entry(self.cache, name, data)
+
+
+def create_package_facts_cache(
+    configuration: spack.config.Configuration,
+) -> Optional[PackageFactsCache]:
+    """Returns the cache for the facts generated from package recipes, or None if disabled"""
+    if not configuration.get("concretizer:cache:packages", False):
+        return None
+    return PackageFactsCache(
+        spack.caches.MISC_CACHE, configuration=configuration, repo=spack.repo.PATH
+    )
+
+
+class ReusableSpecsCache:
+    """Persistent cache for the facts that the setup phase of the solver generates for each
+    concrete spec that can be reused.
+
+    Facts for a concrete spec depend only on its DAG hash, and on a few properties of the host
+    (e.g. the libcs targeted by compilers), which are part of the directory where entries are
+    stored. Entries are sharded by package name, so that a solve reads only the entries of
+    packages that are possible dependencies.
+    """
+
+    #: Directory, relative to the root of the misc cache, where entries are stored
+    prefix = os.path.join("solver", "reusable")
+
+    #: Shards already read or written in this process, by path
+    _in_memory: Dict[str, Dict[str, str]] = {}
+
+    def __init__(self, cache: spack.util.file_cache.FileCache, *, context: Any) -> None:
+        """
+        Args:
+            cache: file cache where entries are stored
+            context: JSON serializable object with anything, other than the spec itself, that
+                affects the facts of a concrete spec
+        """
+        self.cache = cache
+        self.directory = os.path.join(
+            self.prefix, _digest([FORMAT_VERSION, _spack_version(), context])
+        )
+        self._new_entries: Dict[str, Dict[str, str]] = {}
+
+    def _entry_name(self, pkg_name: str) -> str:
+        return os.path.join(self.directory, f"{pkg_name}.json")
+
+    def _shard(self, pkg_name: str) -> Dict[str, str]:
+        name = self._entry_name(pkg_name)
+        path = self.cache.cache_path(name)
+        if path not in self._in_memory:
+            data = _read_entry(self.cache, name)
+            facts = data.get("facts") if data else None
+            self._in_memory[path] = facts if isinstance(facts, dict) else {}
+        return self._in_memory[path]
+
+    def get(self, pkg_name: str, dag_hash: str) -> Optional[str]:
+        """Returns the facts for a concrete spec, or None if they are not in the cache"""
+        return self._shard(pkg_name).get(dag_hash)
+
+    def add(self, pkg_name: str, dag_hash: str, facts: str) -> None:
+        """Adds the facts for a concrete spec. They are written to disk by ``flush()``."""
+        self._shard(pkg_name)[dag_hash] = facts
+        self._new_entries.setdefault(pkg_name, {})[dag_hash] = facts
+
+    def flush(self) -> None:
+        """Writes the entries added since the last flush to disk, merging them with those
+        that other processes may have written in the meantime. Failures are not fatal.
+        """
+        for pkg_name, entries in self._new_entries.items():
+            name = self._entry_name(pkg_name)
+            try:
+                self.cache.init_entry(name)
+                with self.cache.write_transaction(name) as (old, new):
+                    facts: Dict[str, str] = {}
+                    if old is not None:
+                        try:
+                            data = json.load(old)
+                            if data.get("format") == FORMAT_VERSION:
+                                facts.update(data["facts"])
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            pass
+                    facts.update(entries)
+                    json.dump({"format": FORMAT_VERSION, "facts": facts}, new)
+            except (OSError, spack.util.file_cache.CacheError) as e:
+                tty.debug(f"[SOLVER CACHE] cannot write {name}: {e}")
+        self._new_entries.clear()
+
+
+def create_reusable_specs_cache(
+    configuration: spack.config.Configuration, *, context: Any
+) -> Optional[ReusableSpecsCache]:
+    """Returns the cache for the facts of reusable specs, or None if it is disabled"""
+    if not configuration.get("concretizer:cache:reusable_specs", False):
+        return None
+    return ReusableSpecsCache(spack.caches.MISC_CACHE, context=context)
+
+
+def _file_record(path: str) -> List[Any]:
+    """Returns the path of a file, together with its stat information and digest"""
+    sinfo = os.stat(path)
+    return [path, sinfo.st_mtime_ns, sinfo.st_size, spack.repo.file_digest(path, sinfo)]
+
+
+def _file_is_unchanged(record: List[Any]) -> bool:
+    """Returns True if a file has the content recorded by ``_file_record``. The digest is
+    recomputed only if the stat information of the file changed.
+    """
+    path, mtime_ns, size, digest = record
+    try:
+        sinfo = os.stat(path)
+    except OSError:
+        return False
+    if sinfo.st_mtime_ns == mtime_ns and sinfo.st_size == size:
+        return True
+    return spack.repo.file_digest(path, sinfo) == digest
+
+
+class PossibleDependenciesCache:
+    """Persistent index of the direct dependencies of each package, used to compute the
+    possible dependencies of specs without importing package recipes.
+
+    The index is stored in a single entry of the misc cache for each set of package
+    repositories and host. Each package records the files its class is defined in, and only
+    the packages for which any of these files changed are read again from their recipe.
+    Virtual dependencies are stored as such, and expanded using the provider index.
+    """
+
+    #: Directory, relative to the root of the misc cache, where entries are stored
+    prefix = os.path.join("solver", "possible_dependencies")
+
+    #: Indexes already read or written in this process, by path
+    _in_memory: Dict[str, Dict[str, Any]] = {}
+
+    def __init__(self, cache: spack.util.file_cache.FileCache, *, repo: spack.repo.RepoPath):
+        self.cache = cache
+        self.repo = repo
+        key = {
+            "format": FORMAT_VERSION,
+            "spack": _spack_version(),
+            "repos": [[r.namespace, r.root] for r in repo.repos],
+            "host": [str(spack.platforms.host()), archspec.cpu.host().family.name],
+        }
+        self.name = os.path.join(self.prefix, f"{_digest(key)}.json")
+        self._validated: Set[str] = set()
+        self._new_entries: Dict[str, Dict[str, Any]] = {}
+
+    def _index(self) -> Dict[str, Any]:
+        path = self.cache.cache_path(self.name)
+        if path not in self._in_memory:
+            data = _read_entry(self.cache, self.name)
+            packages = data.get("packages") if data else None
+            self._in_memory[path] = packages if isinstance(packages, dict) else {}
+        return self._in_memory[path]
+
+    def get(self, pkg_name: str) -> Optional[Dict[str, Any]]:
+        """Returns the entry for a package, or None if there is no valid entry"""
+        entry = self._index().get(pkg_name)
+        if entry is None or pkg_name in self._validated:
+            return entry
+
+        try:
+            files = entry["files"]
+            valid = files[0][0] == self.repo.filename_for_package_name(pkg_name) and all(
+                _file_is_unchanged(x) for x in files
+            )
+        except (KeyError, IndexError, TypeError, ValueError, spack.repo.RepoError):
+            valid = False
+
+        if not valid:
+            return None
+        self._validated.add(pkg_name)
+        return entry
+
+    def put(self, pkg_cls: Type["spack.package_base.PackageBase"], data: Dict[str, Any]) -> None:
+        """Stores the entry for a package. It is written to disk by ``flush()``.
+
+        Args:
+            pkg_cls: package class
+            data: direct dependencies of the package, and whether it is allowed on the host
+        """
+        try:
+            files = [
+                _file_record(inspect.getfile(cls))
+                for cls in pkg_cls.__mro__
+                if cls.__module__.startswith(spack.repo.ROOT_PYTHON_NAMESPACE)
+            ]
+        except (OSError, TypeError) as e:
+            tty.debug(f"[SOLVER CACHE] cannot index {pkg_cls.name}: {e}")
+            return
+        entry = dict(data, files=files)
+        self._index()[pkg_cls.name] = entry
+        self._validated.add(pkg_cls.name)
+        self._new_entries[pkg_cls.name] = entry
+
+    def flush(self) -> None:
+        """Writes the entries stored since the last flush to disk, merging them with those
+        that other processes may have written in the meantime. Failures are not fatal.
+        """
+        if not self._new_entries:
+            return
+
+        try:
+            self.cache.init_entry(self.name)
+            with self.cache.write_transaction(self.name) as (old, new):
+                packages: Dict[str, Any] = {}
+                if old is not None:
+                    try:
+                        data = json.load(old)
+                        if data.get("format") == FORMAT_VERSION:
+                            packages.update(data["packages"])
+                    except (ValueError, KeyError, TypeError, AttributeError):
+                        pass
+                packages.update(self._new_entries)
+                json.dump(
+                    {"format": FORMAT_VERSION, "packages": packages}, new, separators=(",", ":")
+                )
+        except (OSError, spack.util.file_cache.CacheError) as e:
+            tty.debug(f"[SOLVER CACHE] cannot write {self.name}: {e}")
+        self._new_entries.clear()
+
+
+def create_possible_dependencies_cache(
+    configuration: spack.config.Configuration,
+) -> Optional[PossibleDependenciesCache]:
+    """Returns the index of the direct dependencies of packages, or None if it is disabled"""
+    if not configuration.get("concretizer:cache:possible_dependencies", False):
+        return None
+    return PossibleDependenciesCache(spack.caches.MISC_CACHE, repo=spack.repo.PATH)
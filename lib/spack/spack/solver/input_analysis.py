@@ -3,7 +3,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 """Classes to analyze the input of a solve, and provide information to set up the ASP problem"""
 import collections
-from typing import Dict, List, NamedTuple, Set, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 import archspec.cpu
 
@@ -18,6 +18,8 @@
 import spack.store
 from spack.error import SpackError
 
+from .caching import PossibleDependenciesCache, create_possible_dependencies_cache
+
 RUNTIME_TAG = "runtime"
 
 
@@ -40,6 +42,15 @@ def candidate_targets(self) -> List[archspec.cpu.Microarchitecture]:
         """Returns a list of targets that are candidate for concretization"""
         raise NotImplementedError
 
+    def direct_dependencies(self, pkg_name: str) -> Dict[str, List[dt.DepFlag]]:
+        """Returns the direct dependencies of a package, in the order they are declared, each
+        with the distinct dependency types it may have under any condition.
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Writes to disk any information on packages that is cached across processes"""
+
     def possible_dependencies(
         self,
         *specs: Union[spack.spec.Spec, str],
@@ -67,9 +78,17 @@ class NoStaticAnalysis(PossibleDependencyGraph):
     answers), rather than trying to reduce the ASP problem size with more complex analysis.
     """
 
-    def __init__(self, *, configuration: spack.config.Configuration, repo: spack.repo.RepoPath):
+    def __init__(
+        self,
+        *,
+        configuration: spack.config.Configuration,
+        repo: spack.repo.RepoPath,
+        cache: Optional[PossibleDependenciesCache] = None,
+    ):
         self.configuration = configuration
         self.repo = repo
+        self.cache = cache
+        self._summaries: Dict[str, Dict[str, Any]] = {}
         self.runtime_pkgs = set(self.repo.packages_with_tags(RUNTIME_TAG))
         self.runtime_virtuals = set()
         self._platform_condition = spack.spec.Spec(
@@ -87,16 +106,56 @@ def __init__(self, *, configuration: spack.config.Configuration, repo: spack.rep
     def is_virtual(self, name: str) -> bool:
         return self.repo.is_virtual(name)
 
-    @lang.memoized
     def is_allowed_on_this_platform(self, *, pkg_name: str) -> bool:
         """Returns true if a package is allowed on the current host"""
-        pkg_cls = self.repo.get_pkg_class(pkg_name)
+        return self._summary(pkg_name)["allowed"]
+
+    def direct_dependencies(self, pkg_name: str) -> Dict[str, List[dt.DepFlag]]:
+        """Returns the direct dependencies of a package, in the order they are declared, each
+        with the distinct dependency types it may have under any condition.
+        """
+        return self._summary(pkg_name)["dependencies"]
+
+    def flush(self) -> None:
+        """Writes to disk the information on packages computed so far, if the cache of
+        possible dependencies is enabled.
+        """
+        if self.cache is not None:
+            self.cache.flush()
+
+    def _summary(self, pkg_name: str) -> Dict[str, Any]:
+        """Returns the direct dependencies of a package, and whether it is allowed on the
+        current host, reading them from the cache if possible.
+        """
+        summary = self._summaries.get(pkg_name)
+        if summary is not None:
+            return summary
+
+        if self.cache is not None:
+            summary = self.cache.get(pkg_name)
+
+        if summary is None:
+            pkg_cls = self.repo.get_pkg_class(pkg_name)
+            summary = {
+                "dependencies": {
+                    name: _depflags(conditions)
+                    for name, conditions in pkg_cls.dependencies_by_name(when=True).items()
+                },
+                "allowed": self._allowed_on_this_platform(pkg_cls),
+            }
+            if self.cache is not None:
+                self.cache.put(pkg_cls, summary)
+
+        self._summaries[pkg_name] = summary
+        return summary
+
+    def _allowed_on_this_platform(self, pkg_cls) -> bool:
         for when_spec, conditions in pkg_cls.requirements.items():
             if not when_spec.intersects(self._platform_condition):
                 continue
             for requirements, _, _ in conditions:
                 if not any(x.intersects(self._platform_condition) for x in requirements):
-                    tty.debug(f"[{__name__}] {pkg_name} is not for this platform")
+                    tty.debug(f"[{__name__}] {pkg_cls.name} is not for this platform")
                     return False
         return True
 
@@ -168,17 +227,9 @@ def possible_dependencies(
             if pkg_name in self.libc_pkgs:
                 continue
 
-            pkg_cls = self.repo.get_pkg_class(pkg_name=pkg_name)
-            for name, conditions in pkg_cls.dependencies_by_name(when=True).items():
-                if all(self.unreachable(pkg_name=pkg_name, when_spec=x) for x in conditions):
-                    tty.debug(
-                        f"[{__name__}] Not adding {name} as a dep of {pkg_name}, because "
-                        f"conditions cannot be met"
-                    )
-                    continue
-
+            for name, depflags in self.direct_dependencies(pkg_name).items():
                 if not self._has_deptypes(
-                    conditions, allowed_deps=allowed_deps, strict=strict_depflag
+                    depflags, allowed_deps=allowed_deps, strict=strict_depflag
                 ):
                     continue
 
@@ -214,6 +265,7 @@ def possible_dependencies(
             for root, children in edges.items():
                 real_packages.update(x for x in children if self._is_possible(pkg_name=x))
 
+        self.flush()
         virtuals.update(self.runtime_virtuals)
         real_packages = real_packages | self.runtime_pkgs
         return PossibleGraph(real_pkgs=real_packages, virtuals=virtuals, edges=edges)
@@ -231,14 +283,12 @@ def _package_list(self, specs: Tuple[Union[spack.spec.Spec, str], ...]) -> List[
             stack.append(current_spec.name)
         return sorted(set(stack))
 
-    def _has_deptypes(self, dependencies, *, allowed_deps: dt.DepFlag, strict: bool) -> bool:
+    def _has_deptypes(
+        self, depflags: List[dt.DepFlag], *, allowed_deps: dt.DepFlag, strict: bool
+    ) -> bool:
         if strict is True:
-            return any(
-                dep.depflag == allowed_deps for deplist in dependencies.values() for dep in deplist
-            )
-        return any(
-            dep.depflag & allowed_deps for deplist in dependencies.values() for dep in deplist
-        )
+            return any(depflag == allowed_deps for depflag in depflags)
+        return any(depflag & allowed_deps for depflag in depflags)
 
     def _is_possible(self, *, pkg_name):
         try:
@@ -249,6 +299,11 @@ def _is_possible(self, *, pkg_name):
             return False
 
 
+def _depflags(conditions) -> List[dt.DepFlag]:
+    """Returns the distinct dependency types of a dependency, under any of its conditions"""
+    return sorted({dep.depflag for deplist in conditions.values() for dep in deplist})
+
+
 class StaticAnalysis(NoStaticAnalysis):
     """Performs some static analysis of the configuration, store, etc. to provide more precise
     answers on whether some packages can be installed, or used as a provider.
@@ -269,6 +324,22 @@ def __init__(
         self.store = store
         self.binary_index = binary_index
 
+    @lang.memoized
+    def direct_dependencies(self, pkg_name: str) -> Dict[str, List[dt.DepFlag]]:
+        # Dependencies whose conditions cannot be met depend on the configuration, so they are
+        # always computed from the package class.
+        pkg_cls = self.repo.get_pkg_class(pkg_name=pkg_name)
+        result = {}
+        for name, conditions in pkg_cls.dependencies_by_name(when=True).items():
+            if all(self.unreachable(pkg_name=pkg_name, when_spec=x) for x in conditions):
+                tty.debug(
+                    f"[{__name__}] Not adding {name} as a dep of {pkg_name}, because "
+                    f"conditions cannot be met"
+                )
+                continue
+            result[name] = _depflags(conditions)
+        return result
+
     @lang.memoized
     def providers_for(self, virtual_str: str) -> List[spack.spec.Spec]:
         candidates = super().providers_for(virtual_str)
@@ -348,8 +419,15 @@ def unreachable(self, *, pkg_name: str, when_spec: spack.spec.Spec) -> bool:
         return False
 
 
-def create_graph_analyzer() -> PossibleDependencyGraph:
-    static_analysis = spack.config.CONFIG.get("concretizer:static_analysis", False)
+def create_graph_analyzer(*, static_analysis: Optional[bool] = None) -> PossibleDependencyGraph:
+    """Returns the analyzer of possible dependencies selected by configuration.
+
+    Args:
+        static_analysis: whether to perform static analysis of the configuration. If None,
+            the value in ``concretizer:static_analysis`` is used.
+    """
+    if static_analysis is None:
+        static_analysis = spack.config.CONFIG.get("concretizer:static_analysis", False)
     if static_analysis:
         return StaticAnalysis(
             configuration=spack.config.CONFIG,
@@ -357,7 +435,11 @@ def create_graph_analyzer() -> PossibleDependencyGraph:
             store=spack.store.STORE,
             binary_index=spack.binary_distribution.BINARY_INDEX,
         )
-    return NoStaticAnalysis(configuration=spack.config.CONFIG, repo=spack.repo.PATH)
+    return NoStaticAnalysis(
+        configuration=spack.config.CONFIG,
+        repo=spack.repo.PATH,
+        cache=create_possible_dependencies_cache(spack.config.CONFIG),
+    )
 
 
 class Counter:
@@ -58,6 +58,7 @@
 import platform
 import re
 import socket
+import sys
 import warnings
 from typing import (
     Any,
@@ -230,7 +231,17 @@ def ensure_modern_format_string(fmt: str) -> None:
 def _make_microarchitecture(name: str) -> archspec.cpu.Microarchitecture:
     if isinstance(name, archspec.cpu.Microarchitecture):
         return name
-    return archspec.cpu.TARGETS.get(name, archspec.cpu.generic_microarchitecture(name))
+    if name in archspec.cpu.TARGETS:
+        return archspec.cpu.TARGETS[name]
+    return _generic_microarchitecture(name)
+
+
+@lang.memoized
+def _generic_microarchitecture(name: str) -> archspec.cpu.Microarchitecture:
+    """Returns a generic microarchitecture for a target unknown to archspec. The same object is
+    returned for the same name, so that specs read from files share it.
+    """
+    return archspec.cpu.generic_microarchitecture(name)
 
 
 @lang.lazy_lexicographic_ordering
@@ -619,7 +630,7 @@ def from_dict(d):
         if not isinstance(target_name, str):
             target_name = target_name["name"]
         target = _make_microarchitecture(target_name)
-        return ArchSpec((arch["platform"], arch["platform_os"], target))
+        return ArchSpec((_intern(arch["platform"]), _intern(arch["platform_os"]), target))
 
     def __str__(self):
         return "%s-%s-%s" % (self.platform, self.os, self.target)
@@ -664,7 +675,7 @@ def __init__(self, *args):
         elif nargs == 2:
             name, version = args
             self.name = name
-            self.versions = vn.VersionList([vn.ver(version)])
+            self.versions = vn.VersionList(vn.ver(version))
 
         else:
             raise TypeError("__init__ takes 1 or 2 arguments. (%d given)" % nargs)
@@ -739,7 +750,11 @@ def to_dict(self):
     @staticmethod
     def from_dict(d):
         d = d["compiler"]
-        return CompilerSpec(d["name"], vn.VersionList.from_dict(d))
+        if "version" in d:
+            versions = vn.VersionList(_shared_version(d["version"]))
+        else:
+            versions = vn.VersionList.from_dict(d)
+        return CompilerSpec(_intern(d["name"]), versions)
 
     @property
     def display_str(self):
@@ -1108,6 +1123,38 @@ def clear(self):
         self.edges.clear()
 
 
+class _LazyEdgeMap(_EdgeMap):
+    """A collection of edges that calls a function to add missing edges, the first time the
+    edges are accessed. Edges can be added without triggering the call.
+    """
+
+    __slots__ = "_edges", "_load"
+
+    def __init__(
+        self, store_by_child: bool = True, load: Optional[Callable[[], None]] = None
+    ) -> None:
+        super().__init__(store_by_child)
+        self._load = load
+
+    @property  # type: ignore[override]
+    def edges(self) -> Dict[str, List[DependencySpec]]:
+        load, self._load = self._load, None
+        if load is not None:
+            load()
+        return self._edges
+
+    @edges.setter
+    def edges(self, value: Dict[str, List[DependencySpec]]) -> None:
+        self._edges = value
+
+    def add(self, edge: DependencySpec) -> None:
+        load, self._load = self._load, None
+        try:
+            super().add(edge)
+        finally:
+            self._load = load
+
+
 def _command_default_handler(spec: "Spec"):
     """Default handler when looking for the 'command' attribute.
 
@@ -1502,7 +1549,7 @@ def __init__(self, spec_like=None, *, external_path=None, external_modules=None)
 
         # init an empty spec that matches anything.
         self.name = None
-        self.versions = vn.VersionList(":")
+        self.versions = vn.VersionList(vn.any_version)
         self.variants = VariantMap(self)
         self.architecture = None
         self.compiler = None
@@ -1869,6 +1916,17 @@ def add_dependency_edge(
         self._dependencies.add(edge)
         dependency_spec._dependents.add(edge)
 
+    def _add_trusted_dependency(
+        self, spec: "Spec", *, depflag: dt.DepFlag, virtuals: Tuple[str, ...]
+    ):
+        """Add an edge to a dependency, without checking it against the existing edges.
+
+        Only for edges read from concrete specs, which are consistent by construction.
+        """
+        edge = DependencySpec(self, spec, depflag=depflag, virtuals=virtuals)
+        self._dependencies.add(edge)
+        spec._dependents.add(edge)
+
     #
     # Public interface
     #
@@ -2753,10 +2811,7 @@ def from_dict(data) -> "Spec":
         else:
             spec = SpecfileV4.load(data)
 
-        # Any git version should
-        for s in spec.traverse():
-            s.attach_git_version_lookup()
-
+        # Git lookups are attached to git versions by the readers, when nodes are read
         return spec
 
     @staticmethod
@@ -4487,6 +4542,8 @@ class VariantMap(lang.HashableMap):
     """Map containing variant instances. New values can be added only
     if the key is not already present."""
 
+    __slots__ = ("spec",)
+
     def __init__(self, spec: Spec):
         super().__init__()
         self.spec = spec
@@ -4788,6 +4845,29 @@ def reconstruct_virtuals_on_edges(spec: Spec) -> None:
             edge.update_virtuals(virtuals_to_add)
 
 
+#: Versions read from specfiles, shared among all the nodes with the same version
+_SHARED_VERSIONS: Dict[str, vn.StandardVersion] = {}
+
+
+def _shared_version(string: str) -> vn.ConcreteVersion:
+    """Returns the version corresponding to a string read from a specfile.
+
+    Standard versions are immutable, so the same object is returned for the same string, which
+    reduces memory usage when reading large databases or lockfiles. Git versions are not shared,
+    since a lookup is attached to them later.
+    """
+    result = _SHARED_VERSIONS.get(string)
+    if result is None:
+        result = vn.Version(string)
+        if isinstance(result, vn.StandardVersion):
+            _SHARED_VERSIONS[string] = result
+    return result
+
+
+def _intern(string: Optional[str]) -> Optional[str]:
+    return None if string is None else sys.intern(string)
+
+
 class SpecfileReaderBase:
     @classmethod
     def from_node_dict(cls, node):
@@ -4797,10 +4877,14 @@ def from_node_dict(cls, node):
         for h in ht.hashes:
             setattr(spec, h.attr, node.get(h.name, None))
 
-        spec.name = name
-        spec.namespace = node.get("namespace", None)
+        # Names and namespaces are repeated across many nodes, so they are interned
+        spec.name = _intern(name)
+        spec.namespace = _intern(node.get("namespace", None))
 
-        if "version" in node or "versions" in node:
+        if "version" in node:
+            spec.versions = vn.VersionList(_shared_version(node["version"]))
+            spec.attach_git_version_lookup()
+        elif "versions" in node:
             spec.versions = vn.VersionList.from_dict(node)
             spec.attach_git_version_lookup()
 
@@ -4857,7 +4941,70 @@ def from_node_dict(cls, node):
         return spec
 
     @classmethod
-    def _load(cls, data):
+    def from_concrete_node_dict(cls, node):
+        """Like ``from_node_dict``, but faster for nodes of concrete specs.
+
+        The content of a concrete node was validated when the spec was concretized, and is
+        identified by its hashes, so versions and variants are constructed directly instead of
+        going through parsing and validation. Nodes that are abstract, or that use legacy
+        fields, are read with ``from_node_dict``.
+        """
+        name, data = cls.name_and_data(node)
+        if not data.get("concrete", True) or "version" not in data:
+            return cls.from_node_dict(node)
+
+        spec = Spec()
+        for h in ht.hashes:
+            setattr(spec, h.attr, data.get(h.name, None))
+
+        spec.name = _intern(name)
+        spec.namespace = _intern(data.get("namespace", None))
+        version = _shared_version(data["version"])
+        spec.versions = vn.VersionList(version)
+        if isinstance(version, vn.GitVersion):
+            spec.attach_git_version_lookup()
+
+        if "arch" in data:
+            spec.architecture = ArchSpec.from_dict(data)
+
+        if "compiler" in data:
+            spec.compiler = CompilerSpec.from_dict(data)
+
+        propagated_names = data.get("propagate", ())
+        for name, values in data.get("parameters", {}).items():
+            propagate = name in propagated_names
+            if name in _valid_compiler_flags:
+                spec.compiler_flags[name] = []
+                for val in values:
+                    spec.compiler_flags.add_flag(name, val, propagate)
+            else:
+                spec.variants.dict[name] = vt.AbstractVariant.from_concrete_node_dict(
+                    name, values, propagate=propagate
+                )
+
+        spec.external_path = None
+        spec.external_modules = None
+        external = data.get("external")
+        if external:
+            spec.external_path = external["path"]
+            if external["module"] is not False:
+                spec.external_modules = external["module"]
+            spec.extra_attributes = external.get("extra_attributes") or {}
+
+        spec._concrete = True
+        if isinstance(version, vn.GitVersion):
+            spec._validate_version()
+
+        patches = data.get("patches")
+        if patches:
+            mvar = spec.variants.setdefault("patches", vt.MultiValuedVariant("patches", ()))
+            mvar.value = patches
+            mvar._patches_in_order_of_appearance = patches
+
+        return spec
+
+    @classmethod
+    def _load(cls, data, *, trusted: bool = True):
         """Construct a spec from JSON/YAML using the format version 2.
 
         This format is used in Spack v0.17, was introduced in
@@ -4865,56 +5012,39 @@ def _load(cls, data):
 
         Args:
             data: a nested dict/list data structure read from YAML or JSON.
+            trusted: if True, concrete nodes are read with ``from_concrete_node_dict``, and
+                the edges among them are added without checking them against each other
         """
         # Current specfile format
         nodes = data["spec"]["nodes"]
-        hash_type = None
-        any_deps = False
-
-        # Pass 0: Determine hash type
-        for node in nodes:
-            for _, _, _, dhash_type, _ in cls.dependencies_from_node_dict(node):
-                any_deps = True
-                if dhash_type:
-                    hash_type = dhash_type
-                    break
-
-        if not any_deps:  # If we never see a dependency...
-            hash_type = ht.dag_hash.name
-        elif not hash_type:  # Seen a dependency, still don't know hash_type
-            raise spack.error.SpecError(
-                "Spec dictionary contains malformed dependencies. Old format?"
-            )
+        if not nodes:
+            raise spack.error.SpecError("Spec dictionary contains no nodes.")
 
-        hash_dict = {}
-        root_spec_hash = None
+        # Pass 0: Determine hash type from the first dependency, if any
+        hash_type = ht.dag_hash.name
+        dependencies = next((n["dependencies"] for n in nodes if n.get("dependencies")), None)
+        if dependencies is not None:
+            _, _, _, hash_type, _ = next(iter(cls.read_specfile_dep_specs(dependencies)))
 
         # Pass 1: Create a single lookup dictionary by hash
-        for i, node in enumerate(nodes):
-            node_hash = node[hash_type]
-            node_spec = cls.from_node_dict(node)
-            hash_dict[node_hash] = node
-            hash_dict[node_hash]["node_spec"] = node_spec
-            if i == 0:
-                root_spec_hash = node_hash
-
-        if not root_spec_hash:
-            raise spack.error.SpecError("Spec dictionary contains no nodes.")
+        read_node = cls.from_concrete_node_dict if trusted else cls.from_node_dict
+        specs_by_hash = {node[hash_type]: read_node(node) for node in nodes}
 
         # Pass 2: Finish construction of all DAG edges (including build specs)
-        for node_hash, node in hash_dict.items():
-            node_spec = node["node_spec"]
+        for node in nodes:
+            node_spec = specs_by_hash[node[hash_type]]
+            add_edge = (
+                node_spec._add_trusted_dependency
+                if trusted and node_spec.concrete
+                else node_spec._add_dependency
+            )
             for _, dhash, dtype, _, virtuals in cls.dependencies_from_node_dict(node):
-                node_spec._add_dependency(
-                    hash_dict[dhash]["node_spec"],
-                    depflag=dt.canonicalize(dtype),
-                    virtuals=virtuals,
-                )
-            if "build_spec" in node.keys():
+                add_edge(specs_by_hash[dhash], depflag=dt.canonicalize(dtype), virtuals=virtuals)
+            if "build_spec" in node:
                 _, bhash, _ = cls.extract_build_spec_info_from_node_dict(node, hash_type=hash_type)
-                node_spec._build_spec = hash_dict[bhash]["node_spec"]
+                node_spec._build_spec = specs_by_hash[bhash]
 
-        return hash_dict[root_spec_hash]["node_spec"]
+        return specs_by_hash[nodes[0][hash_type]]
 
     @classmethod
     def read_specfile_dep_specs(cls, deps, hash_type=ht.dag_hash.name):
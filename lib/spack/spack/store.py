@@ -16,6 +16,7 @@
 debugging easier.
 
 """
+import concurrent.futures
 import contextlib
 import os
 import pathlib
@@ -26,6 +27,7 @@
 import llnl.util.lang
 from llnl.util import tty
 
+import spack.caches
 import spack.config
 import spack.database
 import spack.directory_layout
@@ -152,6 +154,10 @@ class Store:
             truncated to this length
         upstreams: optional list of upstream databases
         lock_cfg: lock configuration for the database
+        db_journal: whether the database appends changes to a journal, instead of rewriting
+            its index on each write
+        db_format: format of the index of the database, either ``"json"`` or ``"packed"``
+        db_snapshot_reads: whether read transactions on the database don't take its lock
     """
 
     def __init__(
@@ -162,6 +168,9 @@ def __init__(
         hash_length: Optional[int] = None,
         upstreams: Optional[List[spack.database.Database]] = None,
         lock_cfg: spack.database.LockConfiguration = spack.database.NO_LOCK,
+        db_journal: bool = False,
+        db_format: str = "json",
+        db_snapshot_reads: bool = False,
     ) -> None:
         self.root = root
         self.unpadded_root = unpadded_root or root
@@ -169,11 +178,20 @@ def __init__(
         self.hash_length = hash_length
         self.upstreams = upstreams
         self.lock_cfg = lock_cfg
+        self.db_journal = db_journal
+        self.db_format = db_format
+        self.db_snapshot_reads = db_snapshot_reads
         self.layout = spack.directory_layout.DirectoryLayout(
             root, projections=projections, hash_length=hash_length
         )
         self.db = spack.database.Database(
-            root, upstream_dbs=upstreams, lock_cfg=lock_cfg, layout=self.layout
+            root,
+            upstream_dbs=upstreams,
+            lock_cfg=lock_cfg,
+            layout=self.layout,
+            journal=db_journal,
+            packed=db_format == "packed",
+            snapshot_reads=db_snapshot_reads,
         )
 
         timeout_format_str = (
@@ -188,9 +206,10 @@ def __init__(
             self.root, default_timeout=lock_cfg.package_timeout
         )
 
-    def reindex(self) -> None:
-        """Convenience function to reindex the store DB with its own layout."""
-        return self.db.reindex()
+    def reindex(self, jobs: Optional[int] = None) -> None:
+        """Convenience function to reindex the store DB with its own layout, searching
+        prefixes with ``jobs`` threads."""
+        return self.db.reindex(jobs=jobs)
 
     def __reduce__(self):
         return Store, (
@@ -200,6 +219,9 @@ def __reduce__(self):
             self.hash_length,
             self.upstreams,
             self.lock_cfg,
+            self.db_journal,
+            self.db_format,
+            self.db_snapshot_reads,
         )
 
 
@@ -218,7 +240,9 @@ def create(configuration: spack.config.Configuration) -> Store:
         install_properties["install_tree"]
         for install_properties in configuration.get("upstreams", {}).values()
     ]
-    upstreams = _construct_upstream_dbs_from_install_roots(install_roots)
+    upstreams = _construct_upstream_dbs_from_install_roots(
+        install_roots, cache_dir=os.path.join(spack.caches.misc_cache_location(), "upstreams")
+    )
 
     return Store(
         root=root,
@@ -227,6 +251,9 @@ def create(configuration: spack.config.Configuration) -> Store:
         hash_length=hash_length,
         upstreams=upstreams,
         lock_cfg=spack.database.lock_configuration(configuration),
+        db_journal=configuration.get("config:db_journal", False),
+        db_format=configuration.get("config:db_format", "json"),
+        db_snapshot_reads=configuration.get("config:db_snapshot_reads", False),
     )
 
 
@@ -258,8 +285,14 @@ def restore(token):
 
 
 def _construct_upstream_dbs_from_install_roots(
-    install_roots: List[str],
+    install_roots: List[str], cache_dir: Optional[str] = None
 ) -> List[spack.database.Database]:
+    """Returns the databases of the upstream install trees, read in parallel.
+
+    Args:
+        install_roots: roots of the upstream install trees, in order of precedence
+        cache_dir: directory where packed copies of the upstream databases are cached
+    """
     accumulated_upstream_dbs: List[spack.database.Database] = []
     for install_root in reversed(install_roots):
         upstream_dbs = list(accumulated_upstream_dbs)
@@ -267,10 +300,18 @@ def _construct_upstream_dbs_from_install_roots(
             spack.util.path.canonicalize_path(install_root),
             is_upstream=True,
             upstream_dbs=upstream_dbs,
+            cache_dir=cache_dir,
         )
-        next_db._read()
         accumulated_upstream_dbs.insert(0, next_db)
 
+    if len(accumulated_upstream_dbs) > 1:
+        with concurrent.futures.ThreadPoolExecutor(len(accumulated_upstream_dbs)) as executor:
+            for future in [executor.submit(db._read) for db in accumulated_upstream_dbs]:
+                future.result()
+    else:
+        for db in accumulated_upstream_dbs:
+            db._read()
+
     return accumulated_upstream_dbs
 
 
@@ -13,6 +13,7 @@
 import shutil
 import sys
 import tarfile
+import threading
 import urllib.error
 import urllib.request
 import urllib.response
@@ -43,8 +44,13 @@
 import spack.util.spack_yaml as syaml
 import spack.util.url as url_util
 import spack.util.web as web_util
-from spack.binary_distribution import INDEX_HASH_FILE, CannotListKeys, GenerateIndexError
-from spack.database import INDEX_JSON_FILE
+from spack.binary_distribution import (
+    INDEX_HASH_FILE,
+    INDEX_PACKED_FILE,
+    CannotListKeys,
+    GenerateIndexError,
+)
+from spack.database import INDEX_JSON_FILE, pack_database
 from spack.installer import PackageInstaller
 from spack.paths import test_path
 from spack.spec import Spec
@@ -533,6 +539,234 @@ def test_update_sbang(tmp_path, temporary_mirror, mock_fetch, install_mockery):
             assert f.read() == new_contents
 
 
+@pytest.mark.parametrize("jobs", [0, 2])
+def test_install_prefetches_binaries(
+    jobs, tmp_path, install_mockery, temporary_mirror, mock_fetch, monkeypatch
+):
+    """Test that the binary packages to be installed are downloaded ahead of their
+    installation, and installed from the downloads."""
+    s = spack.concretize.concretize_one("dependent-install")
+    PackageInstaller([s.package], package_use_cache=False, dependencies_use_cache=False).install()
+    buildcache_cmd("push", "--update-index", "--unsigned", temporary_mirror, f"/{s.dag_hash()}")
+
+    prefetched, downloaded = [], []
+    prefetch_tarball, download_tarball = bindist._prefetch_tarball, bindist.download_tarball
+
+    def _prefetch(spec, *args):
+        prefetched.append(spec.name)
+        return prefetch_tarball(spec, *args)
+
+    def _download(spec, *args):
+        downloaded.append(spec.name)
+        return download_tarball(spec, *args)
+
+    monkeypatch.setattr(bindist, "_prefetch_tarball", _prefetch)
+    monkeypatch.setattr(bindist, "download_tarball", _download)
+    spack.config.set("config:concurrent_binary_downloads", jobs)
+
+    with spack.store.use_store(str(tmp_path)):
+        for node in s.traverse():
+            node._prefix = None
+        installer = PackageInstaller(
+            [s.package], package_cache_only=True, dependencies_cache_only=True, unsigned=True
+        )
+        installer.install()
+        assert all(d.installed for d in s.traverse())
+        assert installer.prefetcher is None
+
+    expected = ["dependency-install", "dependent-install"]
+    assert sorted(prefetched) == (expected if jobs else [])
+    assert sorted(downloaded) == expected
+
+
+class _PrefetchedSpec:
+    def __init__(self, name):
+        self.name = name
+
+    def dag_hash(self):
+        return self.name
+
+    def format(self, fmt):
+        return self.name
+
+
+def test_binary_prefetcher_lookahead(monkeypatch):
+    """Test that downloads don't run further ahead of the installation than the lookahead, and
+    that an interrupted installation doesn't wait for the downloads in progress, whose binary
+    packages are deleted once downloaded."""
+    release = threading.Event()
+    started, deleted = [], []
+
+    def _prefetch(spec, *args):
+        started.append(spec.name)
+        release.wait()
+        return {"name": spec.name}
+
+    monkeypatch.setattr(bindist, "_prefetch_tarball", _prefetch)
+    monkeypatch.setattr(bindist, "get_mirrors_for_spec", lambda *args, **kwargs: [])
+    monkeypatch.setattr(bindist, "_delete_staged_downloads", lambda r: deleted.append(r["name"]))
+
+    prefetcher = bindist.BinaryPrefetcher(jobs=1, lookahead=2)
+    for name in "abcde":
+        prefetcher.prefetch(_PrefetchedSpec(name))
+    assert [name for name, _ in prefetcher.downloads] == ["a", "b"]
+
+    # Installing a binary package starts the next download
+    release.set()
+    assert prefetcher.download_tarball(_PrefetchedSpec("a")) == {"name": "a"}
+    assert [name for name, _ in prefetcher.downloads] == ["b", "c"]
+
+    release.clear()
+    threads = list(prefetcher.threads)
+    prefetcher.shutdown(wait=False)
+    assert not prefetcher.downloads and not prefetcher.queue
+
+    release.set()
+    for thread in threads:
+        thread.join(timeout=60)
+    # Downloads not started yet are cancelled, the others are deleted once they complete
+    assert set(started) <= {"a", "b", "c"}
+    assert sorted(deleted) == sorted(set(started) - {"a"})
+
+
+def test_binary_prefetcher_discard(monkeypatch):
+    """Test that discarding a download frees its place for the next one, and cancels it if not
+    started yet."""
+    release = threading.Event()
+    started, deleted = [], []
+
+    def _prefetch(spec, *args):
+        started.append(spec.name)
+        release.wait()
+        return {"name": spec.name}
+
+    monkeypatch.setattr(bindist, "_prefetch_tarball", _prefetch)
+    monkeypatch.setattr(bindist, "get_mirrors_for_spec", lambda *args, **kwargs: [])
+    monkeypatch.setattr(bindist, "_delete_staged_downloads", lambda r: deleted.append(r["name"]))
+
+    prefetcher = bindist.BinaryPrefetcher(jobs=1, lookahead=2)
+    for name in "abcd":
+        prefetcher.prefetch(_PrefetchedSpec(name))
+    for name in "bc":
+        prefetcher.discard(_PrefetchedSpec(name))
+    assert [name for name, _ in prefetcher.downloads] == ["a", "d"]
+
+    release.set()
+    prefetcher.shutdown()
+    # Discarded downloads not started yet are cancelled, the others are deleted
+    assert set(started) <= {"a", "d"}
+    assert sorted(deleted) == sorted(started)
+
+
+@pytest.mark.requires_executables("zstd")
+def test_install_zstd_compressed_binaries(tmp_path, install_mockery, temporary_mirror, mock_fetch):
+    """Test that tarballs compressed with zstd are recorded as such, and can be installed"""
+    s = spack.concretize.concretize_one("trivial-install-test-package")
+    PackageInstaller([s.package], package_use_cache=False).install()
+    spack.config.set("config:buildcache_compression", "zstd")
+    buildcache_cmd("push", "--unsigned", "--force", temporary_mirror, f"/{s.dag_hash()}")
+
+    specfile = os.path.join(
+        temporary_mirror,
+        bindist.build_cache_relative_path(),
+        bindist.tarball_name(s, ".spec.json"),
+    )
+    with open(specfile, encoding="utf-8") as f:
+        spec_dict = json.load(f)
+    assert spec_dict["buildcache_layout_version"] == 3
+    assert spec_dict["binary_cache_checksum"]["compression"] == "zstd"
+
+    with spack.store.use_store(str(tmp_path)):
+        s._prefix = None
+        PackageInstaller([s.package], package_cache_only=True, unsigned=True).install()
+        assert s.installed
+
+
+@pytest.mark.parametrize(
+    "compression", ["gzip", pytest.param("zstd", marks=pytest.mark.requires_executables("zstd"))]
+)
+def test_install_streamed_binaries(
+    compression, tmp_path, install_mockery, temporary_mirror, mock_fetch
+):
+    """Test that tarballs are extracted while they are downloaded, without being staged, and
+    that their checksum is verified before they are moved to the install prefix"""
+    s = spack.concretize.concretize_one("trivial-install-test-package")
+    PackageInstaller([s.package], package_use_cache=False).install()
+    spack.config.set("config:buildcache_compression", compression)
+    buildcache_cmd("push", "--unsigned", "--force", temporary_mirror, f"/{s.dag_hash()}")
+    spack.config.set("config:stream_binaries", True)
+
+    with spack.store.use_store(str(tmp_path / "store")):
+        s._prefix = None
+        download_result = bindist.download_tarball(s, unsigned=True)
+        assert "tarball_stage" not in download_result
+        assert download_result["tarball_url"].endswith(".spack")
+
+        # A checksum mismatch leaves the prefix untouched, and no temporary dir behind
+        os.makedirs(s.prefix)
+        with download_result["open_tarball"]() as response:
+            with pytest.raises(bindist.NoChecksumException):
+                bindist.extract_buildcache_tarball_stream(
+                    response, s.prefix, checksum="0" * 64, compression=compression
+                )
+        bindist._delete_staged_downloads(download_result)
+        assert os.listdir(os.path.dirname(s.prefix)) == [os.path.basename(s.prefix)]
+        assert os.listdir(s.prefix) == []
+        shutil.rmtree(s.prefix)
+
+        PackageInstaller([s.package], package_cache_only=True, unsigned=True).install()
+        assert s.installed
+        assert os.path.exists(os.path.join(s.prefix, "an_installation_file"))
+
+
+@pytest.mark.parametrize(
+    "members",
+    [
+        # write through a symlinked dir
+        [("pkg/a", tarfile.SYMTYPE, "{outside}"), ("pkg/a/evil", tarfile.REGTYPE, "")],
+        # write through a symlinked file
+        [("pkg/a", tarfile.SYMTYPE, "{outside}/evil"), ("pkg/a", tarfile.REGTYPE, "")],
+        # relative symlink out of the destination dir
+        [("pkg/a", tarfile.SYMTYPE, "../../.."), ("pkg/a/evil", tarfile.REGTYPE, "")],
+        # hardlink to a file outside of the destination dir
+        [("pkg/a", tarfile.LNKTYPE, "{outside}/evil")],
+        [("pkg/../../evil", tarfile.REGTYPE, "")],
+        [("{outside}/evil", tarfile.REGTYPE, "")],
+    ],
+)
+def test_extract_buildcache_tarball_stream_outside_destination(members, tmp_path):
+    """Test that streamed tarballs, which are extracted before their checksum is verified, cannot
+    write outside of the temporary extraction dir"""
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "evil").write_bytes(b"original")
+
+    stream = io.BytesIO()
+    with tarfile.open(fileobj=stream, mode="w:gz") as tar:
+        info = tarfile.TarInfo("pkg")
+        info.type = tarfile.DIRTYPE
+        tar.addfile(info)
+        for name, type, linkname in members:
+            info = tarfile.TarInfo(name.format(outside=outside))
+            info.type = type
+            info.linkname = linkname.format(outside=outside)
+            data = b"evil" if type == tarfile.REGTYPE else b""
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    stream.seek(0)
+
+    install_dir = tmp_path / "store"
+    install_dir.mkdir()
+    with pytest.raises(ValueError, match="outside of the destination dir"):
+        bindist.extract_buildcache_tarball_stream(
+            stream, str(install_dir / "prefix"), checksum="0" * 64
+        )
+
+    assert sorted(os.listdir(outside)) == ["evil"]
+    assert (outside / "evil").read_bytes() == b"original"
+    assert os.listdir(install_dir) == []
+
+
 @pytest.mark.skipif(
     str(archspec.cpu.host().family) != "x86_64",
     reason="test data uses gcc 4.5.0 which does not support aarch64",
@@ -711,15 +945,58 @@ def urlopen(request: urllib.request.Request):
     assert result.hash == index_json_hash
 
 
-def test_default_index_dont_fetch_index_json_hash_if_no_local_hash():
-    # When we don't have local hash, we should not be fetching the
-    # remote index.json.hash file, but only index.json.
+@pytest.mark.parametrize("local_hash", [None, "outdated"])
+@pytest.mark.parametrize("stale", [False, True])
+def test_default_index_fetch_packed(stale, local_hash):
+    """Tests that the packed copy of index.json is fetched instead of index.json, unless it was
+    packed from another index.json, also when there is no local copy of the index.
+    """
+    index_json = '{"database": {"version": "7", "installs": {}}}'
+    index_json_hash = bindist.compute_hash(index_json)
+    index_packed = pack_database(
+        json.loads(index_json), index_hash="outdated" if stale else index_json_hash
+    )
+
+    def urlopen(request: urllib.request.Request):
+        url = request.get_full_url()
+        contents = {
+            INDEX_HASH_FILE: index_json_hash.encode(),
+            INDEX_PACKED_FILE: index_packed,
+            INDEX_JSON_FILE: index_json.encode(),
+        }
+        for name, content in contents.items():
+            if url.endswith(name):
+                return urllib.response.addinfourl(
+                    io.BytesIO(content), headers={}, url=url, code=200  # type: ignore[arg-type]
+                )
+
+        assert False, "Unexpected request {}".format(url)
+
+    fetcher = bindist.DefaultIndexFetcher(
+        url="https://www.example.com", local_hash=local_hash, urlopen=urlopen
+    )
+
+    result = fetcher.conditional_fetch()
+
+    assert not result.fresh
+    assert result.hash == index_json_hash
+    assert result.data == (index_json if stale else index_packed)
+
+
+def test_default_index_dont_fetch_packed_index_if_no_remote_hash():
+    # When the remote index.json.hash file is missing, we cannot tell whether the packed copy
+    # of index.json is up to date, so we should be fetching only index.json.
     index_json = '{"Hello": "World"}'
     index_json_hash = bindist.compute_hash(index_json)
 
     def urlopen(request: urllib.request.Request):
         url = request.get_full_url()
-        if url.endswith(INDEX_JSON_FILE):
+        if url.endswith(INDEX_HASH_FILE):
+            raise urllib.error.HTTPError(
+                url, 404, "Not found", hdrs={}, fp=None  # type: ignore[arg-type]
+            )
+
+        elif url.endswith(INDEX_JSON_FILE):
             return urllib.response.addinfourl(
                 io.BytesIO(index_json.encode()),
                 headers={"Etag": '"59bcc3ad6775562f845953cf01624225"'},  # type: ignore[arg-type]
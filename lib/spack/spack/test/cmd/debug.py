@@ -2,11 +2,16 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import json
 import platform
 
+import llnl.util.lock
+
 import spack
+import spack.paths
 import spack.platforms
 import spack.spec
+import spack.util.lock
 from spack.main import SpackCommand
 
 debug = SpackCommand("debug")
@@ -22,3 +27,28 @@ def test_report():
     assert spack.get_version() in out
     assert platform.python_version() in out
     assert str(architecture) in out
+
+
+def test_locks(tmp_path, monkeypatch):
+    """Tests that the lock statistics written by several processes are summed up."""
+    monkeypatch.setattr(spack.paths, "default_lock_stats_path", str(tmp_path))
+    monkeypatch.setattr(llnl.util.lock, "_STATISTICS", {})
+    assert "No lock statistics" in debug("locks")
+
+    lock = llnl.util.lock.Lock(str(tmp_path / "lockfile"))
+    for _ in range(2):
+        lock.acquire_read()
+        lock.release_read()
+        spack.util.lock.write_statistics(str(tmp_path))
+        llnl.util.lock.reset_statistics()
+    (tmp_path / "broken.json").write_text("{")
+
+    out = debug("locks")
+    assert "Statistics of 2 processes" in out
+    assert str(tmp_path / "lockfile") in out
+
+    stats = json.loads(debug("locks", "--json"))
+    assert stats[str(tmp_path / "lockfile")]["acquisitions"] == 2
+
+    debug("locks", "--clear")
+    assert not list(tmp_path.glob("*.json"))
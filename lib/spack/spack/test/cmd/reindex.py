@@ -3,6 +3,7 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 import shutil
 
+import spack.config
 import spack.store
 from spack.database import Database
 from spack.enums import InstallRecordStatus
@@ -24,6 +25,18 @@ def test_reindex_basic(mock_packages, mock_archive, mock_fetch, install_mockery)
     assert spack.store.STORE.db.query() == all_installed
 
 
+def test_reindex_jobs(mock_packages, mock_archive, mock_fetch, install_mockery):
+    """Tests that the number of threads of reindex doesn't set the number of build jobs"""
+    install("libelf@0.8.13")
+    build_jobs = spack.config.get("config:build_jobs")
+    all_installed = spack.store.STORE.db.query()
+
+    reindex("-j", "3")
+
+    assert spack.store.STORE.db.query() == all_installed
+    assert spack.config.get("config:build_jobs") == build_jobs
+
+
 def _clear_db(tmp_path):
     empty_db = Database(str(tmp_path))
     with empty_db.write_transaction():
@@ -31,6 +31,7 @@
 import spack.spec
 import spack.store
 import spack.util.file_cache
+import spack.util.parallel
 import spack.variant as vt
 from spack.installer import PackageInstaller
 from spack.spec import CompilerSpec, Spec
@@ -3238,3 +3239,51 @@ def test_spec_unification(unify, mutable_config, mock_packages):
     maybe_fails = pytest.raises if unify is True else llnl.util.lang.nullcontext
     with maybe_fails(spack.solver.asp.UnsatisfiableSpecError):
         _ = spack.cmd.parse_specs([a_restricted, b], concretize=True)
+
+
+def test_concretize_separately_shares_setup(mutable_config, mock_packages, monkeypatch):
+    """Tests that specs concretized separately share the part of the setup that doesn't depend
+    on the input specs, and that the result is the same as concretizing them one by one.
+    """
+    mutable_config.set("concretizer:reuse", True)
+    monkeypatch.setattr(
+        spack.util.parallel, "imap_unordered", lambda f, args, **kwargs: map(f, args)
+    )
+    selected = []
+    original_selected_specs = spack.solver.asp.ReusableSpecsSelector.selected_specs
+
+    def _selected_specs(self):
+        selected.append(self)
+        return original_selected_specs(self)
+
+    monkeypatch.setattr(spack.solver.asp.ReusableSpecsSelector, "selected_specs", _selected_specs)
+
+    roots = [Spec("mpileaks"), Spec("libelf"), Spec("pkg-a")]
+    result = spack.concretize.concretize_separately([(x, None) for x in roots])
+
+    assert len(selected) == 1
+    assert [x for x, _ in result] == roots
+    for abstract, concrete in result:
+        assert concrete.dag_hash() == spack.concretize.concretize_one(abstract).dag_hash()
+
+
+@pytest.mark.parametrize(
+    "portfolio",
+    [[{"opt_strategy": "bb,lin"}], [{}, {"opt_strategy": "bb,lin"}, {"heuristic": "Vsids"}]],
+)
+def test_solver_portfolio(portfolio, mutable_config, mock_packages):
+    """Tests that solving with a portfolio of solver threads gives an optimal solution, with the
+    same cost as the one found with the default settings.
+    """
+    expected, _, _ = spack.solver.asp.Solver().solve_with_stats([Spec("mpileaks")])
+    mutable_config.set("concretizer:portfolio", portfolio)
+    result, _, _ = spack.solver.asp.Solver().solve_with_stats([Spec("mpileaks")])
+
+    assert expected.optimal and result.optimal
+    assert result.answers[0][0] == expected.answers[0][0]
+
+
+def test_solver_portfolio_with_invalid_option(mutable_config, mock_packages):
+    mutable_config.set("concretizer:portfolio", [{"opt_strategy": "not-a-strategy"}])
+    with pytest.raises(spack.error.ConfigError, match="opt_strategy=not-a-strategy"):
+        spack.concretize.concretize_one("mpileaks")
@@ -31,10 +31,12 @@
 import spack.concretize
 import spack.database
 import spack.deptypes as dt
+import spack.directory_layout
 import spack.package_base
 import spack.repo
 import spack.spec
 import spack.store
+import spack.traverse
 import spack.util.lock
 import spack.version as vn
 from spack.enums import InstallRecordStatus
@@ -206,8 +208,10 @@ def test_removed_upstream_dep(upstream_and_downstream_db, tmpdir, capsys, config
             upstream_db.remove(z)
         upstream_db._read()
 
-        # then rereading the downstream DB should warn about the missing dep
+        # then rereading the downstream DB should warn about the missing dep, when the spec
+        # depending on it is constructed
         downstream_db._read_from_file(downstream_db._index_path)
+        downstream_db.query_local_by_spec_hash(y.dag_hash())
         assert (
             f"Missing dependency not in database: y/{y.dag_hash(7)} needs z"
             in capsys.readouterr().err
@@ -308,6 +312,75 @@ def test_recursive_upstream_dbs(tmpdir, gen_mock_layout):
         )
 
 
+@pytest.mark.usefixtures("config")
+def test_upstream_database_cache(upstream_and_downstream_db, tmpdir, monkeypatch):
+    """Tests that upstream databases are read from their cached copy, unless their index was
+    modified after the copy was made.
+    """
+    upstream_db, _ = upstream_and_downstream_db
+    cache_dir = str(tmpdir.mkdir("cache"))
+
+    builder = spack.repo.MockRepositoryBuilder(tmpdir.mkdir("mock.repo"))
+    builder.add_package("x")
+    builder.add_package("y")
+
+    read_files = []
+    read_from_file = spack.database.Database._read_from_file
+
+    def _read_from_file(self, filename):
+        read_files.append(pathlib.Path(filename).name)
+        return read_from_file(self, filename)
+
+    monkeypatch.setattr(spack.database.Database, "_read_from_file", _read_from_file)
+
+    def read_upstream():
+        db = spack.database.Database(upstream_db.root, is_upstream=True, cache_dir=cache_dir)
+        db._read()
+        return {record.spec.name for record in db._data.values()}
+
+    with spack.repo.use_repositories(builder.root):
+        x, y = spack.concretize.concretize_one("x"), spack.concretize.concretize_one("y")
+        with writable(upstream_db):
+            upstream_db.add(x)
+
+        read_files.clear()
+        assert read_upstream() == {"x"} and read_files == ["index.json"]
+        assert read_upstream() == {"x"} and read_files[1:] == [f"{os.listdir(cache_dir)[0]}"]
+
+        with writable(upstream_db):
+            upstream_db.add(y)
+
+        read_files.clear()
+        assert read_upstream() == {"x", "y"} and read_files == ["index.json"]
+
+
+@pytest.mark.usefixtures("config")
+def test_get_by_hash_in_upstreams(tmpdir, gen_mock_layout):
+    """Tests looking up specs by hash and hash prefix in the merged index of upstreams"""
+    roots = [str(tmpdir.mkdir(x)) for x in ["a", "b", "c"]]
+    builder = spack.repo.MockRepositoryBuilder(tmpdir.mkdir("mock.repo"))
+    builder.add_package("x")
+    builder.add_package("y")
+
+    with spack.repo.use_repositories(builder.root):
+        x, y = spack.concretize.concretize_one("x"), spack.concretize.concretize_one("y")
+        db_c = spack.database.Database(roots[2], layout=gen_mock_layout("/rc/"))
+        db_c.add(x)
+        db_c.add(y)
+        db_b = spack.database.Database(roots[1], layout=gen_mock_layout("/rb/"))
+        db_b.add(y)
+
+        upstreams = spack.store._construct_upstream_dbs_from_install_roots(roots[1:])
+        db_a = spack.database.Database(roots[0], upstream_dbs=upstreams)
+
+        assert db_a.get_by_hash(x.dag_hash()) == [x]
+        assert db_a.get_by_hash(x.dag_hash(7)) == [x]
+        assert db_a.get_by_hash("") == [y]
+        assert db_a.get_by_hash("not-a-hash") is None
+        assert "/rb/" in db_a.query_by_spec_hash(y.dag_hash())[1].path
+        assert db_a.db_for_spec_hash(x.dag_hash()) is upstreams[1]
+
+
 @pytest.fixture()
 def usr_folder_exists(monkeypatch):
     """The ``/usr`` folder is assumed to be existing in some tests. This
@@ -850,6 +923,28 @@ def check_unused(roots, deptype, expected):
     )
 
 
+def test_unused_specs_constructs_only_unused_records(mutable_database):
+    """Tests that finding unused specs doesn't construct the records that are still needed"""
+    mpileaks = mutable_database.query_one("mpileaks ^zmpi")
+    mutable_database.mark(mpileaks, "explicit", False)
+    roots = mutable_database.query_local(explicit=True)
+    needed = {s.dag_hash() for s in spack.traverse.traverse_nodes(roots, deptype=("link", "run"))}
+    expected = {s.dag_hash() for s in mutable_database.query_local() if s.dag_hash() not in needed}
+    assert mpileaks.dag_hash() in expected and mpileaks["zmpi"].dag_hash() in expected
+
+    # Only the unused records, and their dependencies, are constructed
+    db = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+    unused = db.unused_specs()
+    assert {s.dag_hash() for s in unused} == expected
+    constructed = {
+        key
+        for key, value in db._data._entries.items()
+        if isinstance(value, spack.database.InstallRecord)
+    }
+    assert constructed == {s.dag_hash() for s in spack.traverse.traverse_nodes(unused)}
+    assert len(constructed) < len(db._data)
+
+
 @pytest.mark.regression("10019")
 def test_query_spec_with_conditional_dependency(mutable_database):
     # The issue is triggered by having dependencies that are
@@ -1035,6 +1130,48 @@ def test_reindex_removed_prefix_is_not_installed(mutable_database, mock_store, c
     assert mutable_database.query_one("libelf", installed=False)
 
 
+def test_interrupted_reindex_is_resumed(mutable_database, monkeypatch):
+    """Tests that the spec files read by an interrupted reindex are not read again"""
+    mutable_database._read()
+    expected = _records_summary(mutable_database)
+    _spec_from_files = spack.directory_layout._spec_from_files
+    _read_spec_files = spack.directory_layout._read_spec_files
+    read_prefixes = []
+
+    def _interrupt_after_five_specs(spec_files):
+        if len(read_prefixes) == 5:
+            raise KeyboardInterrupt()
+        read_prefixes.append(spec_files)
+        return _spec_from_files(spec_files)
+
+    monkeypatch.setattr(spack.directory_layout, "_spec_from_files", _interrupt_after_five_specs)
+    with pytest.raises(KeyboardInterrupt):
+        mutable_database.reindex(jobs=1)
+
+    # The checkpoint has the prefixes of the specs read, and each of their nodes once
+    entries = [
+        json.loads(line)
+        for line in mutable_database._reindex_checkpoint_path.read_text().splitlines()
+    ]
+    checkpointed = {entry["prefix"] for entry in entries}
+    assert len(checkpointed) == 5
+    node_hashes = [node["hash"] for entry in entries for node in entry["nodes"]]
+    assert len(node_hashes) == len(set(node_hashes))
+    assert entries[0]["nodes"][0]["hash"] == entries[0]["hash"]
+
+    monkeypatch.setattr(spack.directory_layout, "_spec_from_files", _spec_from_files)
+    monkeypatch.setattr(
+        spack.directory_layout,
+        "_read_spec_files",
+        lambda prefix: read_prefixes.append(prefix) or _read_spec_files(prefix),
+    )
+    read_prefixes.clear()
+    mutable_database.reindex(jobs=4)
+    assert read_prefixes and not set(read_prefixes) & checkpointed
+    assert not mutable_database._reindex_checkpoint_path.exists()
+    assert _records_summary(mutable_database) == expected
+
+
 def test_reindex_when_all_prefixes_are_removed(mutable_database, mock_store):
     # Remove all non-external installations from the filesystem
     for spec in spack.store.STORE.db.query_local():
@@ -1235,3 +1372,330 @@ def test_query_with_predicate_fn(database):
 
     specs = database.query(predicate_fn=lambda x: not spack.repo.PATH.exists(x.spec.name))
     assert not specs
+
+
+@pytest.mark.parametrize(
+    "query_spec,kwargs",
+    [
+        ("mpileaks", {}),
+        ("mpileaks ^mpich", {"explicit": True}),
+        ("mpi", {}),
+        ("mpi@:1", {"installed": InstallRecordStatus.ANY}),
+        (None, {"explicit": True}),
+        (None, {"explicit": False}),
+        ("callpath", {"origin": "mock-origin"}),
+        (None, {"start_date": datetime.datetime.now() - datetime.timedelta(days=1)}),
+        (None, {"end_date": datetime.datetime(1970, 1, 2)}),
+        ("externaltool", {"installed": InstallRecordStatus.ANY}),
+    ],
+)
+def test_query_with_secondary_indexes(query_spec, kwargs, database, monkeypatch):
+    """Tests that queries using the secondary indexes give the same results as a full scan of
+    the database.
+    """
+    expected = database.query_local(query_spec, **kwargs)
+    monkeypatch.setattr(spack.database.RecordIndex, "select", lambda *args, **kwargs: None)
+    assert sorted(database.query_local(query_spec, **kwargs)) == sorted(expected)
+
+
+@pytest.mark.parametrize("query_spec", [None, "mpileaks", "mpi"])
+def test_query_by_hashes_keeps_their_order(query_spec, database):
+    """Tests that the results of queries restricted to some hashes follow their order"""
+    hashes = [s.dag_hash() for s in database.query_local(query_spec)]
+    assert len(hashes) > 1
+    hashes.reverse()
+    results = database.query_local(query_spec, hashes=hashes + hashes[:1])
+    assert [s.dag_hash() for s in results] == hashes
+
+
+def test_secondary_indexes_are_kept_current(mutable_database):
+    """Tests that secondary indexes are updated when records are added, removed or modified"""
+
+    def _check_indexes():
+        expected = spack.database.RecordIndex.from_records(mutable_database._data)
+        assert mutable_database._index._entries == expected._entries
+        assert mutable_database._index.by_name == expected.by_name
+        assert mutable_database._index.explicit.keys() == expected.explicit.keys()
+
+    _check_indexes()
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    callpath = mpileaks["callpath"]
+
+    mutable_database.mark(callpath, "explicit", True)
+    _check_indexes()
+    assert mutable_database.query_local("callpath ^mpich", explicit=True) == [callpath]
+
+    mutable_database.remove(mpileaks)
+    _check_indexes()
+    assert not mutable_database.query_local("mpileaks ^mpich")
+
+    mutable_database.add(mpileaks)
+    _check_indexes()
+    assert mutable_database.query_local("mpileaks ^mpich") == [mpileaks]
+
+    mutable_database.reindex()
+    _check_indexes()
+
+
+def _records_summary(db):
+    return {
+        key: (rec.installed, rec.explicit, rec.ref_count, rec.path, rec.spec.dag_hash())
+        for key, rec in db._data.items()
+    }
+
+
+def test_journal_is_replayed_on_top_of_index(mutable_database):
+    """Tests that changes appended to the journal are seen by other database instances, and
+    that the index file is not rewritten.
+    """
+    mutable_database.journal = True
+    index_content = mutable_database._index_path.read_bytes()
+
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.mark(mpileaks["callpath"], "explicit", True)
+    mutable_database.remove(mpileaks)
+    mutable_database.remove(mutable_database.query_one("mpileaks ^zmpi"))
+    mutable_database.add(mpileaks)
+
+    assert mutable_database._index_path.read_bytes() == index_content
+    assert len(mutable_database._journal_path.read_bytes().splitlines()) == 5
+
+    db = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+    db._read()
+    db._check_ref_counts()
+    assert _records_summary(db) == _records_summary(mutable_database)
+    assert not db.query_local("mpileaks ^zmpi")
+    assert db.query_local("callpath ^mpich", explicit=True) == [mpileaks["callpath"]]
+
+
+def test_journal_is_compacted(mutable_database, monkeypatch):
+    """Tests that the journal is merged into the index once it is too large, and on reindex"""
+    mutable_database.journal = True
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.mark(mpileaks, "explicit", False)
+    assert mutable_database._journal_path.exists()
+
+    mutable_database.reindex()
+    assert not mutable_database._journal_path.exists()
+
+    mutable_database.mark(mpileaks, "explicit", True)
+    assert mutable_database._journal_path.exists()
+
+    monkeypatch.setattr(spack.database, "_JOURNAL_MIN_COMPACTION_SIZE", 0)
+    monkeypatch.setattr(spack.database, "_JOURNAL_COMPACTION_RATIO", 0)
+    mutable_database.mark(mpileaks, "explicit", False)
+    assert not mutable_database._journal_path.exists()
+
+    db = spack.database.Database(mutable_database.root)
+    assert db.query_local("mpileaks ^mpich", explicit=False) == [mpileaks]
+
+
+def test_journal_skips_incomplete_entries_and_stale_journals(mutable_database):
+    """Tests that an entry interrupted while being written is discarded, and that a journal
+    extending a different index file is ignored.
+    """
+    mutable_database.journal = True
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.mark(mpileaks, "explicit", False)
+    with open(mutable_database._journal_path, "a", encoding="utf-8") as f:
+        f.write('{"installs": {"')
+
+    db = spack.database.Database(mutable_database.root)
+    assert db.query_local("mpileaks ^mpich", explicit=False) == [mpileaks]
+
+    # The next write replaces the incomplete entry
+    mutable_database.mark(mpileaks["callpath"], "explicit", True)
+    lines = mutable_database._journal_path.read_text().splitlines()
+    assert len(lines) == 3 and all(json.loads(line) for line in lines)
+
+    # Simulate an index file written by a version of Spack not using the journal
+    journal = mutable_database._journal_path.read_bytes()
+    with mutable_database.write_transaction():
+        mutable_database._compact = True
+        mutable_database._mark(mpileaks, "explicit", True)
+        mutable_database._mark(mpileaks["callpath"], "explicit", False)
+    mutable_database._journal_path.write_bytes(journal)
+
+    db = spack.database.Database(mutable_database.root)
+    assert db.query_local("mpileaks ^mpich", explicit=True) == [mpileaks]
+    assert not db.query_local("callpath ^mpich", explicit=True)
+
+
+def test_records_are_constructed_lazily(mutable_database):
+    """Tests that reading a database constructs only the specs that are accessed, and that
+    they are still connected to all of their dependents.
+    """
+
+    def _constructed(db):
+        return [key for key, value in db._data._entries.items() if isinstance(value, type(rec))]
+
+    rec = mutable_database.get_record("callpath ^mpich")
+    expected_dependents = sorted(rec.spec["dyninst"].dependents())
+    index_content = mutable_database._index_path.read_bytes()
+
+    db = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+    db._read()
+    assert isinstance(db._data, spack.database.LazyInstallRecords)
+    assert not _constructed(db)
+
+    # Only the records named "callpath", and their dependencies, are constructed by the query
+    callpath = db.get_record("callpath ^mpich").spec
+    expected = {s.dag_hash() for x in db.query_local("callpath") for s in x.traverse()}
+    assert set(_constructed(db)) == expected
+    assert sorted(callpath["dyninst"].dependents()) == expected_dependents
+    assert len(_constructed(db)) < len(db._data)
+
+    # Records that were never accessed are written as they were read
+    with db.write_transaction():
+        pass
+    assert db._index_path.read_bytes() == index_content
+
+
+def test_database_is_not_read_again_if_unchanged(mutable_database, monkeypatch):
+    """Tests that the files of the database are parsed again only if they changed, also when
+    there is no verifier.
+    """
+    monkeypatch.setattr(spack.database, "_use_uuid", False)
+    db = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+    db.query_local()
+    data = db._data
+
+    db.query_local()
+    assert db._data is data
+
+    mutable_database.mark(mutable_database.query_one("mpileaks ^mpich"), "explicit", False)
+    assert db.query_local("mpileaks ^mpich", explicit=False)
+    assert db._data is not data
+
+
+def test_packed_database(mutable_database, monkeypatch):
+    """Tests that the packed copy of a database is read back with the same records, also with
+    a journal on top of it, and that the index file is read instead once it is rewritten by a
+    version of Spack that doesn't write the packed copy.
+    """
+    mutable_database._read()
+    expected = _records_summary(mutable_database)
+    mutable_database.packed = True
+    mutable_database.reindex()
+    with mutable_database._index_path.open(encoding="utf-8") as f:
+        assert len(json.load(f)["database"]["installs"]) == len(expected)
+    assert mutable_database._packed_path.read_bytes().startswith(spack.database._PACKED_MAGIC)
+
+    read_files = []
+    read_from_file = spack.database.Database._read_from_file
+
+    def _read_from_file(self, filename):
+        read_files.append(pathlib.Path(filename).name)
+        return read_from_file(self, filename)
+
+    monkeypatch.setattr(spack.database.Database, "_read_from_file", _read_from_file)
+
+    db = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+    db._read()
+    db._check_ref_counts()
+    assert _records_summary(db) == expected
+    assert read_files == ["index.packed"]
+
+    mutable_database.journal = True
+    mutable_database.mark(mutable_database.query_one("mpileaks ^mpich"), "explicit", False)
+    assert mutable_database._journal_path.exists()
+    assert db.query_local("mpileaks ^mpich", explicit=False)
+    assert read_files[-1] == "index.packed"
+
+    mutable_database.journal = mutable_database.packed = False
+    mutable_database.mark(mutable_database.query_one("mpileaks ^mpich"), "explicit", True)
+    assert db.query_local("mpileaks ^mpich", explicit=True)
+    assert read_files[-1] == "index.json"
+
+
+def test_batched_writes(mutable_database):
+    """Tests that batched changes are written when the batch ends, and that they are kept when
+    the database is read again because of changes by other processes.
+    """
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    zmpi = mutable_database.query_one("mpileaks ^zmpi")
+    other = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+
+    with mutable_database.batched_writes(max_records=1000, max_seconds=3600):
+        mutable_database.mark(mpileaks, "explicit", False)
+        mutable_database.remove(zmpi)
+        assert mutable_database.pending_write(mpileaks) and mutable_database.pending_write(zmpi)
+        assert other.query_local("mpileaks ^mpich", explicit=True)
+        assert other.query_local("mpileaks ^zmpi")
+
+        # Another process writes the database, which is then read again
+        other.mark(mpileaks["callpath"], "explicit", True)
+        assert mutable_database.query_local("callpath ^mpich", explicit=True)
+        assert mutable_database.query_local("mpileaks ^mpich", explicit=False)
+        assert not mutable_database.query_local("mpileaks ^zmpi")
+
+        mutable_database.flush_batch(force=False)
+        assert mutable_database.pending_write(mpileaks)
+
+    assert not mutable_database.pending_write(mpileaks)
+    assert other.query_local("mpileaks ^mpich", explicit=False)
+    assert not other.query_local("mpileaks ^zmpi")
+    other._check_ref_counts()
+
+
+@pytest.mark.parametrize("max_records,max_seconds", [(2, 3600), (1000, 0)])
+def test_batched_writes_limits(mutable_database, max_records, max_seconds):
+    """Tests that batched changes are written once they affect enough records, or once enough
+    time has passed since the first of them.
+    """
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    other = spack.database.Database(mutable_database.root, layout=mutable_database.layout)
+
+    with mutable_database.batched_writes(max_records=max_records, max_seconds=max_seconds):
+        mutable_database.mark(mpileaks, "explicit", False)
+        mutable_database.mark(mpileaks["callpath"], "explicit", True)
+        assert not mutable_database.pending_write(mpileaks)
+        assert other.query_local("mpileaks ^mpich", explicit=False)
+        assert other.query_local("callpath ^mpich", explicit=True)
+
+
+def test_snapshot_reads_dont_lock(mutable_database, monkeypatch):
+    """Tests that snapshot reads see the writes of other instances without taking the lock,
+    and that reads asking for it, or nested in a write, still take it.
+    """
+    reader = spack.database.Database(
+        mutable_database.root, layout=mutable_database.layout, snapshot_reads=True
+    )
+    mpileaks = mutable_database.query_one("mpileaks ^mpich")
+    mutable_database.mark(mpileaks, "explicit", False)
+
+    acquired = []
+    acquire_read = reader.lock.acquire_read
+    monkeypatch.setattr(
+        reader.lock, "acquire_read", lambda *args: acquired.append(acquire_read(*args))
+    )
+    assert reader.query_local("mpileaks ^mpich", explicit=False)
+    assert not acquired
+
+    with reader.read_transaction(locked=True):
+        pass
+    assert len(acquired) == 1
+
+    with reader.write_transaction():
+        with reader.read_transaction():
+            pass
+    assert len(acquired) == 2
+
+
+def test_nested_snapshot_reads_read_once(mutable_database, monkeypatch):
+    """Tests that nested snapshot reads see the data read by the outermost one."""
+    reader = spack.database.Database(
+        mutable_database.root, layout=mutable_database.layout, snapshot_reads=True
+    )
+    calls = []
+    original_read = reader._read
+    monkeypatch.setattr(reader, "_read", lambda: calls.append(original_read()))
+
+    with reader.read_transaction():
+        with reader.read_transaction():
+            reader.query_local("mpileaks")
+    assert len(calls) == 1
+
+    with reader.read_transaction():
+        pass
+    assert len(calls) == 2
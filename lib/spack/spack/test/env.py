@@ -10,10 +10,12 @@
 
 import llnl.util.filesystem as fs
 
+import spack.caches
 import spack.config
 import spack.environment as ev
 import spack.solver.asp
 import spack.spec
+import spack.util.file_cache
 from spack.environment.environment import (
     EnvironmentManifestFile,
     SpackEnvironmentViewError,
@@ -64,6 +66,37 @@ def test_hash_change_no_rehash_concrete(tmp_path, mock_packages, config):
     assert read_in.specs_by_hash[read_in.concretized_order[0]]._hash == new_hash
 
 
+def test_concretized_root_hashes_are_cached(tmp_path, mock_packages, config, monkeypatch):
+    """Tests that the roots of an environment are read from its lockfile, and cached until
+    the lockfile changes.
+    """
+    cache = spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(spack.caches, "MISC_CACHE", cache)
+    env_path = tmp_path / "env_dir"
+    env_path.mkdir()
+    env = ev.create_in_dir(env_path)
+    assert ev.concretized_root_hashes(env_path) == []
+
+    env.add(spack.spec.Spec("mpileaks"))
+    env.concretize()
+    env.write()
+    assert ev.concretized_root_hashes(env_path) == env.concretized_order
+
+    # The lockfile is not read again if it's unchanged
+    lockfile = env_path / ev.lockfile_name
+    content, lock_stat = lockfile.read_bytes(), lockfile.stat()
+    lockfile.write_bytes(b" " * len(content))
+    os.utime(lockfile, ns=(lock_stat.st_atime_ns, lock_stat.st_mtime_ns))
+    assert ev.concretized_root_hashes(env_path) == env.concretized_order
+    lockfile.write_bytes(content)
+
+    env.add(spack.spec.Spec("libelf"))
+    env.concretize()
+    env.write()
+    assert len(env.concretized_order) == 2
+    assert ev.concretized_root_hashes(env_path) == env.concretized_order
+
+
 def test_env_change_spec(tmp_path, mock_packages, config):
     env_path = tmp_path / "env_dir"
     env_path.mkdir(exist_ok=False)
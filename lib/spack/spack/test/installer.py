@@ -6,6 +6,7 @@
 import os
 import shutil
 import sys
+import threading
 from typing import List, Optional, Union
 
 import py
@@ -16,7 +17,9 @@
 import llnl.util.tty as tty
 
 import spack.binary_distribution
+import spack.build_environment
 import spack.concretize
+import spack.config
 import spack.database
 import spack.deptypes as dt
 import spack.error
@@ -899,6 +902,39 @@ def test_update_failed_no_dependent_task(install_mockery):
         assert installer.failed[task.pkg_id] is None
 
 
+def test_remove_task_discards_prefetched_binary(install_mockery, monkeypatch):
+    """Test that the binary package prefetched for a removed task doesn't keep the next one
+    from being prefetched, and is deleted once downloaded."""
+    release = threading.Event()
+    started, deleted = [], []
+
+    def _prefetch(spec, *args):
+        started.append(spec.name)
+        release.wait()
+        return {"name": spec.name}
+
+    bindist = spack.binary_distribution
+    monkeypatch.setattr(bindist, "_prefetch_tarball", _prefetch)
+    monkeypatch.setattr(bindist, "get_mirrors_for_spec", lambda *args, **kwargs: [])
+    monkeypatch.setattr(bindist, "_delete_staged_downloads", lambda r: deleted.append(r["name"]))
+
+    installer = create_installer(["dependent-install"], {})
+    installer._init_queue()
+    installer.prefetcher = bindist.BinaryPrefetcher(jobs=1, lookahead=1)
+    spec = installer.build_requests[0].pkg.spec
+    dep = spec["dependency-install"]
+    for s in (dep, spec):
+        installer.prefetcher.prefetch(s, None)
+    assert list(installer.prefetcher.downloads) == [(dep.dag_hash(), None)]
+
+    installer._remove_task(inst.package_id(dep))
+    assert list(installer.prefetcher.downloads) == [(spec.dag_hash(), None)]
+
+    release.set()
+    installer.prefetcher.shutdown()
+    assert sorted(deleted) == sorted(started)
+
+
 def test_install_uninstalled_deps(install_mockery, monkeypatch, capsys):
     """Test install with uninstalled dependencies."""
     installer = create_installer(["dependent-install"], {})
@@ -1172,6 +1208,61 @@ def test_install_implicit(install_mockery, mock_fetch):
     assert not create_build_task(pkg).explicit
 
 
+def test_install_batched_db_writes(install_mockery, mock_fetch, monkeypatch):
+    """Test that the database is written once for a batch of installs."""
+    db = spack.store.STORE.db
+    writes = []
+    _append_to_journal = db._append_to_journal
+
+    def _count_writes():
+        writes.append(set(db._pending))
+        return _append_to_journal()
+
+    monkeypatch.setattr(db, "_append_to_journal", _count_writes)
+    spack.config.set("config:db_batch", {"max_records": 100, "max_seconds": 3600})
+
+    installer = create_installer(["pkg-a"], {"fake": True})
+    installer.install()
+
+    specs = list(installer.build_requests[0].pkg.spec.traverse())
+    assert len(writes) == 1 and writes[0] == {s.dag_hash() for s in specs}
+    assert not installer.unwritten
+    assert all(s.installed for s in specs)
+
+
+def test_install_concurrent_packages(install_mockery, mock_fetch, monkeypatch):
+    """Test that packages whose dependencies are installed are built at the same time,
+    sharing the build jobs and a jobserver."""
+    spack.config.set("config:concurrent_packages", 2)
+    monkeypatch.setattr(spack.config, "determine_number_of_jobs", lambda **kwargs: 8)
+
+    running, jobs, makeflags = [], set(), set()
+    wait_for_build_processes = spack.build_environment.wait_for_build_processes
+    start_install = inst.BuildTask.start_install
+
+    def _wait(processes):
+        running.append(len(processes))
+        return wait_for_build_processes(processes)
+
+    def _start_install(task, install_status, **kwargs):
+        jobs.add(kwargs.get("build_jobs"))
+        makeflags.add(kwargs.get("makeflags"))
+        start_install(task, install_status, **kwargs)
+
+    monkeypatch.setattr(spack.build_environment, "wait_for_build_processes", _wait)
+    monkeypatch.setattr(inst.BuildTask, "start_install", _start_install)
+
+    installer = create_installer(["mpileaks"], {"fake": True})
+    installer.install()
+
+    assert max(running) == 2
+    assert jobs == {4}
+    assert len(makeflags) == 1 and "--jobserver-auth=" in makeflags.pop()
+    assert installer.jobserver is None
+    assert not installer.running
+    assert all(s.installed for s in installer.build_requests[0].pkg.spec.traverse())
+
+
 def test_overwrite_install_backup_success(temporary_store, config, mock_packages, tmpdir):
     """
     When doing an overwrite install that fails, Spack should restore the backup
@@ -1375,3 +1375,40 @@ def test_upgrade_read_fails(tmpdir):
         with pytest.raises(lk.LockUpgradeError, match=msg):
             lock.upgrade_read_to_write()
         lock.release_write()
+
+
+def test_lock_statistics(tmpdir, monkeypatch):
+    """Test that the operations on locks, and their wait times, are recorded per lock."""
+    monkeypatch.setattr(lk, "_STATISTICS", {})
+    with tmpdir.as_cwd():
+        lock = lk.Lock("lockfile")
+        lock.acquire_read()
+        lock.upgrade_read_to_write()
+        lock.downgrade_write_to_read()
+        lock.release_read()
+        lock.acquire_write()
+        lock.acquire_read()  # nested, so it doesn't take the lock
+        lock.release_read()
+        lock.release_write()
+
+        ranged = lk.Lock("lockfile", start=4, length=1)
+        monkeypatch.setattr(ranged, "_poll_lock", lambda op: False)
+        with pytest.raises(lk.LockTimeoutError):
+            ranged.acquire_write(timeout=1e-3)
+
+    stats = lk.statistics()
+    assert set(stats) == {"lockfile", "lockfile[4:1]"}
+    entry = stats["lockfile"]
+    assert (entry.acquisitions, entry.upgrades, entry.downgrades, entry.timeouts) == (2, 1, 1, 0)
+    assert entry.attempts == 4
+    assert 0 <= entry.max_wait_time <= entry.wait_time
+
+    entry = stats["lockfile[4:1]"]
+    assert (entry.acquisitions, entry.timeouts) == (0, 1)
+    assert entry.attempts >= 2
+    assert entry.max_wait_time >= 1e-3
+
+    total = lk.LockStatistics.from_dict(stats["lockfile"].to_dict())
+    total.merge(entry)
+    assert total.timeouts == 1 and total.acquisitions == 2
+    assert total.max_wait_time == entry.max_wait_time
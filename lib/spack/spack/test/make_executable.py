@@ -11,7 +11,7 @@
 
 import pytest
 
-from spack.build_environment import MakeExecutable
+from spack.build_environment import Jobserver, MakeExecutable
 from spack.util.environment import path_put_first
 
 pytestmark = pytest.mark.not_on_windows("MakeExecutable not supported on Windows")
@@ -114,3 +114,22 @@ def test_make_jobserver_not_supported(monkeypatch):
     monkeypatch.setenv("MAKEFLAGS", "--jobserver-auth=X,Y")
     # Currently fallback on default job count, Maybe it should force -j1 ?
     assert make(output=str).strip() == "-j8"
+
+
+@pytest.mark.parametrize("jobs,clients,tokens", [(8, 1, 7), (8, 3, 5), (2, 4, 0)])
+def test_spack_jobserver(jobs, clients, tokens, monkeypatch):
+    """Tests that the jobserver created by Spack has a token for each job beyond the one
+    that each client runs without a token, and that make uses it."""
+    jobserver = Jobserver(jobs, clients=clients)
+    try:
+        os.set_blocking(jobserver.read_fd, False)
+        try:
+            available = os.read(jobserver.read_fd, 100)
+        except BlockingIOError:
+            available = b""
+        assert len(available) == tokens
+
+        monkeypatch.setenv("MAKEFLAGS", jobserver.makeflags)
+        assert MakeExecutable("make", jobs=8)(output=str).strip() == ""
+    finally:
+        jobserver.close()
@@ -64,6 +64,47 @@ def test_buildcache_push_command(mutable_database):
         assert os.path.exists(os.path.join(spec.prefix, "bin", "mpileaks"))
 
 
+@pytest.mark.requires_executables("zstd")
+def test_buildcache_push_zstd(mutable_database, mutable_config):
+    """Test that zstd compressed layers have the zstd media type, and can be installed"""
+    with oci_servers(InMemoryOCIRegistry("example.com")):
+        mirror("add", "oci-test", "oci://example.com/image")
+        spack.config.set("config:buildcache_compression", "zstd")
+        buildcache("push", "--update-index", "oci-test", "libelf")
+
+        spec = mutable_database.query_local("libelf")[0]
+        tag = spack.binary_distribution._oci_default_tag(spec)
+        manifest, config = get_manifest_and_config(
+            ImageReference.from_string(f"example.com/image:{tag}")
+        )
+        assert manifest["layers"][-1]["mediaType"] == "application/vnd.oci.image.layer.v1.tar+zstd"
+        assert config["binary_cache_checksum"]["compression"] == "zstd"
+        assert config["buildcache_layout_version"] == 3
+
+        # Reinstall libelf from the OCI registry
+        spec.package.do_uninstall(force=True)
+        buildcache("install", "--unsigned", "libelf")
+        assert spec.installed
+
+
+def test_buildcache_install_streamed(mutable_database, mutable_config):
+    """Test that layers are extracted while they are downloaded from the registry"""
+    with oci_servers(InMemoryOCIRegistry("example.com")):
+        mirror("add", "oci-test", "oci://example.com/image")
+        buildcache("push", "--update-index", "oci-test", "libelf")
+
+        spec = mutable_database.query_local("libelf")[0]
+        spack.config.set("config:stream_binaries", True)
+        download_result = spack.binary_distribution.download_tarball(spec, unsigned=True)
+        assert "tarball_stage" not in download_result
+        spack.binary_distribution._delete_staged_downloads(download_result)
+
+        # Reinstall libelf from the OCI registry
+        spec.package.do_uninstall(force=True)
+        buildcache("install", "--unsigned", "libelf")
+        assert spec.installed
+
+
 def test_buildcache_tag(install_mockery, mock_fetch, mutable_mock_env_path):
     """Tests whether we can create an OCI image from a full environment with multiple roots."""
     env("create", "test")
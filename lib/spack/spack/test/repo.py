@@ -319,3 +319,22 @@ def test_get_repo(self, mock_test_cache):
         # foo is not there, raise
         with pytest.raises(spack.repo.UnknownNamespaceError):
             repo.get_repo("foo")
+
+
+def test_repo_digest_depends_only_on_content(tmp_path, mock_packages):
+    """Tests that repositories with the same package files have the same digest, regardless
+    of where they are located on the filesystem.
+    """
+    digests = []
+    for name, packages in (("first", ["pkg-c"]), ("second", ["pkg-c"]), ("third", ["pkg-b"])):
+        builder = spack.repo.MockRepositoryBuilder(tmp_path / name, namespace="digest")
+        for pkg_name in packages:
+            builder.add_package(pkg_name)
+        repo = spack.repo.from_path(builder.root)
+        digests.append(repo.digest())
+        assert repo.package_digest(packages[0]) == spack.repo.file_digest(
+            repo.filename_for_package_name(packages[0])
+        )
+
+    assert digests[0] == digests[1]
+    assert digests[0] != digests[2]
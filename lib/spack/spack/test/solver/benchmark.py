@@ -0,0 +1,78 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Unit tests for the concretizer benchmarks."""
+import copy
+
+import pytest
+
+import spack.main
+import spack.spec
+from spack.solver import benchmark
+
+solve = spack.main.SpackCommand("solve")
+
+
+def test_benchmark_report(mutable_config, mock_packages):
+    report = benchmark.run([spack.spec.Spec("mpileaks"), spack.spec.Spec("libelf")], repeat=2)
+
+    assert report["format"] == benchmark.FORMAT_VERSION
+    assert report["repeat"] == 2
+    assert [x["spec"] for x in report["specs"]] == ["mpileaks", "libelf"]
+    for entry in report["specs"]:
+        assert entry["facts"] > 0 and entry["atoms"] > 0
+        assert set(entry["seconds"]) == set(benchmark.PHASES) | {"total"}
+        for summary in entry["seconds"].values():
+            assert summary["min"] <= summary["mean"] <= summary["max"]
+
+
+@pytest.mark.parametrize(
+    "phase,seconds,facts,expected",
+    [
+        # Small increases, either relative or absolute, are not regressions
+        ("solve", 1.05, 100, []),
+        ("solve", 0.0, 100, []),
+        ("ground", 1.5, 100, ["ground time"]),
+        ("setup", 1.0, 200, ["facts"]),
+        ("setup", 2.0, 200, ["setup time", "facts"]),
+    ],
+)
+def test_benchmark_compare(phase, seconds, facts, expected):
+    baseline = {
+        "specs": [
+            {
+                "spec": "mpileaks",
+                "facts": 100,
+                "seconds": {p: {"min": 1.0} for p in benchmark.PHASES},
+            }
+        ]
+    }
+    report = copy.deepcopy(baseline)
+    report["specs"][0]["facts"] = facts
+    report["specs"][0]["seconds"][phase]["min"] = seconds
+    regressions = benchmark.compare(report, baseline, threshold=0.1)
+    assert [x.metric for x in regressions] == expected
+
+
+def test_solve_benchmark_command(mutable_config, mock_packages, tmp_path):
+    corpus = tmp_path / "corpus.txt"
+    corpus.write_text("# comment\nmpileaks\n\nlibelf\n")
+    report = tmp_path / "report.json"
+
+    solve("--benchmark", str(report), "--corpus", str(corpus), "--repeat", "1")
+    assert [x["spec"] for x in benchmark.read_report(str(report))["specs"]] == [
+        "mpileaks",
+        "libelf",
+    ]
+
+    # Comparing the same spec, with a large threshold to avoid noise, finds no regressions
+    output = solve(
+        "--benchmark",
+        str(tmp_path / "other.json"),
+        "--baseline",
+        str(report),
+        "--threshold",
+        "10",
+        "libelf",
+    )
+    assert "No regressions" in output
@@ -0,0 +1,239 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Unit tests for the persistent caches used in the setup phase of the solver."""
+import pytest
+
+import spack.caches
+import spack.concretize
+import spack.config
+import spack.deptypes as dt
+import spack.repo
+import spack.spec
+import spack.util.file_cache
+from spack.solver import asp, caching, input_analysis
+
+
+@pytest.fixture()
+def setup_cache(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Enables the setup cache, and stores it in a temporary directory"""
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    )
+    mutable_config.set("concretizer:cache", {"setup": True})
+    return caching.create_setup_cache(mutable_config)
+
+
+def test_setup_cache_is_disabled_by_default(mutable_config):
+    assert caching.create_setup_cache(mutable_config) is None
+
+
+def test_setup_cache_skips_setup(setup_cache, monkeypatch):
+    """Tests that a second solve of the same input doesn't run the setup phase"""
+    first = spack.concretize.concretize_one("mpileaks")
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("the setup phase should have been skipped")
+
+    monkeypatch.setattr(asp.SpackSolverSetup, "setup", _fail)
+    second = spack.concretize.concretize_one("mpileaks")
+    assert first.dag_hash() == second.dag_hash()
+
+
+def test_setup_cache_key(setup_cache, mutable_config):
+    """Tests that the key changes with the input specs and with the configuration"""
+
+    def _key(spec_str):
+        return setup_cache.key(
+            [spack.spec.Spec(spec_str)],
+            reuse=[],
+            tests=False,
+            allow_deprecated=False,
+            concretize_everything=True,
+        )
+
+    initial = _key("mpileaks")
+    assert _key("mpileaks") == initial
+    assert _key("mpileaks+debug") != initial
+
+    mutable_config.set("packages:mpileaks", {"require": ["+debug"]})
+    assert _key("mpileaks") != initial
+
+
+def test_setup_cache_restores_reusable_specs(setup_cache, mutable_database, monkeypatch):
+    """Tests that specs can be reused when the setup phase is skipped"""
+    reusable = mutable_database.query()
+    installed = mutable_database.query_one("mpileaks ^mpich")
+    driver = asp.PyclingoDriver()
+
+    first, _, _ = driver.solve(
+        asp.SpackSolverSetup(), [spack.spec.Spec("mpileaks ^mpich")], reuse=reusable
+    )
+    monkeypatch.setattr(asp.SpackSolverSetup, "setup", None)
+    setup = asp.SpackSolverSetup()
+    second, _, _ = driver.solve(setup, [spack.spec.Spec("mpileaks ^mpich")], reuse=reusable)
+
+    assert first.specs[0].dag_hash() == second.specs[0].dag_hash() == installed.dag_hash()
+    assert installed.dag_hash() in setup.reusable_and_possible
+
+
+@pytest.fixture()
+def package_facts_cache(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Enables the package facts cache, and stores it in a temporary directory"""
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    )
+    mutable_config.set("concretizer:cache", {"packages": True})
+    return caching.create_package_facts_cache(mutable_config)
+
+
+@pytest.mark.parametrize(
+    "spec_str", ["mpileaks", "mpileaks+debug ^mpich", "dt-diamond", "conditional-variant-pkg"]
+)
+def test_package_facts_are_replayed(
+    spec_str, mutable_config, mock_packages, tmp_path, monkeypatch
+):
+    """Tests that solving with the package facts cache, both when recording and replaying
+    facts, gives the same result as solving without it.
+    """
+    expected = spack.concretize.concretize_one(spec_str)
+
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    )
+    mutable_config.set("concretizer:cache", {"packages": True})
+    recorded = spack.concretize.concretize_one(spec_str)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("facts should have been replayed from the cache")
+
+    monkeypatch.setattr(asp.SpackSolverSetup, "pkg_condition_rules", _fail)
+    replayed = spack.concretize.concretize_one(spec_str)
+
+    assert expected.dag_hash() == recorded.dag_hash() == replayed.dag_hash()
+
+
+def test_package_facts_key(package_facts_cache, mutable_config):
+    """Tests that the key of a package depends on its configuration, but not on the
+    configuration of unrelated packages.
+    """
+    mpileaks = spack.repo.PATH.get_pkg_class("mpileaks")
+
+    def _key():
+        return package_facts_cache.key(
+            mpileaks, possible_virtuals={"mpi"}, tests=False, enable_splicing=False
+        )
+
+    initial = _key()
+    assert (
+        package_facts_cache.key(
+            mpileaks, possible_virtuals={"mpi"}, tests=["mpileaks"], enable_splicing=False
+        )
+        != initial
+    )
+
+    mutable_config.set("packages:callpath", {"require": ["+debug"]})
+    assert _key() == initial
+
+    mutable_config.set("packages:mpileaks", {"require": ["+debug"]})
+    assert _key() != initial
+
+
+def test_package_facts_are_invalidated(package_facts_cache, monkeypatch):
+    """Tests that an entry is discarded if the recipe of a package it depends on changes"""
+    pkg_cls = spack.repo.PATH.get_pkg_class("mpileaks")
+    key = package_facts_cache.key(
+        pkg_cls, possible_virtuals=set(), tests=False, enable_splicing=False
+    )
+    callpath = spack.repo.PATH.get_pkg_class("callpath")
+    package_facts_cache.put(pkg_cls, key, {"nids": 0}, depends=[pkg_cls, callpath])
+
+    get_entry = lambda: package_facts_cache.get(
+        pkg_cls, key, pkg_class=spack.repo.PATH.get_pkg_class
+    )
+    assert get_entry()["depends"] == {"callpath": caching.recipe_digest(callpath)}
+
+    monkeypatch.setattr(caching, "recipe_digest", lambda x: "changed")
+    assert get_entry() is None
+
+
+def test_reusable_specs_facts_are_cached(mutable_config, mutable_database, tmp_path, monkeypatch):
+    """Tests that facts for reusable specs are read from the cache, and give the same result
+    as generating them.
+    """
+    reusable = mutable_database.query()
+    installed = mutable_database.query_one("mpileaks ^mpich")
+    driver = asp.PyclingoDriver()
+
+    def _solve():
+        result, _, _ = driver.solve(
+            asp.SpackSolverSetup(), [spack.spec.Spec("mpileaks ^mpich")], reuse=reusable
+        )
+        return result.specs[0]
+
+    expected = _solve()
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    )
+    mutable_config.set("concretizer:cache", {"reusable_specs": True})
+    recorded = _solve()
+
+    # Entries are written to disk, one file per package, and read back in a new process
+    assert list(tmp_path.glob("cache/solver/reusable/*/mpileaks.json"))
+    monkeypatch.setattr(caching.ReusableSpecsCache, "_in_memory", {})
+    monkeypatch.setattr(asp.SpackSolverSetup, "concrete_spec_facts", None)
+    replayed = _solve()
+
+    assert expected.dag_hash() == recorded.dag_hash() == replayed.dag_hash()
+    assert replayed.dag_hash() == installed.dag_hash()
+
+
+@pytest.fixture()
+def possible_dependencies_cache(mutable_config, mock_packages, tmp_path, monkeypatch):
+    """Enables the index of possible dependencies, and stores it in a temporary directory"""
+    monkeypatch.setattr(
+        spack.caches, "MISC_CACHE", spack.util.file_cache.FileCache(str(tmp_path / "cache"))
+    )
+    monkeypatch.setattr(caching.PossibleDependenciesCache, "_in_memory", {})
+    mutable_config.set("concretizer:cache", {"possible_dependencies": True})
+    return caching.create_possible_dependencies_cache(mutable_config)
+
+
+@pytest.mark.parametrize("allowed_deps", [dt.ALL, dt.LINK | dt.RUN])
+def test_possible_dependencies_are_indexed(
+    allowed_deps, mock_packages, possible_dependencies_cache, monkeypatch
+):
+    """Tests that the possible dependencies computed from the index are the same as those
+    computed from package recipes, and that recipes are not imported when the index is valid.
+    """
+    expected = input_analysis.NoStaticAnalysis(
+        configuration=spack.config.CONFIG, repo=spack.repo.PATH
+    ).possible_dependencies("mpileaks", allowed_deps=allowed_deps)
+
+    recorded = input_analysis.create_graph_analyzer().possible_dependencies(
+        "mpileaks", allowed_deps=allowed_deps
+    )
+
+    # Read the index from disk, as a new process would do
+    monkeypatch.setattr(caching.PossibleDependenciesCache, "_in_memory", {})
+    analyzer = input_analysis.create_graph_analyzer()
+    monkeypatch.setattr(spack.repo.PATH, "get_pkg_class", None)
+    replayed = analyzer.possible_dependencies("mpileaks", allowed_deps=allowed_deps)
+
+    assert expected == recorded == replayed
+
+
+def test_possible_dependencies_are_invalidated(possible_dependencies_cache, monkeypatch):
+    """Tests that an entry in the index is discarded if any of its files changed"""
+    mpileaks = spack.repo.PATH.get_pkg_class("mpileaks")
+    possible_dependencies_cache.put(mpileaks, {"dependencies": {}, "allowed": True})
+    possible_dependencies_cache.flush()
+
+    cache = caching.create_possible_dependencies_cache(spack.config.CONFIG)
+    assert cache.get("mpileaks")["files"][0][0] == spack.repo.PATH.filename_for_package_name(
+        "mpileaks"
+    )
+
+    monkeypatch.setattr(caching, "_file_is_unchanged", lambda x: False)
+    cache = caching.create_possible_dependencies_cache(spack.config.CONFIG)
+    assert cache.get("mpileaks") is None
@@ -436,6 +436,66 @@ def test_load_json_specfiles(specfile, expected_hash, reader_cls):
         assert isinstance(edge.virtuals, tuple), edge
 
 
+@pytest.mark.parametrize(
+    "specfile,reader_cls",
+    [
+        ("specfiles/hdf5.v017.json.gz", spack.spec.SpecfileV2),
+        ("specfiles/hdf5.v019.json.gz", spack.spec.SpecfileV3),
+        ("specfiles/hdf5.v020.json.gz", spack.spec.SpecfileV4),
+    ],
+)
+def test_fast_path_for_concrete_nodes(specfile, reader_cls):
+    """Tests that reading concrete nodes with the fast path gives the same specs as reading
+    them with the generic reader.
+    """
+    fullpath = os.path.join(spack.paths.test_path, "data", specfile)
+    with gzip.open(fullpath, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+
+    expected = reader_cls._load(data, trusted=False)
+    result = reader_cls._load(data)
+
+    assert result == expected
+    for x, y in zip(result.traverse(), expected.traverse()):
+        assert x.dag_hash() == y.dag_hash()
+        assert x.concrete and y.concrete
+        assert x.versions == y.versions
+        assert x.architecture == y.architecture and x.compiler == y.compiler
+        assert x.external_path == y.external_path
+        assert x.external_modules == y.external_modules
+        for name, variant in x.variants.items():
+            assert type(variant) is type(y.variants[name])
+            assert variant == y.variants[name]
+        assert x.edges_to_dependencies() == y.edges_to_dependencies()
+
+
+def test_specs_read_from_specfiles_share_immutable_data():
+    """Tests that nodes read from different specfiles share immutable data, such as names,
+    versions, architecture components and variant values, while keeping their mutable
+    attributes separate.
+    """
+    fullpath = os.path.join(spack.paths.test_path, "data", "specfiles/hdf5.v020.json.gz")
+    with gzip.open(fullpath, "rt", encoding="utf-8") as f:
+        content = f.read()
+
+    s1, s2 = Spec.from_json(content), Spec.from_json(content)
+    for x, y in zip(s1.traverse(), s2.traverse()):
+        assert x.name is y.name
+        assert x.versions[0] is y.versions[0]
+        assert x.versions is not y.versions
+        assert x.variants is not y.variants
+        assert x.architecture is not y.architecture
+        assert x.architecture.os is y.architecture.os
+        assert x.architecture.target is y.architecture.target
+        assert x.compiler is not y.compiler
+        assert x.compiler.versions[0] is y.compiler.versions[0]
+        for name, variant in x.variants.items():
+            assert variant is not y.variants[name]
+            assert variant.value == y.variants[name].value
+            if isinstance(variant.value, tuple) and name != "patches":
+                assert variant.value is y.variants[name].value
+
+
 def test_anchorify_1():
     """Test that anchorify replaces duplicate values with references to a single instance, and
     that that results in anchors in the output YAML."""
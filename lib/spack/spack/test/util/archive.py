@@ -4,13 +4,26 @@
 
 import gzip
 import hashlib
+import io
 import os
 import shutil
 import tarfile
+import zlib
 from pathlib import Path, PurePath
 
+import pytest
+
 import spack.util.crypto
-from spack.util.archive import gzip_compressed_tarfile, reproducible_tarfile_from_prefix
+from spack.util.archive import (
+    ChecksumReader,
+    ParallelGzipWriter,
+    compressed_tarfile,
+    compression_of,
+    gzip_compressed_tarfile,
+    open_compressed_tarfile,
+    open_compressed_tarfile_stream,
+    reproducible_tarfile_from_prefix,
+)
 
 
 def test_gzip_compressed_tarball_is_reproducible(tmpdir):
@@ -186,3 +199,63 @@ def map_prefix(path: str) -> str:
             "some/common/prefix/file1",
             "some/common/prefix/file2",
         ]
+
+
+def test_parallel_gzip_writer():
+    """Test that ParallelGzipWriter writes a single gzip member, which doesn't depend on the number
+    of threads, and which is the same as the one of GzipFile for a single block."""
+    data = b"".join(b"%d " % (i * i % 997) for i in range(200000))
+
+    def compress(data, jobs):
+        f = io.BytesIO()
+        writer = ParallelGzipWriter(f, jobs=jobs, block_size=64 * 1024)
+        for i in range(0, len(data), 10000):
+            writer.write(data[i : i + 10000])
+        writer.close()
+        return f.getvalue()
+
+    compressed = compress(data, jobs=3)
+    assert compressed == compress(data, jobs=1)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert decompressor.decompress(compressed) == data
+    assert decompressor.eof and not decompressor.unused_data
+
+    f = io.BytesIO()
+    with gzip.GzipFile(filename="", mode="wb", compresslevel=6, mtime=0, fileobj=f) as g:
+        g.write(data[:1000])
+    assert compress(data[:1000], jobs=2) == f.getvalue()
+
+
+@pytest.mark.parametrize(
+    "compression", ["gzip", pytest.param("zstd", marks=pytest.mark.requires_executables("zstd"))]
+)
+def test_compressed_tarfile(compression, tmp_path: Path):
+    """Test that compressed tarfiles are reproducible, and can be read back"""
+    prefix = tmp_path / "prefix"
+    prefix.mkdir()
+    (prefix / "file").write_bytes(b"content " * 100000)
+
+    checksums = []
+    for name in ("fst", "snd"):
+        path = str(tmp_path / name)
+        with compressed_tarfile(path, compression=compression, jobs=2) as (tar, checksum, _):
+            reproducible_tarfile_from_prefix(tar, str(prefix), path_to_name=os.path.basename)
+        assert checksum.hexdigest() == spack.util.crypto.checksum(hashlib.sha256, path)
+        checksums.append(checksum.hexdigest())
+    assert checksums[0] == checksums[1]
+
+    with open(tmp_path / "fst", "rb") as f:
+        assert compression_of(f) == compression
+        assert f.tell() == 0
+
+    with open_compressed_tarfile(str(tmp_path / "fst")) as tar:
+        assert tar.extractfile("file").read() == b"content " * 100000
+    assert sorted(os.listdir(tmp_path)) == ["fst", "prefix", "snd"]
+
+    # Read in stream mode, the file is hashed to its end even if the tarfile is not
+    with open(tmp_path / "fst", "rb") as f:
+        reader = ChecksumReader(f)
+        with open_compressed_tarfile_stream(reader, compression) as tar:
+            assert next(iter(tar)).name == "prefix"
+    assert reader.hexdigest() == checksums[0]
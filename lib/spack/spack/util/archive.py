@@ -1,18 +1,29 @@
 # Copyright Spack Project Developers. See COPYRIGHT file for details.
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
+import collections
+import concurrent.futures
 import errno
 import hashlib
 import io
 import os
 import pathlib
+import shutil
+import subprocess
 import tarfile
+import threading
+import zlib
 from contextlib import closing, contextmanager
 from gzip import GzipFile
-from typing import Callable, Dict, List, Tuple
+from typing import BinaryIO, Callable, Deque, Dict, List, Optional, Tuple
 
 from llnl.util.symlink import readlink
 
+from spack.util.executable import which
+
+#: Compression formats of the tarballs created by ``compressed_tarfile``
+COMPRESSIONS = ("gzip", "zstd")
+
 
 class ChecksumWriter(io.BufferedIOBase):
     """Checksum writer computes a checksum while writing to a file."""
@@ -94,6 +105,284 @@ def readline(self, size=-1):
         raise OSError(errno.EBADF, "readline() on write-only object")
 
 
+class ChecksumReader(io.BufferedIOBase):
+    """Checksum reader computes a checksum while reading from a file."""
+
+    def __init__(self, fileobj, algorithm=hashlib.sha256):
+        self.fileobj = fileobj
+        self.hasher = algorithm()
+        self.length = 0
+
+    def hexdigest(self):
+        return self.hasher.hexdigest()
+
+    def read(self, size=-1):
+        data = self.fileobj.read(size)
+        self.hasher.update(data)
+        self.length += len(data)
+        return data
+
+    def read1(self, size=-1):
+        return self.read(size)
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return False
+
+
+def _deflate_block(block: bytes, dictionary: bytes, compresslevel: int, last: bool) -> bytes:
+    """Compress a block of a deflate stream, which can refer to the end of the previous block"""
+    args = (compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS, zlib.DEF_MEM_LEVEL, 0)
+    compressor = (
+        zlib.compressobj(*args, zdict=dictionary) if dictionary else zlib.compressobj(*args)
+    )
+    return compressor.compress(block) + compressor.flush(
+        zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    )
+
+
+class ParallelGzipWriter(io.BufferedIOBase):
+    """Write-only file object that compresses data like ``GzipFile``, using several threads.
+
+    Like ``pigz``, the data is split in blocks that are compressed concurrently, each one using the
+    end of the previous block as its dictionary, and the blocks are concatenated in a single gzip
+    member. The output depends on the compression level and the block size, but not on the number
+    of threads."""
+
+    #: Size of the deflate window, i.e. of the dictionary of each block
+    WINDOW_SIZE = 32 * 1024
+
+    def __init__(
+        self, fileobj: BinaryIO, *, compresslevel: int = 6, jobs: int = 1, block_size: int = 2**20
+    ):
+        self.fileobj = fileobj
+        self.compresslevel = compresslevel
+        self.jobs = jobs
+        self.block_size = block_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(jobs)
+        self.pending: Deque[concurrent.futures.Future] = collections.deque()
+        self.buffer = bytearray()
+        self.dictionary = b""
+        self.crc = 0
+        self.size = 0
+
+        # Same header as GzipFile(filename="", mtime=0)
+        xfl = b"\002" if compresslevel == 9 else b"\004" if compresslevel == 1 else b"\000"
+        self.fileobj.write(b"\037\213\010\000\000\000\000\000" + xfl + b"\377")
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write() on closed file")
+        data = memoryview(data).cast("B")
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += data.nbytes
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self._submit(bytes(self.buffer[: self.block_size]), last=False)
+            del self.buffer[: self.block_size]
+        return data.nbytes
+
+    def _submit(self, block: bytes, last: bool) -> None:
+        self.pending.append(
+            self.executor.submit(_deflate_block, block, self.dictionary, self.compresslevel, last)
+        )
+        self.dictionary = block[-self.WINDOW_SIZE :]
+
+        # Bound the memory used by blocks waiting to be written
+        while len(self.pending) > 2 * self.jobs:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._submit(bytes(self.buffer), last=True)
+            self.buffer.clear()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+            self.fileobj.write((self.crc & 0xFFFFFFFF).to_bytes(4, "little"))
+            self.fileobj.write((self.size & 0xFFFFFFFF).to_bytes(4, "little"))
+        finally:
+            self.executor.shutdown()
+            super().close()
+
+    def tell(self):
+        return self.size
+
+    def readable(self):
+        return False
+
+    def writable(self):
+        return True
+
+
+class ZstdWriter(io.BufferedIOBase):
+    """Write-only file object that compresses data with the ``zstd`` executable, using several
+    threads. The output does not depend on the number of threads."""
+
+    def __init__(self, fileobj: BinaryIO, *, jobs: int = 1):
+        zstd = which("zstd", required=True)
+        self.process = subprocess.Popen(
+            [*zstd.exe, "-q", f"-T{jobs}", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.copy = threading.Thread(
+            target=shutil.copyfileobj, args=(self.process.stdout, fileobj), daemon=True
+        )
+        self.copy.start()
+        self.size = 0
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write() on closed file")
+        length = memoryview(data).nbytes
+        self.process.stdin.write(data)
+        self.size += length
+        return length
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self.process.stdin.close()
+            self.copy.join()
+            self.process.stdout.close()
+            returncode = self.process.wait()
+        finally:
+            super().close()
+        if returncode != 0:
+            raise OSError(f"zstd exited with status {returncode}")
+
+    def tell(self):
+        return self.size
+
+    def readable(self):
+        return False
+
+    def writable(self):
+        return True
+
+
+@contextmanager
+def compressed_tarfile(path: str, *, compression: str = "gzip", jobs: Optional[int] = None):
+    """Create a reproducible, compressed tarfile, and keep track of shasums of both the
+    compressed and uncompressed tarfile.
+
+    Args:
+        path: path of the tarfile
+        compression: either ``gzip`` or ``zstd``
+        jobs: number of threads compressing the tarfile. With gzip compression and ``None``, the
+            tarfile is compressed by ``GzipFile``, and otherwise by ``ParallelGzipWriter``, which
+            produces different, but equally reproducible output.
+
+    Yields a tuple of the following:
+        tarfile.TarFile: tarfile object
+        ChecksumWriter: checksum of the compressed tarfile
+        ChecksumWriter: checksum of the uncompressed tarfile
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"unsupported compression '{compression}'")
+
+    if compression == "gzip" and jobs is None:
+        with gzip_compressed_tarfile(path) as result:
+            yield result
+        return
+
+    with open(path, "wb") as f, ChecksumWriter(f) as compressed_checksum:
+        if compression == "zstd":
+            compressed_file = ZstdWriter(compressed_checksum, jobs=jobs or 1)
+        else:
+            compressed_file = ParallelGzipWriter(compressed_checksum, compresslevel=6, jobs=jobs)
+        with closing(compressed_file), ChecksumWriter(
+            compressed_file
+        ) as tarfile_checksum, tarfile.TarFile(name="", mode="w", fileobj=tarfile_checksum) as tar:
+            yield tar, compressed_checksum, tarfile_checksum
+
+
+def compression_of(fileobj: BinaryIO) -> str:
+    """Returns the compression of a tarfile created by ``compressed_tarfile``, i.e. ``gzip`` or
+    ``zstd``, from its magic number. The file position is left unchanged."""
+    position = fileobj.tell()
+    magic = fileobj.read(4)
+    fileobj.seek(position)
+    return "zstd" if magic == b"\x28\xb5\x2f\xfd" else "gzip"
+
+
+@contextmanager
+def open_compressed_tarfile(path: str):
+    """Open a tarfile created by ``compressed_tarfile`` for reading. Tarfiles compressed with
+    zstd are decompressed by the ``zstd`` executable to a temporary file next to them.
+
+    Yields the tarfile.TarFile object."""
+    with open(path, "rb") as f:
+        compression = compression_of(f)
+
+    if compression != "zstd":
+        with closing(tarfile.open(path, "r")) as tar:
+            yield tar
+        return
+
+    zstd = which("zstd", required=True)
+    decompressed = f"{path}.tar"
+    try:
+        zstd("-q", "-d", "-f", "-o", decompressed, path)
+        with closing(tarfile.open(decompressed, "r:")) as tar:
+            yield tar
+    finally:
+        if os.path.exists(decompressed):
+            os.unlink(decompressed)
+
+
+@contextmanager
+def open_compressed_tarfile_stream(fileobj: BinaryIO, compression: str = "gzip"):
+    """Open a tarfile created by ``compressed_tarfile`` for reading in stream mode, from a file
+    object that is read sequentially, such as a HTTP response. Tarfiles compressed with zstd are
+    decompressed by the ``zstd`` executable, which is fed from a separate thread. When the
+    context exits, the file object is read to its end, even if the tarfile is not.
+
+    Yields the tarfile.TarFile object."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"unsupported compression '{compression}'")
+
+    if compression == "gzip":
+        with closing(tarfile.open(fileobj=fileobj, mode="r|gz")) as tar:
+            yield tar
+        while fileobj.read(2**20):
+            pass
+        return
+
+    zstd = which("zstd", required=True)
+    process = subprocess.Popen(
+        [*zstd.exe, "-q", "-d", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE
+    )
+
+    def feed():
+        try:
+            shutil.copyfileobj(fileobj, process.stdin)
+        except BrokenPipeError:
+            pass
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    try:
+        with closing(tarfile.open(fileobj=process.stdout, mode="r|")) as tar:
+            yield tar
+        while process.stdout.read(2**20):
+            pass
+    finally:
+        process.stdout.close()
+        feeder.join()
+        returncode = process.wait()
+    if returncode != 0:
+        raise OSError(f"zstd exited with status {returncode}")
+
+
 @contextmanager
 def gzip_compressed_tarfile(path):
     """Create a reproducible, gzip compressed tarfile, and keep track of shasums of both the
@@ -14,8 +14,10 @@
 from spack.util.lock import Lock, ReadTransaction, WriteTransaction
 
 
-def _maybe_open(path: str) -> Optional[IO[str]]:
+def _maybe_open(path: str, binary: bool = False) -> Optional[IO]:
     try:
+        if binary:
+            return open(path, "rb")
         return open(path, "r", encoding="utf-8")
     except OSError as e:
         if e.errno != errno.ENOENT:
@@ -38,14 +40,18 @@ def __exit__(self, type, value, traceback):
 
 
 class WriteContextManager:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, binary: bool = False) -> None:
         self.path = path
         self.tmp_path = f"{self.path}.tmp"
+        self.binary = binary
 
-    def __enter__(self) -> Tuple[Optional[IO[str]], IO[str]]:
+    def __enter__(self) -> Tuple[Optional[IO], IO]:
         """Return (old_file, new_file) file objects, where old_file is optional."""
-        self.old_file = _maybe_open(self.path)
-        self.new_file = open(self.tmp_path, "w", encoding="utf-8")
+        self.old_file = _maybe_open(self.path, self.binary)
+        if self.binary:
+            self.new_file = open(self.tmp_path, "wb")
+        else:
+            self.new_file = open(self.tmp_path, "w", encoding="utf-8")
         return self.old_file, self.new_file
 
     def __exit__(self, type, value, traceback):
@@ -155,19 +161,22 @@ def read_transaction(self, key):
         path = self.cache_path(key)
         return ReadTransaction(self._get_lock(key), acquire=lambda: ReadContextManager(path))
 
-    def write_transaction(self, key):
+    def write_transaction(self, key, binary=False):
         """Get a write transaction on a file cache item.
 
         Returns a WriteTransaction context manager that opens a temporary file
         for writing.  Once the context manager finishes, if nothing went wrong,
-        moves the file into place on top of the old file atomically.
+        moves the file into place on top of the old file atomically. Files are
+        opened in binary mode if ``binary`` is True, in text mode otherwise.
 
         """
         path = self.cache_path(key)
         if os.path.exists(path) and not os.access(path, os.W_OK):
             raise CacheError(f"Insufficient permissions to write to file cache at {path}")
 
-        return WriteTransaction(self._get_lock(key), acquire=lambda: WriteContextManager(path))
+        return WriteTransaction(
+            self._get_lock(key), acquire=lambda: WriteContextManager(path, binary)
+        )
 
     def mtime(self, key) -> float:
         """Return modification time of cache file, or -inf if it does not exist.
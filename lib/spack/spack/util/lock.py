@@ -3,12 +3,16 @@
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
 """Wrapper for ``llnl.util.lock`` allows locking to be enabled/disabled."""
+import json
 import os
+import socket
 import stat
 import sys
-from typing import Optional, Tuple
+import time
+from typing import Dict, Optional, Tuple
 
 import llnl.util.lock
+import llnl.util.tty as tty
 
 # import some llnl.util.lock names as though they're part of spack.util.lock
 from llnl.util.lock import LockError  # noqa: F401
@@ -16,6 +20,7 @@
 from llnl.util.lock import LockUpgradeError  # noqa: F401
 from llnl.util.lock import ReadTransaction  # noqa: F401
 from llnl.util.lock import WriteTransaction  # noqa: F401
+from llnl.util.lock import LockStatistics
 
 import spack.error
 
@@ -99,3 +104,57 @@ def check_lock_safety(path: str) -> None:
                 f"restrict permissions on {path} or enable locks."
             )
             raise spack.error.SpackError(msg, long_msg)
+
+
+def write_statistics(directory: str) -> Optional[str]:
+    """Writes the statistics of the locks taken by this process to a new JSON file in
+    ``directory``, and returns its path. Nothing is written if no lock was taken.
+    """
+    stats = llnl.util.lock.statistics()
+    if not stats:
+        return None
+
+    os.makedirs(directory, exist_ok=True)
+    name = f"{socket.gethostname()}-{os.getpid()}-{time.time_ns()}.json"
+    path = os.path.join(directory, name)
+    data = {
+        "argv": sys.argv,
+        "time": time.time(),
+        "locks": {key: entry.to_dict() for key, entry in stats.items()},
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return path
+
+
+def read_statistics(directory: str) -> Tuple[Dict[str, LockStatistics], int]:
+    """Aggregates the statistics written by :func:`write_statistics` to ``directory``.
+
+    Returns the statistics of each lock, summed over all the processes, and the number of
+    processes that wrote them. Files that cannot be read are skipped.
+    """
+    result: Dict[str, LockStatistics] = {}
+    nprocesses = 0
+    try:
+        names = sorted(n for n in os.listdir(directory) if n.endswith(".json"))
+    except FileNotFoundError:
+        return result, 0
+
+    for name in names:
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                locks = json.load(f)["locks"]
+            process = {key: LockStatistics.from_dict(entry) for key, entry in locks.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            tty.debug(f"Skipping lock statistics in {name}: {e}")
+            continue
+
+        nprocesses += 1
+        for key, entry in process.items():
+            if key in result:
+                result[key].merge(entry)
+            else:
+                result[key] = entry
+    return result, nprocesses
@@ -11,7 +11,8 @@
 import inspect
 import itertools
 import re
-from typing import Any, Callable, Collection, Iterable, List, Optional, Tuple, Type, Union
+import sys
+from typing import Any, Callable, Collection, Dict, Iterable, List, Optional, Tuple, Type, Union
 
 import llnl.util.lang as lang
 import llnl.util.tty.color
@@ -281,6 +282,20 @@ def _flatten(values) -> Collection:
 SerializedValueType = Union[str, bool, List[Union[str, bool]]]
 
 
+#: Values of multi-valued variants read from node dicts, shared among all the variants with
+#: the same values
+_SHARED_VALUES: Dict[Tuple[Any, ...], Tuple[Any, ...]] = {}
+
+
+def _shared_values(values: Iterable[Any]) -> Tuple[Any, ...]:
+    """Returns a tuple with the values in input. Since tuples are immutable, the same object is
+    returned for equal values, which reduces memory usage when reading many specs, and makes
+    comparisons cheaper.
+    """
+    key = tuple(sys.intern(x) if isinstance(x, str) else x for x in values)
+    return _SHARED_VALUES.setdefault(key, key)
+
+
 @lang.lazy_lexicographic_ordering
 class AbstractVariant:
     """A variant that has not yet decided who it wants to be. It behaves like
@@ -293,6 +308,8 @@ class AbstractVariant:
     values.
     """
 
+    __slots__ = ("name", "propagate", "_value", "_original_value")
+
     name: str
     propagate: bool
     _value: ValueType
@@ -310,18 +327,49 @@ def from_node_dict(
         name: str, value: Union[str, List[str]], *, propagate: bool = False
     ) -> "AbstractVariant":
         """Reconstruct a variant from a node dict."""
+        name = sys.intern(name)
         if isinstance(value, list):
             # read multi-value variants in and be faithful to the YAML
             mvar = MultiValuedVariant(name, (), propagate=propagate)
-            mvar._value = tuple(value)
+            mvar._value = _shared_values(value)
             mvar._original_value = mvar._value
             return mvar
 
         elif str(value).upper() == "TRUE" or str(value).upper() == "FALSE":
             return BoolValuedVariant(name, value, propagate=propagate)
 
+        if isinstance(value, str):
+            value = sys.intern(value)
         return SingleValuedVariant(name, value, propagate=propagate)
 
+    @staticmethod
+    def from_concrete_node_dict(
+        name: str, value: Union[str, bool, List[str]], *, propagate: bool = False
+    ) -> "AbstractVariant":
+        """Reconstruct a variant from the node dict of a concrete spec.
+
+        Values in these nodes have already been validated, so they are stored as they are,
+        without going through the value setters. Values that could not have been written
+        by Spack are read with ``from_node_dict``.
+        """
+        if isinstance(value, list):
+            variant: AbstractVariant = MultiValuedVariant.__new__(MultiValuedVariant)
+            value = _shared_values(value)
+        elif isinstance(value, bool):
+            variant = BoolValuedVariant.__new__(BoolValuedVariant)
+        elif (
+            isinstance(value, str) and "," not in value and value.upper() not in ("TRUE", "FALSE")
+        ):
+            variant = SingleValuedVariant.__new__(SingleValuedVariant)
+            value = sys.intern(value)
+        else:
+            return AbstractVariant.from_node_dict(name, value, propagate=propagate)
+
+        variant.name = sys.intern(name)
+        variant.propagate = propagate
+        variant._value = variant._original_value = value
+        return variant
+
     def yaml_entry(self) -> Tuple[str, SerializedValueType]:
         """Returns a key, value tuple suitable to be an entry in a yaml dict.
 
@@ -471,6 +519,9 @@ def __str__(self) -> str:
 class MultiValuedVariant(AbstractVariant):
     """A variant that can hold multiple values at once."""
 
+    # Order in which patches are applied, only for the "patches" variant of concrete specs
+    __slots__ = ("_patches_in_order_of_appearance",)
+
     @implicit_variant_conversion
     def satisfies(self, other: AbstractVariant) -> bool:
         """Returns true if ``other.name == self.name`` and ``other.value`` is
@@ -519,6 +570,8 @@ def __str__(self) -> str:
 class SingleValuedVariant(AbstractVariant):
     """A variant that can hold multiple values, but one at a time."""
 
+    __slots__ = ()
+
     def _value_setter(self, value: ValueType) -> None:
         # Treat the value as a multi-valued variant
         super()._value_setter(value)
@@ -579,6 +632,8 @@ class BoolValuedVariant(SingleValuedVariant):
     BoolValuedVariant can also hold the value '*', for coerced
     comparisons between ``foo=*`` and ``+foo`` or ``~foo``."""
 
+    __slots__ = ()
+
     def _value_setter(self, value: ValueType) -> None:
         # Check the string representation of the value and turn
         # it to a boolean
@@ -2,6 +2,7 @@
 #
 # SPDX-License-Identifier: (Apache-2.0 OR MIT)
 
+import collections.abc
 import re
 from bisect import bisect_left
 from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
@@ -924,7 +925,7 @@ def __init__(self, vlist: Optional[Union[str, VersionType, Iterable]] = None):
         elif isinstance(vlist, VersionList):
             self.versions = vlist[:]
 
-        elif isinstance(vlist, Iterable):
+        elif isinstance(vlist, collections.abc.Iterable):
             self.versions = []
             for v in vlist:
                 self.add(ver(v))
@@ -0,0 +1,99 @@
+# Copyright Spack Project Developers. See COPYRIGHT file for details.
+#
+# SPDX-License-Identifier: (Apache-2.0 OR MIT)
+"""Compares the time needed to read concrete specs with the generic reader, and with the
+fast path for concrete nodes.
+
+Usage:
+
+    spack python share/spack/qa/specfile-benchmark.py [--repeat N] FILE [FILE ...]
+
+Each file can be a specfile (JSON or YAML, possibly gzipped), an environment lockfile, or the
+``index.json`` of a store or of a build cache. All the nodes in a file are read together, and
+the resulting DAGs are checked to be the same with both readers.
+"""
+import argparse
+import gzip
+import time
+
+import spack.database
+import spack.environment.environment as ev
+import spack.spec
+import spack.util.spack_json as sjson
+import spack.util.spack_yaml as syaml
+import spack.version as vn
+
+
+def load(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        content = f.read()
+    return (
+        sjson.load(content) if ".json" in path or path.endswith(".lock") else syaml.load(content)
+    )
+
+
+def nodes_and_reader(data):
+    """Returns the list of node dicts in the data, and the reader to be used for them. The
+    reader is None for legacy formats, which have no fast path.
+    """
+    if "spec" in data:
+        if isinstance(data["spec"], list):
+            return data["spec"], None
+        version = int(data["spec"]["_meta"]["version"])
+        reader = {2: spack.spec.SpecfileV2, 3: spack.spec.SpecfileV3}
+        return data["spec"]["nodes"], reader.get(version, spack.spec.SpecfileV4)
+
+    if "concrete_specs" in data:
+        # Lockfiles before v5 are keyed by build hash, which is not stored in the nodes
+        version = data["_meta"]["lockfile-version"]
+        if version < ev.lockfile_format_version:
+            return list(data["concrete_specs"].values()), None
+        return list(data["concrete_specs"].values()), ev.READER_CLS[version]
+
+    if "database" in data:
+        reader = spack.database.reader(vn.Version(data["database"]["version"]))
+        if not issubclass(reader, spack.spec.SpecfileV2):
+            reader = None
+        nodes = []
+        for dag_hash, record in data["database"]["installs"].items():
+            nodes.append({**record["spec"], "hash": dag_hash})
+        return nodes, reader
+
+    raise ValueError("unsupported file format")
+
+
+def timed(reader, data, *, trusted, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = reader._load(data, trusted=trusted)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of reads of each file")
+    parser.add_argument("files", nargs="+", help="specfiles, lockfiles or index.json files")
+    args = parser.parse_args()
+
+    print(f"{'file':40} {'nodes':>7} {'generic [s]':>12} {'fast [s]':>10} {'speedup':>8}")
+    for path in args.files:
+        nodes, reader = nodes_and_reader(load(path))
+        if reader is None:
+            print(f"{path:40} skipped, since legacy formats have no fast path")
+            continue
+
+        data = {"spec": {"nodes": nodes}}
+        generic, expected = timed(reader, data, trusted=False, repeat=args.repeat)
+        fast, result = timed(reader, data, trusted=True, repeat=args.repeat)
+        assert [s.dag_hash() for s in result.traverse()] == [
+            s.dag_hash() for s in expected.traverse()
+        ], f"{path}: the readers gave different specs"
+
+        print(f"{path:40} {len(nodes):>7} {generic:>12.4f} {fast:>10.4f} {generic / fast:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
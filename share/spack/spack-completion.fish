@@ -1320,6 +1320,7 @@ complete -c spack -n '__fish_spack_using_command create' -s b -l batch -d 'don'"
 # spack debug
 set -g __fish_spack_optspecs_spack_debug h/help
 complete -c spack -n '__fish_spack_using_command_pos 0 debug' -f -a report -d 'print information useful for bug reports'
+complete -c spack -n '__fish_spack_using_command_pos 0 debug' -f -a locks -d 'report the time spent waiting for locks (see config:lock_stats)'
 complete -c spack -n '__fish_spack_using_command debug' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command debug' -s h -l help -d 'show this help message and exit'
 
@@ -1328,6 +1329,17 @@ set -g __fish_spack_optspecs_spack_debug_report h/help
 complete -c spack -n '__fish_spack_using_command debug report' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command debug report' -s h -l help -d 'show this help message and exit'
 
+# spack debug locks
+set -g __fish_spack_optspecs_spack_debug_locks h/help n/limit= json clear
+complete -c spack -n '__fish_spack_using_command debug locks' -s h -l help -f -a help
+complete -c spack -n '__fish_spack_using_command debug locks' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command debug locks' -s n -l limit -r -f -a limit
+complete -c spack -n '__fish_spack_using_command debug locks' -s n -l limit -r -d 'number of locks to report, by decreasing wait time (0 for all)'
+complete -c spack -n '__fish_spack_using_command debug locks' -l json -f -a json
+complete -c spack -n '__fish_spack_using_command debug locks' -l json -d 'print the statistics of all the locks as JSON'
+complete -c spack -n '__fish_spack_using_command debug locks' -l clear -f -a clear
+complete -c spack -n '__fish_spack_using_command debug locks' -l clear -d 'remove the statistics recorded so far'
+
 # spack deconcretize
 set -g __fish_spack_optspecs_spack_deconcretize h/help root y/yes-to-all a/all
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 deconcretize' -f -k -a '(__fish_spack_specs)'
@@ -2014,7 +2026,7 @@ complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -f -a
 complete -c spack -n '__fish_spack_using_command info' -l variants-by-name -d 'list variants in strict name order; don'"'"'t group by condition'
 
 # spack install
-set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_install h/help only= u/until= j/jobs= p/concurrent-packages= overwrite fail-fast keep-prefix keep-stage dont-restage use-cache no-cache cache-only use-buildcache= include-build-deps no-check-signature show-log-on-error source n/no-checksum v/verbose fake only-concrete add no-add f/file= clean dirty test= log-format= log-file= help-cdash cdash-upload-url= cdash-build= cdash-site= cdash-track= cdash-buildstamp= y/yes-to-all U/fresh reuse fresh-roots deprecated
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 install' -f -k -a '(__fish_spack_specs)'
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command install' -s h -l help -d 'show this help message and exit'
@@ -2024,6 +2036,8 @@ complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -f -a
 complete -c spack -n '__fish_spack_using_command install' -s u -l until -r -d 'phase to stop after when installing (default None)'
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -f -a jobs
 complete -c spack -n '__fish_spack_using_command install' -s j -l jobs -r -d 'explicitly set number of parallel jobs'
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -f -a concurrent_packages
+complete -c spack -n '__fish_spack_using_command install' -s p -l concurrent-packages -r -d 'maximum number of packages to build at the same time, sharing the build jobs'
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -f -a overwrite
 complete -c spack -n '__fish_spack_using_command install' -l overwrite -d 'reinstall an existing spec, even if it has dependents'
 complete -c spack -n '__fish_spack_using_command install' -l fail-fast -f -a fail_fast
@@ -2696,9 +2710,11 @@ complete -c spack -n '__fish_spack_using_command python' -l path -f -a show_path
 complete -c spack -n '__fish_spack_using_command python' -l path -d 'show path to python interpreter that spack uses'
 
 # spack reindex
-set -g __fish_spack_optspecs_spack_reindex h/help
+set -g __fish_spack_optspecs_spack_reindex h/help j/jobs=
 complete -c spack -n '__fish_spack_using_command reindex' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command reindex' -s h -l help -d 'show this help message and exit'
+complete -c spack -n '__fish_spack_using_command reindex' -s j -l jobs -r -f -a jobs
+complete -c spack -n '__fish_spack_using_command reindex' -s j -l jobs -r -d 'number of threads searching the install tree for prefixes'
 
 # spack remove
 set -g __fish_spack_optspecs_spack_remove h/help a/all l/list-name= f/force
@@ -2800,7 +2816,7 @@ complete -c spack -n '__fish_spack_using_command restage' -s h -l help -f -a hel
 complete -c spack -n '__fish_spack_using_command restage' -s h -l help -d 'show this help message and exit'
 
 # spack solve
-set -g __fish_spack_optspecs_spack_solve h/help show= timers stats l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated
+set -g __fish_spack_optspecs_spack_solve h/help show= timers stats benchmark= corpus= repeat= baseline= threshold= l/long L/very-long N/namespaces I/install-status no-install-status y/yaml j/json format= c/cover= t/types U/fresh reuse fresh-roots deprecated
 complete -c spack -n '__fish_spack_using_command_pos_remainder 0 solve' -f -k -a '(__fish_spack_specs_or_id)'
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -f -a help
 complete -c spack -n '__fish_spack_using_command solve' -s h -l help -d 'show this help message and exit'
@@ -2810,6 +2826,16 @@ complete -c spack -n '__fish_spack_using_command solve' -l timers -f -a timers
 complete -c spack -n '__fish_spack_using_command solve' -l timers -d 'print out timers for different solve phases'
 complete -c spack -n '__fish_spack_using_command solve' -l stats -f -a stats
 complete -c spack -n '__fish_spack_using_command solve' -l stats -d 'print out statistics from clingo'
+complete -c spack -n '__fish_spack_using_command solve' -l benchmark -r -f -a benchmark
+complete -c spack -n '__fish_spack_using_command solve' -l benchmark -r -d 'solve each spec separately and write timings and statistics to a JSON report'
+complete -c spack -n '__fish_spack_using_command solve' -l corpus -r -f -a corpus
+complete -c spack -n '__fish_spack_using_command solve' -l corpus -r -d 'file with the specs to be benchmarked, one per line'
+complete -c spack -n '__fish_spack_using_command solve' -l repeat -r -f -a repeat
+complete -c spack -n '__fish_spack_using_command solve' -l repeat -r -d 'number of times each spec is solved in a benchmark (default: 3)'
+complete -c spack -n '__fish_spack_using_command solve' -l baseline -r -f -a baseline
+complete -c spack -n '__fish_spack_using_command solve' -l baseline -r -d 'compare the benchmark against a previous report, and fail on regressions'
+complete -c spack -n '__fish_spack_using_command solve' -l threshold -r -f -a threshold
+complete -c spack -n '__fish_spack_using_command solve' -l threshold -r -d 'relative increase considered a regression when comparing (default: 0.1)'
 complete -c spack -n '__fish_spack_using_command solve' -s l -l long -f -a long
 complete -c spack -n '__fish_spack_using_command solve' -s l -l long -d 'show dependency hashes as well as versions'
 complete -c spack -n '__fish_spack_using_command solve' -s L -l very-long -f -a very_long